@@ -0,0 +1,128 @@
+"""
+Caché en memoria con caducidad (TTL) y tamaño máximo (LRU).
+
+Se usa para resultados baratos de invalidar pero caros de recalcular
+(p. ej. totales de los historiales paginados). Vive en el proceso:
+cada worker tiene la suya.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheTTL:
+    """
+    ---------------------------------------------------------
+    Diccionario acotado con caducidad por entrada.
+    ---------------------------------------------------------
+    - Cada entrada caduca `ttl` segundos después de guardarse.
+    - Si se supera `max_size`, se descarta la usada hace más
+      tiempo (LRU).
+    - Es segura entre hilos.
+    ---------------------------------------------------------
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self._calculando = {}     # clave -> Lock del cálculo en curso
+        self._generacion = 0      # cambia en cada invalidación
+        self.hits = 0
+        self.misses = 0
+
+    def _leer(self, clave):
+        """
+        (encontrado, valor) sin tocar los contadores. Requiere self._lock.
+        """
+        entrada = self._datos.get(clave)
+        if entrada is None or entrada[0] <= time.monotonic():
+            if entrada is not None:
+                del self._datos[clave]
+            return False, None
+
+        self._datos.move_to_end(clave)
+        return True, entrada[1]
+
+    def obtener(self, clave, defecto=None):
+        """
+        Devuelve el valor guardado para `clave`, o `defecto` si no
+        existe o ha caducado.
+        """
+        with self._lock:
+            encontrado, valor = self._leer(clave)
+            if not encontrado:
+                self.misses += 1
+                return defecto
+
+            self.hits += 1
+            return valor
+
+    def obtener_o_calcular(self, clave, calcular):
+        """
+        ---------------------------------------------------------
+        Devuelve el valor de `clave`; si no está, lo calcula con
+        `calcular()` y lo guarda.
+        ---------------------------------------------------------
+        Si llegan varias peticiones a la vez con la misma clave,
+        solo una ejecuta `calcular()`: el resto espera y usa su
+        resultado (cuentan como hit).
+        Si se invalida mientras se calcula, el resultado se
+        devuelve pero no se guarda (podría estar ya desfasado).
+        ---------------------------------------------------------
+        """
+        with self._lock:
+            encontrado, valor = self._leer(clave)
+            if encontrado:
+                self.hits += 1
+                return valor
+            lock_clave = self._calculando.setdefault(clave, threading.Lock())
+
+        with lock_clave:
+            with self._lock:
+                encontrado, valor = self._leer(clave)
+                if encontrado:
+                    self.hits += 1
+                    return valor
+                self.misses += 1
+                generacion = self._generacion
+
+            try:
+                valor = calcular()
+                with self._lock:
+                    if generacion == self._generacion:
+                        self._guardar(clave, valor)
+                return valor
+            finally:
+                with self._lock:
+                    self._calculando.pop(clave, None)
+
+    def _guardar(self, clave, valor):
+        self._datos[clave] = (time.monotonic() + self.ttl, valor)
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.max_size:
+            self._datos.popitem(last=False)
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._guardar(clave, valor)
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._generacion += 1
+            self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._generacion += 1
+            self._datos.clear()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "entradas": len(self._datos),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,169 @@
+"""
+Catálogo en memoria de tipos de turno y turnos (datos de referencia).
+
+tipo_turno casi no cambia y cada fila de turno (fecha, tipo) -> id_turno
+no cambia nunca una vez creada. En lugar de consultarlos (o hacer JOIN
+con tipo_turno) en cada petición, el DAL los resuelve aquí.
+
+- Los tipos de turno se cargan enteros al arrancar (o en el primer uso)
+  y se recargan si aparece un id_tipo_turno desconocido, como mucho una
+  vez cada RECARGA_MIN_S (un id inexistente en un listado grande no
+  provoca una recarga por fila).
+- Las nomenclaturas obligatorias ('L') se piden con id_tipo_requerido:
+  si faltan es un error de datos y se lanza RuntimeError en lugar de
+  consultar con NULL y devolver listados vacíos.
+- Los id_turno se guardan bajo demanda en un mapa acotado (LRU).
+
+Vive en el proceso: cada worker tiene el suyo.
+"""
+
+import threading
+import time
+
+from .DB_Conexion import ejecuta_all
+from .DB_Cache import CacheTTL
+
+
+# Mínimo de segundos entre dos recargas de tipo_turno por un fallo
+RECARGA_MIN_S = 30
+
+class CatalogoTurnos:
+    """
+    ---------------------------------------------------------
+    Catálogo de tipo_turno y de (fecha, id_tipo_turno) -> id_turno.
+    ---------------------------------------------------------
+    Reglas para que nunca devuelva un id inexistente:
+    - Solo se registran turnos leídos de la BD o creados en una
+      transacción YA confirmada (commit).
+    - Los turnos no se borran, así que no hace falta caducarlos:
+      el mapa solo se acota por tamaño.
+    ---------------------------------------------------------
+    """
+
+    def __init__(self, max_turnos: int = 20000):
+        self._lock = threading.Lock()
+        self._tipos = None                # id_tipo_turno -> {id_tipo_turno, turno, nomenclatura}
+        self._por_nomenclatura = {}       # nomenclatura -> id_tipo_turno
+        self._ultima_carga = 0.0          # time.monotonic() de la última (re)carga
+        self._turnos = CacheTTL(ttl=float("inf"), max_size=max_turnos)
+
+    # =========================================================
+    # TIPOS DE TURNO
+    # =========================================================
+    def cargar(self):
+        """
+        (Re)carga todos los tipos de turno desde la BD.
+        """
+        filas = ejecuta_all(
+            "SELECT id_tipo_turno, turno, nomenclatura FROM tipo_turno"
+        ) or []
+
+        tipos = {int(f["id_tipo_turno"]): dict(f) for f in filas}
+        with self._lock:
+            self._tipos = tipos
+            self._por_nomenclatura = {f["nomenclatura"]: id_ for id_, f in tipos.items()}
+            self._ultima_carga = time.monotonic()
+
+    def _asegurar_cargado(self):
+        if self._tipos is None:
+            self.cargar()
+
+    def _recargar_tras_fallo(self) -> bool:
+        """
+        Recarga por un tipo desconocido, como mucho una vez cada
+        RECARGA_MIN_S (entre medias, el fallo se da por bueno).
+        @return: True si se ha recargado
+        """
+        with self._lock:
+            if time.monotonic() - self._ultima_carga < RECARGA_MIN_S:
+                return False
+            # Se reserva la recarga: los demás hilos no la repiten
+            self._ultima_carga = time.monotonic()
+        self.cargar()
+        return True
+
+    def id_tipo(self, nomenclatura: str):
+        """
+        @return: id_tipo_turno de la nomenclatura ('L', 'M', 'TMP'...) o None
+        """
+        self._asegurar_cargado()
+        id_tipo = self._por_nomenclatura.get(nomenclatura)
+        if id_tipo is None and self._recargar_tras_fallo():
+            # Puede haberse creado después de la carga (p. ej. TMP)
+            id_tipo = self._por_nomenclatura.get(nomenclatura)
+        return id_tipo
+
+    def id_tipo_requerido(self, nomenclatura: str):
+        """
+        Como id_tipo, para nomenclaturas que deben existir ('L').
+        @raise RuntimeError: si no existe (falta el seed de tipo_turno)
+        """
+        id_tipo = self.id_tipo(nomenclatura)
+        if id_tipo is None:
+            raise RuntimeError(
+                f"No existe el tipo de turno '{nomenclatura}' en tipo_turno. "
+                f"Ejecuta el seed SQL de tipos de turno."
+            )
+        return id_tipo
+
+    def tipo(self, id_tipo_turno):
+        """
+        @return: dict {id_tipo_turno, turno, nomenclatura} o None
+        """
+        self._asegurar_cargado()
+        id_tipo_turno = int(id_tipo_turno)
+        tipo = self._tipos.get(id_tipo_turno)
+        if tipo is None and self._recargar_tras_fallo():
+            tipo = self._tipos.get(id_tipo_turno)
+        return tipo
+
+    def completar_tipos(self, filas):
+        """
+        ---------------------------------------------------------
+        Añade "nomenclatura" y "turno" a cada fila a partir de su
+        id_tipo_turno (sustituye al JOIN con tipo_turno).
+        ---------------------------------------------------------
+        @param filas: lista de dicts con id_tipo_turno
+        @return: la misma lista, completada
+        """
+        for fila in filas or []:
+            tipo = self.tipo(fila["id_tipo_turno"]) or {}
+            fila["nomenclatura"] = tipo.get("nomenclatura")
+            fila["turno"] = tipo.get("turno")
+        return filas
+
+    # =========================================================
+    # TURNOS (fecha, tipo) -> id_turno
+    # =========================================================
+    @staticmethod
+    def _clave(fecha, id_tipo_turno):
+        return str(fecha)[:10], int(id_tipo_turno)
+
+    def id_turno(self, fecha, id_tipo_turno):
+        """
+        @return: id_turno conocido para (fecha, tipo) o None
+        """
+        return self._turnos.obtener(self._clave(fecha, id_tipo_turno))
+
+    def registrar_turno(self, fecha, id_tipo_turno, id_turno):
+        """
+        Guarda un (fecha, tipo) -> id_turno leído de la BD o ya confirmado.
+        """
+        self._turnos.guardar(self._clave(fecha, id_tipo_turno), int(id_turno))
+
+    def registrar_turnos(self, filas):
+        """
+        Registra en bloque filas con fecha_turno, id_tipo_turno e id_turno.
+        """
+        for fila in filas or []:
+            self.registrar_turno(fila["fecha_turno"], fila["id_tipo_turno"], fila["id_turno"])
+
+    def estadisticas(self) -> dict:
+        return {
+            "tipos": len(self._tipos or {}),
+            "turnos": self._turnos.estadisticas(),
+        }
+
+
+# Instancia única del proceso
+catalogo = CatalogoTurnos()
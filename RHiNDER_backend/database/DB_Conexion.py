@@ -5,10 +5,36 @@ Responsabilidades:
 - Crear conexiones a la base de datos
 - Ejecutar consultas SELECT / INSERT / UPDATE / DELETE
 - Gestionar transacciones cuando es necesario
+- Reutilizar conexiones mediante un pool (ver DB_Pool.py)
 """
 
+import os
+
 import pymysql.cursors
 
+from .DB_Pool import PoolConexiones
+
+
+# =====================================================
+# CONFIGURACIÓN DE LA BASE DE DATOS Y DEL POOL
+# =====================================================
+# Los valores por defecto son los del entorno de desarrollo.
+# En producción se sobrescriben con variables de entorno.
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "127.0.0.1"),
+    "port": int(os.getenv("DB_PORT", "3306")),
+    "user": os.getenv("DB_USER", "remoto"),
+    "password": os.getenv("DB_PASS", "1111"),
+    "database": os.getenv("DB_NAME", "rhinder_db"),
+    "cursorclass": pymysql.cursors.DictCursor,
+    "charset": "utf8mb4",
+}
+
+POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+POOL_MAX_IDLE = int(os.getenv("DB_POOL_MAX_IDLE", "300"))   # segundos
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))    # segundos
+
 
 # =====================================================
 # CONEXIÓN SIMPLE (AUTOCOMMIT)
@@ -31,19 +57,57 @@ def conecta_rhinder():
     -----------------------------------------------------
     @return: conexión a la base de datos
     """
-    db = pymysql.connect(
-        host="127.0.0.1",
-        port=3306,
-        user="remoto",
-        password="1111",
-        database="rhinder_db",
-        autocommit=True,
-        cursorclass=pymysql.cursors.DictCursor,
-        charset="utf8mb4",
-    )
+    db = pymysql.connect(autocommit=True, **DB_CONFIG)
     return db
 
 
+def _conecta_rhinder_tx_nueva():
+    """
+    Abre una conexión NUEVA en modo transacción (sin pool).
+    La usa el pool transaccional para crear sus conexiones.
+    """
+    return pymysql.connect(autocommit=False, **DB_CONFIG)
+
+
+# =====================================================
+# POOLS DE CONEXIONES
+# =====================================================
+# Dos pools separados para no tener que cambiar el modo
+# autocommit en cada préstamo:
+# - _pool_simple: helpers ejecuta_* (autocommit=True)
+# - _pool_tx:     conecta_rhinder_tx() (autocommit=False)
+_pool_simple = PoolConexiones(
+    conecta_rhinder,
+    min_size=POOL_MIN,
+    max_size=POOL_MAX,
+    max_idle=POOL_MAX_IDLE,
+    timeout=POOL_TIMEOUT,
+)
+
+_pool_tx = PoolConexiones(
+    _conecta_rhinder_tx_nueva,
+    min_size=POOL_MIN,
+    max_size=POOL_MAX,
+    max_idle=POOL_MAX_IDLE,
+    timeout=POOL_TIMEOUT,
+    transaccional=True,
+)
+
+
+def estadisticas_pool():
+    """
+    -----------------------------------------------------
+    Devuelve las métricas de ambos pools (préstamos,
+    esperas, conexiones abiertas/ociosas...).
+    -----------------------------------------------------
+    @return: diccionario {"simple": {...}, "tx": {...}}
+    """
+    return {
+        "simple": _pool_simple.estadisticas(),
+        "tx": _pool_tx.estadisticas(),
+    }
+
+
 # =====================================================
 # HELPERS SQL SIN TRANSACCIÓN
 # =====================================================
@@ -56,13 +120,13 @@ def ejecuta_all(sql, params=None):
     @param params: parámetros de la consulta
     @return: lista de diccionarios
     """
-    conn = conecta_rhinder()
+    conn = _pool_simple.obtener()
     try:
         with conn.cursor() as cursor:
             cursor.execute(sql, params)
             return cursor.fetchall()
     finally:
-        # Cerrar siempre la conexión
+        # Devolver siempre la conexión al pool
         conn.close()
 
 
@@ -75,7 +139,7 @@ def ejecuta_one(sql, params=None):
     @param params: parámetros de la consulta
     @return: diccionario o None
     """
-    conn = conecta_rhinder()
+    conn = _pool_simple.obtener()
     try:
         with conn.cursor() as cursor:
             cursor.execute(sql, params)
@@ -96,7 +160,7 @@ def ejecuta_insert(sql, params=None):
     @param params: parámetros de la consulta
     @return: lastrowid
     """
-    conn = conecta_rhinder()
+    conn = _pool_simple.obtener()
     try:
         with conn.cursor() as cursor:
             cursor.execute(sql, params)
@@ -118,7 +182,7 @@ def ejecuta_Update_Delete(sql, params=None):
     @param params: parámetros de la consulta
     @return: número de filas afectadas
     """
-    conn = conecta_rhinder()
+    conn = _pool_simple.obtener()
     try:
         with conn.cursor() as cursor:
             rows = cursor.execute(sql, params)
@@ -139,6 +203,8 @@ def conecta_rhinder_tx():
     Características:
     - autocommit=False
     - requiere commit() o rollback() manual
+    - la conexión sale del pool transaccional: close()
+      la devuelve al pool (con rollback de lo pendiente)
     -----------------------------------------------------
     Uso recomendado:
     - Operaciones críticas
@@ -146,16 +212,7 @@ def conecta_rhinder_tx():
     -----------------------------------------------------
     @return: conexión a la base de datos
     """
-    return pymysql.connect(
-        host="127.0.0.1",
-        port=3306,
-        user="remoto",
-        password="1111",
-        database="rhinder_db",
-        autocommit=False,
-        cursorclass=pymysql.cursors.DictCursor,
-        charset="utf8mb4",
-    )
+    return _pool_tx.obtener()
 
 
 def ejecuta_one_tx(conn, sql, params=None):
@@ -233,6 +290,7 @@ def get_or_create_turno_tmp_tx(conn):
     transacción.
     -----------------------------------------------------
     Lógica:
+    0) Si el catálogo ya conoce el turno TMP, no se consulta la BD
     1) Buscar el tipo de turno con nomenclatura 'TMP'
     2) Si no existe, crearlo
     3) Buscar el turno TMP con fecha fija 1900-01-01
@@ -241,17 +299,28 @@ def get_or_create_turno_tmp_tx(conn):
     @param conn: conexión abierta en modo transacción
     @return: id_turno del turno temporal
     """
+    # Import diferido: DB_Catalogo depende de este módulo
+    from .DB_Catalogo import catalogo
 
-    # 1) Buscar el tipo de turno TMP
-    row = ejecuta_one_tx(
-        conn,
-        "SELECT id_tipo_turno FROM tipo_turno WHERE nomenclatura=%s LIMIT 1",
-        ("TMP",),
-    )
+    # 0) Tipo y turno TMP ya conocidos por el catálogo
+    id_tipo_tmp = catalogo.id_tipo("TMP")
 
-    if row:
-        id_tipo_tmp = row["id_tipo_turno"]
+    if id_tipo_tmp is not None:
+        id_turno = catalogo.id_turno("1900-01-01", id_tipo_tmp)
+        if id_turno is not None:
+            return id_turno
     else:
+        # 1) El catálogo puede no tenerlo aún (recargas limitadas):
+        #    se busca en la BD antes de crearlo, para no duplicarlo
+        row = ejecuta_one_tx(
+            conn,
+            "SELECT id_tipo_turno FROM tipo_turno WHERE nomenclatura=%s LIMIT 1",
+            ("TMP",),
+        )
+        if row:
+            id_tipo_tmp = row["id_tipo_turno"]
+
+    if id_tipo_tmp is None:
         # Crear el tipo de turno TMP si no existe
         id_tipo_tmp = ejecuta_insert_tx(
             conn,
@@ -267,9 +336,10 @@ def get_or_create_turno_tmp_tx(conn):
     )
 
     if row:
+        catalogo.registrar_turno("1900-01-01", id_tipo_tmp, row["id_turno"])
         return row["id_turno"]
 
-    # Crear el turno TMP si no existe
+    # Crear el turno TMP si no existe (se cacheará cuando se lea ya confirmado)
     return ejecuta_insert_tx(
         conn,
         "INSERT INTO turno (id_tipo_turno, fecha_turno) VALUES (%s, %s)",
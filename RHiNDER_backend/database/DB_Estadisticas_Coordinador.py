@@ -1,4 +1,40 @@
-from database.DB_Conexion import ejecuta_one, ejecuta_all
+import os
+from collections import Counter
+
+from database.DB_Cache import CacheTTL
+from database.DB_Conexion import (
+    ejecuta_one,
+    ejecuta_all,
+    ejecuta_update_delete_tx,
+    conecta_rhinder_tx
+)
+
+
+# Resultados de los endpoints de estadísticas, por (consulta, periodo/días).
+# Todos los coordinadores ven lo mismo: con el TTL, N paneles abiertos a la
+# vez cuestan una consulta. Se invalida al escribir validaciones en este
+# proceso (invalidarCache); lo que cambie otro proceso tarda como mucho el TTL.
+ESTADISTICAS_CACHE_TTL = float(os.getenv("ESTADISTICAS_CACHE_TTL", "30"))
+_cache_estadisticas = CacheTTL(ttl=ESTADISTICAS_CACHE_TTL, max_size=64)
+
+# Contador de matches en PENDIENTE_VALIDACION (tabla estadistica_contador)
+CONTADOR_PENDIENTES = "matches_pendientes"
+
+# Inicio de cada periodo del resumen, calculado en MySQL (CURDATE())
+# para que la columna `fecha` se compare sin funciones (usa la PK)
+_INICIO_PERIODO = {
+    "hoy": "CURDATE()",
+    "mes": "CURDATE() - INTERVAL (DAYOFMONTH(CURDATE()) - 1) DAY",
+    "anio": "MAKEDATE(YEAR(CURDATE()), 1)",
+}
+
+_SQL_RECALCULAR_PENDIENTES = """
+    INSERT INTO estadistica_contador (nombre, valor)
+    SELECT %s, COUNT(*)
+    FROM `match` m
+    WHERE m.estado = 'PENDIENTE_VALIDACION'
+    ON DUPLICATE KEY UPDATE valor = VALUES(valor)
+"""
 
 
 class EstadisticasCoordinador:
@@ -10,6 +46,13 @@ class EstadisticasCoordinador:
     - Panel de control del coordinador
     - Gráficas y contadores de validaciones
     ---------------------------------------------------------
+    Las lecturas salen de agregados diarios (migración 004):
+    - estadistica_validacion_dia(fecha, estado, total)
+    - estadistica_contador('matches_pendientes')
+    que se actualizan en la misma transacción que cada validación
+    (registrar_validaciones_tx / sumar_pendientes_tx) y se
+    reconcilian periódicamente (reconciliar).
+    ---------------------------------------------------------
     """
 
     @staticmethod
@@ -19,15 +62,17 @@ class EstadisticasCoordinador:
         Devuelve un resumen de validaciones por estado.
         ---------------------------------------------------------
         Estados considerados:
-        - Pendientes: matches aún no validados (tabla `match`)
-        - Aprobadas: validaciones aceptadas (tabla `validacion`)
-        - Rechazadas: validaciones denegadas (tabla `validacion`)
+        - Pendientes: matches aún no validados (contador precalculado)
+        - Aprobadas: validaciones aceptadas (agregado diario)
+        - Rechazadas: validaciones denegadas (agregado diario)
         ---------------------------------------------------------
         El parámetro `periodo` limita las validaciones resueltas:
         - "hoy"  → solo las de hoy
         - "mes"  → mes actual (por defecto)
         - "anio" → año actual
         ---------------------------------------------------------
+        El resultado se comparte ESTADISTICAS_CACHE_TTL segundos.
+        ---------------------------------------------------------
         @param periodo: rango temporal del resumen
         @return: diccionario con totales por estado
         """
@@ -36,41 +81,39 @@ class EstadisticasCoordinador:
         if periodo not in ("hoy", "mes", "anio"):
             periodo = "mes"
 
+        return _cache_estadisticas.obtener_o_calcular(
+            ("estado", periodo),
+            lambda: EstadisticasCoordinador._calcular_resumen_por_estado(periodo)
+        )
+
+    @staticmethod
+    def _calcular_resumen_por_estado(periodo: str):
+        """
+        Consulta sin caché de resumen_validaciones_por_estado.
+        """
+
         # -----------------------------------------------------
         # 1) Pendientes de validación
         #    (matches aún en estado PENDIENTE_VALIDACION)
         # -----------------------------------------------------
-        sql_pendientes = """
-            SELECT COUNT(*) AS pendientes
-            FROM `match` m
-            WHERE m.estado = 'PENDIENTE_VALIDACION';
-        """
-        row_p = ejecuta_one(sql_pendientes) or {}
-        pendientes = int(row_p.get("pendientes") or 0)
+        pendientes = EstadisticasCoordinador.matches_pendientes()
 
         # -----------------------------------------------------
-        # 2) Construir filtro temporal para validaciones resueltas
+        # 2) Inicio del periodo de las validaciones resueltas
+        #    (rango sobre la PK del agregado diario: a lo sumo
+        #    un año de filas, sin recorrer validacion)
         # -----------------------------------------------------
-        if periodo == "hoy":
-            where_periodo = "DATE(v.fecha_validacion) = CURDATE()"
-        elif periodo == "mes":
-            where_periodo = (
-                "YEAR(v.fecha_validacion) = YEAR(CURDATE()) "
-                "AND MONTH(v.fecha_validacion) = MONTH(CURDATE())"
-            )
-        else:  # "anio"
-            where_periodo = "YEAR(v.fecha_validacion) = YEAR(CURDATE())"
+        inicio = _INICIO_PERIODO[periodo]
 
         # -----------------------------------------------------
         # 3) Validaciones resueltas (aprobadas / rechazadas)
         # -----------------------------------------------------
         sql_resueltas = f"""
             SELECT
-              COUNT(*) AS total_resueltas,
-              SUM(v.estado = 'APROBADA')  AS aprobadas,
-              SUM(v.estado = 'RECHAZADA') AS rechazadas
-            FROM validacion v
-            WHERE {where_periodo};
+              SUM(IF(e.estado = 'APROBADA',  e.total, 0)) AS aprobadas,
+              SUM(IF(e.estado = 'RECHAZADA', e.total, 0)) AS rechazadas
+            FROM estadistica_validacion_dia e
+            WHERE e.fecha >= {inicio};
         """
         row_r = ejecuta_one(sql_resueltas) or {}
         aprobadas = int(row_r.get("aprobadas") or 0)
@@ -97,6 +140,7 @@ class EstadisticasCoordinador:
         NOTA:
         - Solo cuenta validaciones APROBADA / RECHAZADA
         - No incluye pendientes
+        - El resultado se comparte ESTADISTICAS_CACHE_TTL segundos
         ---------------------------------------------------------
         @param dias: número de días hacia atrás
         @return: lista de objetos {fecha, valor}
@@ -105,17 +149,31 @@ class EstadisticasCoordinador:
         # Asegurar que días sea entero
         dias = int(dias)
 
+        return _cache_estadisticas.obtener_o_calcular(
+            ("por_dia", dias),
+            lambda: EstadisticasCoordinador._calcular_validaciones_por_dia(dias)
+        )
+
+    @staticmethod
+    def _calcular_validaciones_por_dia(dias: int):
+        """
+        Consulta sin caché de validaciones_por_dia.
+        """
+
         # -----------------------------------------------------
         # Consulta agregada por fecha
         # -----------------------------------------------------
+        # (una fila por día y estado del agregado diario; los días
+        #  que se han quedado a 0 no se devuelven, como antes)
         sql = """
             SELECT
-                DATE(v.fecha_validacion) AS fecha,
-                COUNT(*) AS total
-            FROM validacion v
-            WHERE DATE(v.fecha_validacion) >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
-            GROUP BY DATE(v.fecha_validacion)
-            ORDER BY fecha ASC;
+                e.fecha,
+                SUM(e.total) AS total
+            FROM estadistica_validacion_dia e
+            WHERE e.fecha >= DATE_SUB(CURDATE(), INTERVAL %s DAY)
+            GROUP BY e.fecha
+            HAVING total > 0
+            ORDER BY e.fecha ASC;
         """
         rows = ejecuta_all(sql, (dias,)) or []
 
@@ -136,3 +194,169 @@ class EstadisticasCoordinador:
             })
 
         return salida
+
+    # =========================================================
+    # CACHÉ DE RESULTADOS
+    # =========================================================
+    @staticmethod
+    def invalidarCache():
+        """
+        Descarta los resultados cacheados. Llamar tras confirmar
+        (commit) cualquier escritura que cambie las estadísticas.
+        """
+        _cache_estadisticas.limpiar()
+
+    @staticmethod
+    def estadisticasCache() -> dict:
+        """
+        @return: {ttl, entradas, hits, misses} de la caché de resultados
+        """
+        return {"ttl": ESTADISTICAS_CACHE_TTL, **_cache_estadisticas.estadisticas()}
+
+    # =========================================================
+    # AGREGADOS DIARIOS (mantenimiento incremental)
+    # =========================================================
+    @staticmethod
+    def matches_pendientes() -> int:
+        """
+        ---------------------------------------------------------
+        Número de matches en PENDIENTE_VALIDACION.
+        ---------------------------------------------------------
+        Lee el contador precalculado; si todavía no existe (antes
+        de la primera reconciliación) se cuenta sobre `match`.
+        ---------------------------------------------------------
+        @return: número de matches pendientes
+        """
+        fila = ejecuta_one(
+            "SELECT valor FROM estadistica_contador WHERE nombre = %s",
+            (CONTADOR_PENDIENTES,)
+        )
+        if fila:
+            return max(int(fila["valor"] or 0), 0)
+
+        fila = ejecuta_one(
+            "SELECT COUNT(*) AS pendientes FROM `match` WHERE estado = 'PENDIENTE_VALIDACION'"
+        ) or {}
+        return int(fila.get("pendientes") or 0)
+
+    @staticmethod
+    def registrar_validaciones_tx(conn, nuevas, anteriores=()):
+        """
+        ---------------------------------------------------------
+        Suma al agregado diario las validaciones escritas en la
+        transacción `conn` (sin hacer commit).
+        ---------------------------------------------------------
+        - nuevas: estados ('APROBADA', ...) validados ahora → +1
+          en (CURDATE(), estado), igual que fecha_validacion =
+          CURRENT_TIMESTAMP.
+        - anteriores: (fecha_validacion, estado) de validaciones
+          que se han sobrescrito → -1 en su día y estado.
+        Todo en un único INSERT multi-fila ... ON DUPLICATE KEY.
+        Conviene llamarlo justo antes del commit: las filas del
+        agregado son compartidas y así se bloquean menos tiempo.
+        ---------------------------------------------------------
+        @param conn: conexión transaccional abierta
+        @param nuevas: lista de estados
+        @param anteriores: lista de tuplas (fecha_validacion, estado)
+        """
+        deltas = Counter()
+        for estado in nuevas:
+            deltas[(None, estado)] += 1
+        for fecha, estado in anteriores:
+            if fecha is not None:
+                deltas[(str(fecha)[:10], estado)] -= 1
+
+        filas = []
+        params = []
+        for (fecha, estado), delta in sorted(deltas.items(), key=lambda d: (d[0][0] or "", d[0][1])):
+            if not delta:
+                continue
+            if fecha is None:
+                filas.append("(CURDATE(), %s, %s)")
+                params.extend([estado, delta])
+            else:
+                filas.append("(%s, %s, %s)")
+                params.extend([fecha, estado, delta])
+
+        if not filas:
+            return
+
+        ejecuta_update_delete_tx(conn, f"""
+            INSERT INTO estadistica_validacion_dia (fecha, estado, total)
+            VALUES {', '.join(filas)}
+            ON DUPLICATE KEY UPDATE total = GREATEST(total + VALUES(total), 0)
+        """, params)
+
+    @staticmethod
+    def sumar_pendientes_tx(conn, delta: int):
+        """
+        ---------------------------------------------------------
+        Suma `delta` al contador de matches pendientes dentro de
+        la transacción `conn` (sin hacer commit).
+        ---------------------------------------------------------
+        Si el contador no existe no se crea: lo inicializa la
+        reconciliación con el valor real.
+        ---------------------------------------------------------
+        """
+        if not delta:
+            return
+
+        ejecuta_update_delete_tx(conn, """
+            UPDATE estadistica_contador
+            SET valor = GREATEST(valor + %s, 0)
+            WHERE nombre = %s
+        """, [int(delta), CONTADOR_PENDIENTES])
+
+    @staticmethod
+    def reconciliar(dias=None):
+        """
+        ---------------------------------------------------------
+        Recalcula los agregados a partir de las tablas origen.
+        ---------------------------------------------------------
+        Corrige lo que no pasa por la API (sp_expirar_registros,
+        cambios a mano...):
+        - dias=None: reconstruye todo el agregado diario
+        - dias=N: solo los últimos N días (más barato; el resto
+          del histórico ya no cambia)
+        - siempre: el contador de matches pendientes
+        Se hace en una transacción: las lecturas nunca ven el
+        agregado a medio reconstruir.
+        ---------------------------------------------------------
+        @param dias: ventana a recalcular o None para todo
+        @return: dict {filas_dias, pendientes}
+        """
+        if dias is None:
+            where_borrar, where_origen, params = "", "", []
+        else:
+            dias = int(dias)
+            where_borrar = "WHERE fecha >= DATE_SUB(CURDATE(), INTERVAL %s DAY)"
+            where_origen = "WHERE v.fecha_validacion >= DATE_SUB(CURDATE(), INTERVAL %s DAY)"
+            params = [dias]
+
+        conn = conecta_rhinder_tx()
+        try:
+            ejecuta_update_delete_tx(conn, f"DELETE FROM estadistica_validacion_dia {where_borrar}", params)
+
+            filas_dias = ejecuta_update_delete_tx(conn, f"""
+                INSERT INTO estadistica_validacion_dia (fecha, estado, total)
+                SELECT DATE(v.fecha_validacion), v.estado, COUNT(*)
+                FROM validacion v
+                {where_origen}
+                GROUP BY DATE(v.fecha_validacion), v.estado
+            """, params)
+
+            ejecuta_update_delete_tx(conn, _SQL_RECALCULAR_PENDIENTES, [CONTADOR_PENDIENTES])
+            conn.commit()
+            EstadisticasCoordinador.invalidarCache()
+
+        except Exception:
+            conn.rollback()
+            raise
+
+        finally:
+            conn.close()
+
+        return {
+            "filas_dias": filas_dias,
+            "pendientes": EstadisticasCoordinador.matches_pendientes(),
+        }
@@ -0,0 +1,557 @@
+"""
+Expiración programada de solicitudes, respuestas y matches.
+
+Sustituye a CALL sp_expirar_registros(), que barría todas las tablas en
+una sola transacción. Aquí cada entidad se recorre por bloques acotados
+ordenados por la fecha del turno (keyset sobre (fecha, id)):
+- cada bloque es una transacción corta que solo toca sus ids (por PK)
+- una marca de agua por entidad (tabla expiracion_marca) guarda el
+  último (fecha, id) procesado: cada pasada empieza donde lo dejó la
+  anterior y solo revisa lo que se ha vuelto expirable desde entonces
+
+MotorExpiracion hace lo mismo guiado por plazos: guarda en memoria (un
+heap) el momento en que vence cada fila viva y solo despierta cuando
+vence la primera, para expirar exactamente esos ids.
+
+Lo lanza scripts/expirar.py (una pasada, en modo residente o --motor).
+"""
+
+import heapq
+import time
+from datetime import date, datetime, time as dtime
+
+from .DB_Conexion import (
+    ejecuta_all_tx,
+    ejecuta_one_tx,
+    ejecuta_update_delete_tx,
+    conecta_rhinder_tx
+)
+from .DB_Paginacion import condicion_cursor
+from .DB_Gestion_Respuestas import GestionRespuestas
+from .DB_Estadisticas_Coordinador import EstadisticasCoordinador
+from .DB_Versiones import GestionVersiones, VERSION_SOLICITUDES, clave_matches, clave_respuestas
+
+
+TAMANO_LOTE_EXPIRACION = 500
+
+
+# Candidatos de cada entidad: filas "vivas" cuyo turno es hoy o ya pasó,
+# a partir de la marca de agua. {cursor} = condición keyset (fecha, id).
+_CANDIDATOS = {
+    # Solicitudes activas cuyo turno (del emisor) ya ha llegado
+    "solicitudes": ("""
+        SELECT s.id_solicitud AS id, t.fecha_turno AS fecha
+        FROM solicitud s
+        JOIN turno_trabajador tt ON tt.id_turno_trabajador = s.id_turno_trabajador
+        JOIN turno t ON t.id_turno = tt.id_turno
+        WHERE s.is_activa = 1
+          AND s.estado IN ('PENDIENTE', 'RESPONDIDA')
+          AND t.fecha_turno <= CURDATE()
+          {cursor}
+        ORDER BY t.fecha_turno, s.id_solicitud
+        LIMIT %s
+    """, "t.fecha_turno", "s.id_solicitud"),
+
+    # Respuestas pendientes cuyo turno ofrecido (del receptor) ya ha llegado,
+    # con la solicitud aún viva (mismo filtro que _expirar_respuestas_tx: las
+    # de solicitudes cerradas no se expiran y no deben volver a la cola)
+    "respuestas": ("""
+        SELECT r.id_respuesta AS id, t.fecha_turno AS fecha
+        FROM respuesta r
+        JOIN solicitud s ON s.id_solicitud = r.id_solicitud
+        JOIN turno_trabajador tt ON tt.id_turno_trabajador = r.id_turno_trabajador_receptor
+        JOIN turno t ON t.id_turno = tt.id_turno
+        WHERE r.estado = 'PENDIENTE'
+          AND s.is_activa = 1
+          AND s.estado IN ('PENDIENTE', 'RESPONDIDA')
+          AND t.fecha_turno <= CURDATE()
+          {cursor}
+        ORDER BY t.fecha_turno, r.id_respuesta
+        LIMIT %s
+    """, "t.fecha_turno", "r.id_respuesta"),
+
+    # Matches sin validar cuyo primer día de intercambio ya ha llegado
+    "matches": ("""
+        SELECT m.id_match AS id, LEAST(m.emisor_fecha, m.receptor_fecha) AS fecha
+        FROM `match` m
+        WHERE m.estado = 'PENDIENTE_VALIDACION'
+          AND LEAST(m.emisor_fecha, m.receptor_fecha) <= CURDATE()
+          {cursor}
+        ORDER BY fecha, m.id_match
+        LIMIT %s
+    """, "LEAST(m.emisor_fecha, m.receptor_fecha)", "m.id_match"),
+}
+
+
+# Filas vivas de cada entidad con la fecha en que vencen (sin mirar si ya
+# ha llegado). {filtro} = condición extra sobre el id. Usan los índices
+# por estado de las migraciones 005 y 006.
+_VIVAS = {
+    "solicitudes": ("""
+        SELECT s.id_solicitud AS id, t.fecha_turno AS fecha
+        FROM solicitud s
+        JOIN turno_trabajador tt ON tt.id_turno_trabajador = s.id_turno_trabajador
+        JOIN turno t ON t.id_turno = tt.id_turno
+        WHERE s.is_activa = 1
+          AND s.estado IN ('PENDIENTE', 'RESPONDIDA')
+          {filtro}
+    """, "s.id_solicitud"),
+
+    "respuestas": ("""
+        SELECT r.id_respuesta AS id, t.fecha_turno AS fecha
+        FROM respuesta r
+        JOIN solicitud s ON s.id_solicitud = r.id_solicitud
+        JOIN turno_trabajador tt ON tt.id_turno_trabajador = r.id_turno_trabajador_receptor
+        JOIN turno t ON t.id_turno = tt.id_turno
+        WHERE r.estado = 'PENDIENTE'
+          AND s.is_activa = 1
+          AND s.estado IN ('PENDIENTE', 'RESPONDIDA')
+          {filtro}
+    """, "r.id_respuesta"),
+
+    "matches": ("""
+        SELECT m.id_match AS id, LEAST(m.emisor_fecha, m.receptor_fecha) AS fecha
+        FROM `match` m
+        WHERE m.estado = 'PENDIENTE_VALIDACION'
+          {filtro}
+    """, "m.id_match"),
+}
+
+
+def _en(ids) -> str:
+    return ", ".join(["%s"] * len(ids))
+
+
+def _plazo(fecha) -> float:
+    """
+    Instante (epoch) en que una fila con esa fecha de turno pasa a ser
+    expirable: las 00:00 de ese día (fecha_turno <= CURDATE()).
+    """
+    if isinstance(fecha, datetime):
+        fecha = fecha.date()
+    elif not isinstance(fecha, date):
+        fecha = date.fromisoformat(str(fecha)[:10])
+    return datetime.combine(fecha, dtime.min).timestamp()
+
+
+class GestionExpiracion:
+    """
+    ---------------------------------------------------------
+    Expiración por bloques con marca de agua.
+    ---------------------------------------------------------
+    Orden de cada pasada: solicitudes, respuestas, matches.
+    Cada bloque vuelve a comprobar el estado en su UPDATE, así
+    que es seguro aunque otra petición lo haya cambiado entre
+    la lectura de candidatos y la escritura.
+    ---------------------------------------------------------
+    """
+
+    ENTIDADES = ("solicitudes", "respuestas", "matches")
+
+    # =========================================================
+    # PASADA COMPLETA
+    # =========================================================
+    @staticmethod
+    def ejecutar_pasada(tamano_lote: int = TAMANO_LOTE_EXPIRACION, pausa: float = 0.0):
+        """
+        ---------------------------------------------------------
+        Expira todas las entidades una vez.
+        ---------------------------------------------------------
+        @param tamano_lote: filas candidatas por transacción
+        @param pausa: segundos de espera entre bloques (cede los
+                      bloqueos a las peticiones de la API)
+        @return: dict con métricas de la pasada:
+                 {segundos, expiradas, entidades: {entidad: {...}}}
+        """
+        inicio = time.monotonic()
+        entidades = {}
+        for entidad in GestionExpiracion.ENTIDADES:
+            entidades[entidad] = GestionExpiracion.expirar_entidad(entidad, tamano_lote, pausa)
+
+        if entidades["matches"]["expiradas"]:
+            EstadisticasCoordinador.invalidarCache()
+
+        return {
+            "segundos": round(time.monotonic() - inicio, 3),
+            "expiradas": sum(e["expiradas"] for e in entidades.values()),
+            "entidades": entidades,
+        }
+
+    @staticmethod
+    def expirar_entidad(entidad: str, tamano_lote: int = TAMANO_LOTE_EXPIRACION, pausa: float = 0.0):
+        """
+        ---------------------------------------------------------
+        Recorre los candidatos de una entidad por bloques.
+        ---------------------------------------------------------
+        Por cada bloque (una transacción):
+        1) Lee hasta `tamano_lote` candidatos después de la marca
+        2) Expira los que siguen vivos (por PK)
+        3) Avanza la marca al último candidato leído
+        4) Commit e incremento de las versiones que ha cambiado
+        Si el proceso se corta, la pasada siguiente continúa desde
+        el último bloque confirmado.
+        ---------------------------------------------------------
+        @return: dict {revisadas, expiradas, lotes, segundos, marca}
+        """
+        sql, col_fecha, col_id = _CANDIDATOS[entidad]
+        expirar = getattr(GestionExpiracion, f"_expirar_{entidad}_tx")
+
+        inicio = time.monotonic()
+        revisadas = expiradas = lotes = 0
+        marca = GestionExpiracion.leer_marca(entidad)
+
+        while True:
+            conn = conecta_rhinder_tx()
+            try:
+                cond, params = condicion_cursor(col_fecha, col_id, marca, "asc")
+                candidatos = ejecuta_all_tx(
+                    conn, sql.format(cursor=cond), list(params) + [int(tamano_lote)]
+                )
+                if not candidatos:
+                    conn.rollback()
+                    break
+
+                claves = set()
+                expiradas += expirar(conn, [c["id"] for c in candidatos], claves)
+
+                ultimo = candidatos[-1]
+                marca = (ultimo["fecha"], ultimo["id"])
+                GestionExpiracion._guardar_marca_tx(conn, entidad, marca)
+
+                conn.commit()
+                GestionVersiones.incrementar(*claves)
+
+            except Exception:
+                conn.rollback()
+                raise
+
+            finally:
+                conn.close()
+
+            revisadas += len(candidatos)
+            lotes += 1
+
+            if len(candidatos) < tamano_lote:
+                break
+            if pausa:
+                time.sleep(pausa)
+
+        return {
+            "revisadas": revisadas,
+            "expiradas": expiradas,
+            "lotes": lotes,
+            "segundos": round(time.monotonic() - inicio, 3),
+            "marca": str(marca[0])[:10] if marca else None,
+        }
+
+    # =========================================================
+    # MARCA DE AGUA
+    # =========================================================
+    @staticmethod
+    def leer_marca(entidad: str):
+        """
+        @return: (fecha, id) del último candidato procesado, o None
+        """
+        conn = conecta_rhinder_tx()
+        try:
+            fila = ejecuta_one_tx(
+                conn,
+                "SELECT fecha, id FROM expiracion_marca WHERE entidad = %s",
+                [entidad]
+            )
+            conn.rollback()
+        finally:
+            conn.close()
+        return (fila["fecha"], fila["id"]) if fila else None
+
+    @staticmethod
+    def _guardar_marca_tx(conn, entidad: str, marca):
+        ejecuta_update_delete_tx(conn, """
+            INSERT INTO expiracion_marca (entidad, fecha, id)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE fecha = VALUES(fecha), id = VALUES(id)
+        """, [entidad, marca[0], marca[1]])
+
+    # =========================================================
+    # EXPIRACIÓN DE UN BLOQUE (sin commit)
+    # =========================================================
+    # Cada manejador añade a `claves` las versiones (DB_Versiones) que
+    # cambian; se incrementan después del commit del bloque.
+    @staticmethod
+    def _expirar_solicitudes_tx(conn, ids, claves):
+        """
+        Solicitudes activas PENDIENTE/RESPONDIDA -> EXPIRADA.
+        Cambian las recibidas de todos: versión "solicitudes".
+        """
+        expiradas = ejecuta_update_delete_tx(conn, f"""
+            UPDATE solicitud
+            SET estado = 'EXPIRADA'
+            WHERE id_solicitud IN ({_en(ids)})
+              AND is_activa = 1
+              AND estado IN ('PENDIENTE', 'RESPONDIDA')
+        """, ids)
+        if expiradas:
+            claves.add(VERSION_SOLICITUDES)
+        return expiradas
+
+    @staticmethod
+    def _expirar_respuestas_tx(conn, ids, claves):
+        """
+        Respuestas PENDIENTE con la solicitud aún viva: se cuentan en
+        el aviso del receptor y se borran para que pueda volver a
+        responder (ver GestionRespuestas._limpiar_expiradas_tx).
+        Cambian las respuestas del receptor y del emisor.
+        """
+        filas = ejecuta_all_tx(conn, f"""
+            SELECT r.id_respuesta, r.id_receptor, s.id_emisor
+            FROM respuesta r
+            JOIN solicitud s ON s.id_solicitud = r.id_solicitud
+            WHERE r.id_respuesta IN ({_en(ids)})
+              AND r.estado = 'PENDIENTE'
+              AND s.is_activa = 1
+              AND s.estado IN ('PENDIENTE', 'RESPONDIDA')
+            FOR UPDATE
+        """, ids)
+        for f in filas:
+            claves.update([clave_respuestas(f["id_receptor"]), clave_respuestas(f["id_emisor"])])
+        return GestionRespuestas._limpiar_expiradas_tx(conn, filas)
+
+    @staticmethod
+    def _expirar_matches_tx(conn, ids, claves):
+        """
+        Matches PENDIENTE_VALIDACION -> EXPIRADO, con su validación
+        EXPIRADA (sin actor) para el historial del coordinador.
+        Actualiza también los agregados de estadísticas.
+        Cambian los matches del emisor y del receptor.
+        """
+        filas = ejecuta_all_tx(conn, f"""
+            SELECT m.id_match, m.id_receptor, s.id_emisor
+            FROM `match` m
+            JOIN solicitud s ON s.id_solicitud = m.id_solicitud
+            WHERE m.id_match IN ({_en(ids)})
+              AND m.estado = 'PENDIENTE_VALIDACION'
+            FOR UPDATE OF m
+        """, ids)
+        ids = [f["id_match"] for f in filas]
+        if not ids:
+            return 0
+        for f in filas:
+            claves.update([clave_matches(f["id_receptor"]), clave_matches(f["id_emisor"])])
+
+        # Validaciones que se sobrescriben (para restar del agregado diario)
+        anteriores = ejecuta_all_tx(conn, f"""
+            SELECT estado, fecha_validacion
+            FROM validacion
+            WHERE id_match IN ({_en(ids)})
+        """, ids)
+
+        ejecuta_update_delete_tx(conn, f"""
+            UPDATE `match`
+            SET estado = 'EXPIRADO',
+                visto_por_emisor = 0,
+                visto_por_receptor = 0,
+                visto_por_coordinador = 0
+            WHERE id_match IN ({_en(ids)})
+        """, ids)
+
+        ejecuta_update_delete_tx(conn, f"""
+            INSERT INTO validacion (id_match, id_admin, estado, visto_por_coordinador)
+            VALUES {', '.join(["(%s, NULL, 'EXPIRADA', 0)"] * len(ids))}
+            ON DUPLICATE KEY UPDATE
+                estado = 'EXPIRADA',
+                fecha_validacion = CURRENT_TIMESTAMP,
+                visto_por_coordinador = 0
+        """, ids)
+
+        EstadisticasCoordinador.registrar_validaciones_tx(
+            conn,
+            ["EXPIRADA"] * len(ids),
+            [(f["fecha_validacion"], f["estado"]) for f in anteriores]
+        )
+        EstadisticasCoordinador.sumar_pendientes_tx(conn, -len(ids))
+
+        return len(ids)
+
+
+class MotorExpiracion:
+    """
+    ---------------------------------------------------------
+    Expiración guiada por plazos (cola ordenada en memoria).
+    ---------------------------------------------------------
+    - cargar(): reconstruye el heap (plazo, entidad, id) con
+      todas las filas vivas. Se llama al arrancar y, de vez en
+      cuando, para recoger fechas cambiadas por un intercambio.
+    - refrescar(): añade solo las filas creadas desde la última
+      lectura (rango por PK, con margen para transacciones que
+      confirman tarde).
+    - procesar_vencidas(): saca del heap lo que ya ha vencido y
+      lo expira por bloques con los mismos manejadores que la
+      pasada por marca de agua.
+    Antes de expirar se vuelve a comprobar en la BD que cada id
+    sigue vivo y vencido; si sigue vivo pero aún no vence (fecha
+    cambiada, reloj de la BD por detrás) se vuelve a encolar.
+    El coste depende de lo que vence, no del tamaño de las tablas.
+    No es seguro entre hilos: lo usa un único bucle.
+    ---------------------------------------------------------
+    """
+
+    # Ids por debajo del último visto que se releen al refrescar
+    MARGEN_REFRESCO = 1000
+    # Segundos hasta reintentar un id vivo que la BD aún no da por vencido
+    REINTENTO = 30
+
+    def __init__(self, tamano_lote: int = TAMANO_LOTE_EXPIRACION):
+        self.tamano_lote = tamano_lote
+        self._heap = []
+        self._en_cola = set()      # (entidad, id) presentes en el heap
+        self._ultimo_id = {}       # entidad -> mayor id leído
+
+    def __len__(self):
+        return len(self._heap)
+
+    # =========================================================
+    # CARGA DE PLAZOS
+    # =========================================================
+    def cargar(self):
+        """
+        Reconstruye la cola con todas las filas vivas.
+        @return: número de plazos en cola
+        """
+        self._heap = []
+        self._en_cola = set()
+        self._ultimo_id = {}
+        for entidad in GestionExpiracion.ENTIDADES:
+            for fila in self._leer_vivas(entidad):
+                self._encolar(entidad, fila["id"], _plazo(fila["fecha"]))
+        return len(self._heap)
+
+    def refrescar(self):
+        """
+        Encola las filas vivas creadas desde la última lectura.
+        @return: número de plazos nuevos
+        """
+        antes = len(self._heap)
+        for entidad in GestionExpiracion.ENTIDADES:
+            desde = self._ultimo_id.get(entidad, 0) - self.MARGEN_REFRESCO
+            _, col_id = _VIVAS[entidad]
+            for fila in self._leer_vivas(entidad, f"AND {col_id} > %s", [desde]):
+                self._encolar(entidad, fila["id"], _plazo(fila["fecha"]))
+        return len(self._heap) - antes
+
+    def proximo_plazo(self):
+        """
+        @return: epoch del primer vencimiento en cola, o None
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def _leer_vivas(self, entidad, filtro="", params=()):
+        sql, _ = _VIVAS[entidad]
+        conn = conecta_rhinder_tx()
+        try:
+            filas = ejecuta_all_tx(conn, sql.format(filtro=filtro), list(params)) or []
+            conn.rollback()
+        finally:
+            conn.close()
+
+        if filas:
+            ultimo = max(int(f["id"]) for f in filas)
+            if ultimo > self._ultimo_id.get(entidad, 0):
+                self._ultimo_id[entidad] = ultimo
+        return filas
+
+    def _encolar(self, entidad, id_, plazo):
+        clave = (entidad, int(id_))
+        if clave in self._en_cola:
+            return
+        self._en_cola.add(clave)
+        heapq.heappush(self._heap, (plazo, entidad, int(id_)))
+
+    # =========================================================
+    # EXPIRACIÓN DE LO VENCIDO
+    # =========================================================
+    def procesar_vencidas(self, ahora: float = None):
+        """
+        ---------------------------------------------------------
+        Expira los ids cuyo plazo ya ha llegado.
+        ---------------------------------------------------------
+        @param ahora: epoch de referencia (por defecto time.time())
+        @return: dict con métricas:
+                 {vencidas, expiradas, reencoladas, segundos,
+                  en_cola, entidades: {entidad: expiradas}}
+        """
+        inicio = time.monotonic()
+        ahora = time.time() if ahora is None else ahora
+
+        vencidas = {}
+        while self._heap and self._heap[0][0] <= ahora:
+            _, entidad, id_ = heapq.heappop(self._heap)
+            self._en_cola.discard((entidad, id_))
+            vencidas.setdefault(entidad, []).append(id_)
+
+        entidades = {}
+        reencoladas = 0
+        for entidad in GestionExpiracion.ENTIDADES:
+            ids = vencidas.get(entidad)
+            if not ids:
+                continue
+            entidades[entidad] = 0
+            for i in range(0, len(ids), self.tamano_lote):
+                bloque = ids[i:i + self.tamano_lote]
+                expiradas, no_vencidas = self._expirar_bloque(entidad, bloque)
+                entidades[entidad] += expiradas
+                if no_vencidas:
+                    reencoladas += self._reencolar(entidad, no_vencidas, ahora)
+
+        if entidades.get("matches"):
+            EstadisticasCoordinador.invalidarCache()
+
+        return {
+            "vencidas": sum(len(v) for v in vencidas.values()),
+            "expiradas": sum(entidades.values()),
+            "reencoladas": reencoladas,
+            "segundos": round(time.monotonic() - inicio, 3),
+            "en_cola": len(self._heap),
+            "entidades": entidades,
+        }
+
+    @staticmethod
+    def _expirar_bloque(entidad, ids):
+        """
+        Una transacción: filtra los ids que siguen vivos y vencidos
+        (misma consulta que los candidatos de la pasada) y los expira.
+        @return: (expiradas, ids que la BD aún no da por vencidos)
+        """
+        sql, _, col_id = _CANDIDATOS[entidad]
+        expirar = getattr(GestionExpiracion, f"_expirar_{entidad}_tx")
+
+        conn = conecta_rhinder_tx()
+        try:
+            filas = ejecuta_all_tx(
+                conn,
+                sql.format(cursor=f" AND {col_id} IN ({_en(ids)})"),
+                list(ids) + [len(ids)]
+            )
+            a_expirar = [f["id"] for f in filas]
+            claves = set()
+            expiradas = expirar(conn, a_expirar, claves) if a_expirar else 0
+            conn.commit()
+            GestionVersiones.incrementar(*claves)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        return expiradas, sorted(set(ids) - set(a_expirar))
+
+    def _reencolar(self, entidad, ids, ahora):
+        """
+        Vuelve a encolar los ids que siguen vivos con su fecha actual
+        (nunca antes de REINTENTO segundos). Los demás se descartan.
+        """
+        _, col_id = _VIVAS[entidad]
+        filas = self._leer_vivas(entidad, f"AND {col_id} IN ({_en(ids)})", ids)
+        for fila in filas:
+            plazo = max(_plazo(fila["fecha"]), ahora + self.REINTENTO)
+            self._encolar(entidad, fila["id"], plazo)
+        return len(filas)
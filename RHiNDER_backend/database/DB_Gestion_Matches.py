@@ -4,37 +4,32 @@ Operaciones relacionadas con el historial de matches de cambio de turno.
 
 from .DB_Conexion import (
     ejecuta_all,
-    ejecuta_insert,
     ejecuta_one,
+    ejecuta_all_tx,
     ejecuta_update_delete_tx,
     ejecuta_one_tx,
     ejecuta_insert_tx,
     conecta_rhinder_tx
 )
+from .DB_Cache import CacheTTL
+from .DB_Catalogo import catalogo
+from .DB_Gestion_Validaciones import GestionValidaciones
+from .DB_Estadisticas_Coordinador import EstadisticasCoordinador
+from .DB_Versiones import (
+    GestionVersiones,
+    VERSION_SOLICITUDES,
+    clave_matches,
+    clave_respuestas,
+    clave_turnos,
+    clave_usuario
+)
+from .DB_Paginacion import condicion_cursor, condicion_filtros, orden_keyset, cortar_pagina
 
 
-class GestionMatches:
-
-    @staticmethod
-    def getHistorialMatchesUsuario(user_id):
-        """
-        Devuelve el historial de matches (intercambios) en los que participa un usuario.
-
-        Incluye:
-        - Datos del match (estado, fechas)
-        - Usuario emisor y receptor (usernames)
-        - Validación asociada (si existe): estado, fecha, comentario
-        - Snapshot del intercambio (fechas + nomenclaturas guardadas en match)
-        - Flags de visto (emisor/receptor)
-        - Rol del usuario dentro del match: EMISOR / RECEPTOR / OTRO
-
-        Parámetros:
-        - user_id: id_trabajador del usuario actual
-
-        Devuelve:
-        - Lista de filas (dict) ordenadas por la última actividad del match.
-        """
-        sql = """
+# Historial de matches de un usuario: columnas + JOINs comunes al listado
+# completo y a la versión paginada.
+# Parámetros: (user_id, user_id, user_id, user_id)
+_SQL_HISTORIAL = """
               SELECT m.id_match, 
                      m.estado                AS estado_match, 
                      m.fecha_match, 
@@ -70,26 +65,142 @@ class GestionMatches:
                        LEFT JOIN validacion v ON v.id_match = m.id_match
 
               WHERE (s.id_emisor = %s OR m.id_receptor = %s)
-              ORDER BY m.fecha_ultimo_cambio DESC, m.fecha_match DESC
-              """
+"""
+
+# Filtro de estado del historial (valores de filtros_matches.js)
+ESTADOS_FILTRO = {
+    "pendiente_validacion": ("PENDIENTE_VALIDACION",),
+    "validado": ("VALIDADO",),
+    "rechazado": ("RECHAZADO",),
+    "expirado": ("EXPIRADO",),
+}
+
+# Totales del historial por usuario y filtros (TTL corto; se limpia al
+# crear, validar o denegar un match)
+_cache_totales = CacheTTL(ttl=60, max_size=1024)
+
+# Validación en bloque: matches por transacción y estado de validación
+# que corresponde a cada estado final del match
+TAMANO_LOTE_VALIDACION = 50
+ESTADO_MATCH_POR_VALIDACION = {
+    "APROBADA": "VALIDADO",
+    "RECHAZADA": "RECHAZADO",
+}
+
+
+class GestionMatches:
+
+    @staticmethod
+    def getHistorialMatchesUsuario(user_id):
+        """
+        Devuelve el historial de matches (intercambios) en los que participa un usuario.
+
+        Incluye:
+        - Datos del match (estado, fechas)
+        - Usuario emisor y receptor (usernames)
+        - Validación asociada (si existe): estado, fecha, comentario
+        - Snapshot del intercambio (fechas + nomenclaturas guardadas en match)
+        - Flags de visto (emisor/receptor)
+        - Rol del usuario dentro del match: EMISOR / RECEPTOR / OTRO
+
+        Parámetros:
+        - user_id: id_trabajador del usuario actual
+
+        Devuelve:
+        - Lista de filas (dict) ordenadas por la última actividad del match.
+        """
+        sql = _SQL_HISTORIAL + " ORDER BY m.fecha_ultimo_cambio DESC, m.fecha_match DESC"
         return ejecuta_all(sql, (user_id, user_id, user_id, user_id))
 
+    @staticmethod
+    def getHistorialMatchesPagina(user_id, limite: int, cursor=None, estado=None,
+                                  desde=None, hasta=None, orden="desc"):
+        """
+        Devuelve una página del historial de matches de un usuario (keyset).
+
+        Mismas columnas que getHistorialMatchesUsuario, pero:
+        - ordenado por (fecha_match, id_match)
+        - continúa a partir de `cursor` en vez de usar OFFSET
+        - filtra en la BD por estado y rango de fecha_match
+
+        Parámetros:
+        - user_id: id_trabajador del usuario actual
+        - limite: número máximo de filas de la página
+        - cursor: (fecha_match, id_match) de la última fila de la página anterior, o None
+        - estado: clave de ESTADOS_FILTRO o None
+        - desde / hasta: date (incluidos) o None
+        - orden: "desc" (más nuevos primero) | "asc"
+
+        Devuelve:
+        - (lista de filas, cursor siguiente o None)
+        """
+        sql_filtros, p_filtros = condicion_filtros(
+            "m.estado", "m.fecha_match", ESTADOS_FILTRO.get(estado), desde, hasta
+        )
+        sql_cursor, p_cursor = condicion_cursor("m.fecha_match", "m.id_match", cursor, orden)
+
+        sql = (
+            _SQL_HISTORIAL
+            + sql_filtros
+            + sql_cursor
+            + orden_keyset("m.fecha_match", "m.id_match", orden)
+            + " LIMIT %s"
+        )
+        params = (user_id,) * 4 + p_filtros + p_cursor + (limite + 1,)
+        filas = ejecuta_all(sql, params)
+
+        return cortar_pagina(filas, limite, "fecha_match", "id_match")
+
+    @staticmethod
+    def contarHistorialMatches(user_id, estado=None, desde=None, hasta=None) -> int:
+        """
+        Devuelve cuántos matches del usuario cumplen los filtros del historial.
+
+        El resultado se guarda en caché unos segundos (se limpia al crear,
+        validar o denegar un match).
+        """
+        clave = ("matches", user_id, estado, desde, hasta)
+        total = _cache_totales.obtener(clave)
+        if total is not None:
+            return total
+
+        sql_filtros, params = condicion_filtros(
+            "m.estado", "m.fecha_match", ESTADOS_FILTRO.get(estado), desde, hasta
+        )
+        sql = f"""
+              SELECT COUNT(*) AS total
+              FROM `match` m
+                       JOIN solicitud s ON s.id_solicitud = m.id_solicitud
+              WHERE (s.id_emisor = %s OR m.id_receptor = %s)
+              {sql_filtros}
+              """
+        fila = ejecuta_one(sql, (user_id, user_id) + params)
+
+        total = int(fila["total"]) if fila else 0
+        _cache_totales.guardar(clave, total)
+        return total
+
     @staticmethod
     def crear_match(id_solicitud, id_respuesta):
         """
         Crea un match a partir de una solicitud y una respuesta elegida como ganadora.
 
-        Flujo:
-        1) Lee el receptor (trabajador) asociado a la respuesta.
-        2) Marca esa respuesta como SELECCIONADA (es_ganadora=1).
-        3) Marca el resto de respuestas de la solicitud como NO_SELECCIONADA.
-        4) Obtiene un snapshot (antes del swap) de:
+        Todo se ejecuta en UNA transacción y UNA conexión:
+        1) Bloquea SOLO la fila de la solicitud y después lee (sin bloqueo) el
+           receptor de la respuesta y el snapshot (antes del swap) de:
            - fecha + nomenclatura del turno del emisor (turno solicitado)
            - fecha + nomenclatura del turno ofrecido por el receptor
-        5) Inserta el match en estado PENDIENTE_VALIDACION con:
+        2) Marca la respuesta elegida como SELECCIONADA (es_ganadora=1) y el resto
+           de respuestas de la solicitud como NO_SELECCIONADA (un único UPDATE con CASE).
+        3) Inserta el match en estado PENDIENTE_VALIDACION con:
            - snapshots
            - flags visto a 0 (emisor, receptor, coordinador)
-        6) Marca la solicitud como CONTESTADA.
+        4) Marca la solicitud como CONTESTADA.
+
+        El SELECT ... FOR UPDATE sobre la solicitud serializa dos aceptaciones
+        simultáneas de la misma solicitud: la segunda espera y encuentra el match
+        ya creado (409). turno / tipo_turno / match no se bloquean, así que
+        aceptaciones de otras solicitudes con el mismo día o tipo no esperan.
 
         Parámetros:
         - id_solicitud: solicitud sobre la que se decide el intercambio
@@ -98,109 +209,141 @@ class GestionMatches:
         Devuelve:
         - dict con msg + ids, o error y código HTTP (en caso de uso vía API)
         """
+        conn = conecta_rhinder_tx()
+        try:
+            # ------------------------------------------------------------------
+            # 1.a) Bloqueo de la solicitud (solo esa fila) hasta el commit.
+            #      Es la primera lectura de la TX: la lectura sin bloqueo de 1.b
+            #      toma su instantánea DESPUÉS de obtener el bloqueo y ve el match
+            #      que haya confirmado una aceptación concurrente.
+            # ------------------------------------------------------------------
+            bloqueo = ejecuta_one_tx(
+                conn,
+                "SELECT id_solicitud FROM solicitud WHERE id_solicitud = %s FOR UPDATE",
+                [id_solicitud]
+            )
 
-        # 1) Obtener el receptor de la respuesta (quién responde/ofrece turno)
-        sql_resp = """
-                   SELECT id_receptor
-                   FROM respuesta
-                   WHERE id_respuesta = %s LIMIT 1 
-                   """
-        resp = ejecuta_one(sql_resp, [id_respuesta])
-        if not resp:
-            # Si no existe esa respuesta, no podemos crear el match
-            return {"error": "La respuesta no existe"}, 404
-
-        id_receptor = resp["id_receptor"]
-
-        # 2) Marcar la respuesta elegida como ganadora/seleccionada
-        sql_ganadora = """
-                       UPDATE respuesta
-                       SET estado      = 'SELECCIONADA',
-                           es_ganadora = 1
-                       WHERE id_respuesta = %s 
-                       """
-        ejecuta_all(sql_ganadora, [id_respuesta])
-
-        # 3) Marcar el resto de respuestas de esa solicitud como NO seleccionadas
-        #    (así solo queda una ganadora)
-        sql_otras = """
-                    UPDATE respuesta
-                    SET estado      = 'NO_SELECCIONADA',
-                        es_ganadora = 0
-                    WHERE id_solicitud = %s
-                      AND id_respuesta <> %s 
-                    """
-        ejecuta_all(sql_otras, [id_solicitud, id_respuesta])
-
-        # ------------------------------------------------------------------
-        # 4) SNAPSHOT de turnos ANTES del swap (fecha + nomenclatura)
-        #    Guardamos qué turno tenía cada uno en ese intercambio, para mostrarlo
-        #    en historial aunque luego cambien asignaciones.
-        # ------------------------------------------------------------------
-        sql_snapshot = """
-                       SELECT te.fecha_turno   AS emisor_fecha, 
-                              tpe.nomenclatura AS emisor_nomenclatura, 
-                              tr.fecha_turno   AS receptor_fecha, 
-                              tpr.nomenclatura AS receptor_nomenclatura
-                       FROM solicitud s
-                                JOIN turno_trabajador tte
-                                     ON tte.id_turno_trabajador = s.id_turno_trabajador
-                                JOIN turno te ON te.id_turno = tte.id_turno
-                                JOIN tipo_turno tpe ON tpe.id_tipo_turno = te.id_tipo_turno
-
-                                JOIN respuesta r
-                                     ON r.id_solicitud = s.id_solicitud
-                                         AND r.id_receptor = %s
-                                JOIN turno_trabajador ttr
-                                     ON ttr.id_turno_trabajador = r.id_turno_trabajador_receptor
-                                JOIN turno tr ON tr.id_turno = ttr.id_turno
-                                JOIN tipo_turno tpr ON tpr.id_tipo_turno = tr.id_tipo_turno
-
-                       WHERE s.id_solicitud = %s LIMIT 1 
-                       """
-        snapshot = ejecuta_one(sql_snapshot, [id_receptor, id_solicitud])
-
-        if not snapshot:
-            # Si falla el snapshot es un problema interno (datos inconsistentes)
-            return {"error": "No se pudo obtener el snapshot de turnos."}, 500
-
-        # ------------------------------------------------------------------
-        # 5) Crear el match con snapshot guardado + flags de visto a 0
-        #    Estado inicial: PENDIENTE_VALIDACION (lo tiene que validar el coordinador/admin)
-        # ------------------------------------------------------------------
-        sql_match = """
-                    INSERT INTO `match`
-                    (id_solicitud, id_receptor, estado,
-                     visto_por_emisor, visto_por_receptor, visto_por_coordinador,
-                     emisor_fecha, emisor_nomenclatura,
-                     receptor_fecha, receptor_nomenclatura)
-                    VALUES (%s, %s, 'PENDIENTE_VALIDACION',
-                            0, 0, 0,
-                            %s, %s, %s, %s) 
-                    """
-        id_match = ejecuta_insert(sql_match, [
-            id_solicitud,
-            id_receptor,
-            snapshot["emisor_fecha"],
-            snapshot["emisor_nomenclatura"],
-            snapshot["receptor_fecha"],
-            snapshot["receptor_nomenclatura"],
-        ])
+            if not bloqueo:
+                conn.rollback()
+                return {"error": "La respuesta no existe"}, 404
+
+            # ------------------------------------------------------------------
+            # 1.b) Receptor + SNAPSHOT de turnos ANTES del swap (fecha + nomenclatura)
+            #      Guardamos qué turno tenía cada uno en ese intercambio, para mostrarlo
+            #      en historial aunque luego cambien asignaciones. Lectura sin bloqueo:
+            #      turno y tipo_turno son filas compartidas por muchas solicitudes.
+            # ------------------------------------------------------------------
+            sql_snapshot = """
+                           SELECT r.id_receptor,
+                                  s.id_emisor,
+                                  m.id_match        AS id_match_existente,
+                                  te.fecha_turno    AS emisor_fecha,
+                                  tpe.nomenclatura  AS emisor_nomenclatura,
+                                  tr.fecha_turno    AS receptor_fecha,
+                                  tpr.nomenclatura  AS receptor_nomenclatura
+                           FROM respuesta r
+                                    JOIN solicitud s
+                                         ON s.id_solicitud = r.id_solicitud
+                                    JOIN turno_trabajador tte
+                                         ON tte.id_turno_trabajador = s.id_turno_trabajador
+                                    JOIN turno te ON te.id_turno = tte.id_turno
+                                    JOIN tipo_turno tpe ON tpe.id_tipo_turno = te.id_tipo_turno
+
+                                    JOIN turno_trabajador ttr
+                                         ON ttr.id_turno_trabajador = r.id_turno_trabajador_receptor
+                                    JOIN turno tr ON tr.id_turno = ttr.id_turno
+                                    JOIN tipo_turno tpr ON tpr.id_tipo_turno = tr.id_tipo_turno
+
+                                    LEFT JOIN `match` m
+                                              ON m.id_solicitud = s.id_solicitud
+
+                           WHERE r.id_respuesta = %s
+                             AND s.id_solicitud = %s LIMIT 1
+                           """
+            snapshot = ejecuta_one_tx(conn, sql_snapshot, [id_respuesta, id_solicitud])
+
+            if not snapshot:
+                # La respuesta no existe o no pertenece a esa solicitud
+                conn.rollback()
+                return {"error": "La respuesta no existe"}, 404
+
+            if snapshot["id_match_existente"]:
+                # Otra aceptación concurrente ya creó el match de esta solicitud
+                conn.rollback()
+                return {"error": "La solicitud ya tiene un match."}, 409
+
+            id_receptor = snapshot["id_receptor"]
+
+            # 2) Ganadora = SELECCIONADA, resto = NO_SELECCIONADA (así solo queda una)
+            sql_respuestas = """
+                             UPDATE respuesta
+                             SET estado      = CASE
+                                                   WHEN id_respuesta = %s THEN 'SELECCIONADA'
+                                                   ELSE 'NO_SELECCIONADA'
+                                 END,
+                                 es_ganadora = (id_respuesta = %s)
+                             WHERE id_solicitud = %s
+                             """
+            ejecuta_update_delete_tx(conn, sql_respuestas, [id_respuesta, id_respuesta, id_solicitud])
+
+            # ------------------------------------------------------------------
+            # 3) Crear el match con snapshot guardado + flags de visto a 0
+            #    Estado inicial: PENDIENTE_VALIDACION (lo tiene que validar el coordinador/admin)
+            # ------------------------------------------------------------------
+            sql_match = """
+                        INSERT INTO `match`
+                        (id_solicitud, id_receptor, estado,
+                         visto_por_emisor, visto_por_receptor, visto_por_coordinador,
+                         emisor_fecha, emisor_nomenclatura,
+                         receptor_fecha, receptor_nomenclatura)
+                        VALUES (%s, %s, 'PENDIENTE_VALIDACION',
+                                0, 0, 0,
+                                %s, %s, %s, %s) 
+                        """
+            id_match = ejecuta_insert_tx(conn, sql_match, [
+                id_solicitud,
+                id_receptor,
+                snapshot["emisor_fecha"],
+                snapshot["emisor_nomenclatura"],
+                snapshot["receptor_fecha"],
+                snapshot["receptor_nomenclatura"],
+            ])
 
-        # 6) Actualizar la solicitud para reflejar que ya fue “cerrada” por elección de respuesta
-        sql_sol = """
-                  UPDATE solicitud
-                  SET estado = 'CONTESTADA'
-                  WHERE id_solicitud = %s 
-                  """
-        ejecuta_all(sql_sol, [id_solicitud])
+            # 4) Actualizar la solicitud para reflejar que ya fue “cerrada” por elección de respuesta
+            ejecuta_update_delete_tx(
+                conn,
+                "UPDATE solicitud SET estado = 'CONTESTADA' WHERE id_solicitud = %s",
+                [id_solicitud]
+            )
 
-        return {
-            "msg": "Match creado correctamente",
-            "id_match": id_match,
-            "id_solicitud": id_solicitud,
-            "id_receptor": id_receptor
-        }
+            # 5) Un pendiente de validación más para el panel del coordinador
+            EstadisticasCoordinador.sumar_pendientes_tx(conn, 1)
+
+            conn.commit()
+            _cache_totales.limpiar()
+            EstadisticasCoordinador.invalidarCache()
+            # La solicitud deja de verse en las recibidas de todos ("solicitudes");
+            # el resto solo cambia para emisor y receptor
+            GestionVersiones.incrementar(
+                VERSION_SOLICITUDES,
+                clave_matches(snapshot["id_emisor"]),
+                clave_matches(id_receptor),
+                clave_respuestas(snapshot["id_emisor"])
+            )
+            return {
+                "msg": "Match creado correctamente",
+                "id_match": id_match,
+                "id_solicitud": id_solicitud,
+                "id_receptor": id_receptor
+            }
+
+        except Exception as e:
+            # Si algo falla, deshacemos todo (evita matches a medias)
+            conn.rollback()
+            return {"error": f"Error interno: {str(e)}"}, 500
+
+        finally:
+            conn.close()
 
     # =========================================================
     # MATCHES PENDIENTES DE VALIDACIÓN (COORDINADOR)
@@ -265,7 +408,8 @@ class GestionMatches:
         3) Crea o actualiza la fila de validación (estado=APROBADA).
         4) Actualiza el match a estado VALIDADO y resetea flags visto (para notificar a todos).
         5) Ejecuta el swap real de turnos (cambios en turno_trabajador).
-        6) Commit. Si algo falla: rollback.
+        6) Actualiza los agregados de estadísticas del coordinador.
+        7) Commit. Si algo falla: rollback.
 
         Parámetros:
         - id_match: match a validar
@@ -285,7 +429,7 @@ class GestionMatches:
             # 2) Comprobar si ya hay una validación creada para este match
             fila = ejecuta_one_tx(
                 conn,
-                "SELECT id_validacion FROM validacion WHERE id_match=%s LIMIT 1",
+                "SELECT id_validacion, estado, fecha_validacion FROM validacion WHERE id_match=%s LIMIT 1",
                 [id_match]
             )
 
@@ -330,10 +474,27 @@ class GestionMatches:
             )
 
             # 4) Intercambio real de turnos (cambios en turno_trabajador / turno)
-            GestionMatches._swap_turnos_tx(conn, info)
+            turnos_creados = GestionMatches._swap_turnos_tx(conn, info)
+            claves = GestionMatches._claves_swap_tx(conn, [info["id_emisor"], info["id_receptor"]])
+
+            # 5) Agregados del panel del coordinador
+            GestionMatches._actualizar_estadisticas_tx(conn, info, "APROBADA", fila)
 
             conn.commit()
-            return {"ok": True, "msg": "Match validado correctamente."}, 200
+            # Los turnos L nuevos solo se publican en el catálogo tras el commit
+            catalogo.registrar_turnos(turnos_creados)
+            _cache_totales.limpiar()
+            EstadisticasCoordinador.invalidarCache()
+            GestionValidaciones.invalidarTotalesHistorial()
+            GestionVersiones.incrementar(
+                clave_matches(info["id_emisor"]), clave_matches(info["id_receptor"]), *claves
+            )
+            return {
+                "ok": True,
+                "msg": "Match validado correctamente.",
+                "id_emisor": info["id_emisor"],
+                "id_receptor": info["id_receptor"],
+            }, 200
 
         except Exception as e:
             # Si algo falla, deshacemos todo (evita datos a medias)
@@ -357,7 +518,8 @@ class GestionMatches:
         3) Crea o actualiza la fila de validación (estado=RECHAZADA).
         4) Actualiza el match a estado RECHAZADO y resetea flags visto.
         5) (Opcional) Cambia el estado de la solicitud a RECHAZADA.
-        6) Commit. Si falla: rollback.
+        6) Actualiza los agregados de estadísticas del coordinador.
+        7) Commit. Si falla: rollback.
 
         Parámetros:
         - id_match: match a denegar
@@ -377,7 +539,7 @@ class GestionMatches:
             # 2) ¿Existe ya una validación? (si existe, se actualiza)
             fila = ejecuta_one_tx(
                 conn,
-                "SELECT id_validacion FROM validacion WHERE id_match=%s LIMIT 1",
+                "SELECT id_validacion, estado, fecha_validacion FROM validacion WHERE id_match=%s LIMIT 1",
                 [id_match]
             )
 
@@ -428,8 +590,20 @@ class GestionMatches:
                 [info["id_solicitud"]]
             )
 
+            # 5) Agregados del panel del coordinador
+            GestionMatches._actualizar_estadisticas_tx(conn, info, "RECHAZADA", fila)
+
             conn.commit()
-            return {"ok": True, "msg": "Match denegado correctamente."}, 200
+            _cache_totales.limpiar()
+            EstadisticasCoordinador.invalidarCache()
+            GestionValidaciones.invalidarTotalesHistorial()
+            GestionVersiones.incrementar(clave_matches(info["id_emisor"]), clave_matches(info["id_receptor"]))
+            return {
+                "ok": True,
+                "msg": "Match denegado correctamente.",
+                "id_emisor": info["id_emisor"],
+                "id_receptor": info["id_receptor"],
+            }, 200
 
         except Exception as e:
             conn.rollback()
@@ -438,6 +612,64 @@ class GestionMatches:
         finally:
             conn.close()
 
+    # =========================================================
+    # VALIDAR / DENEGAR VARIOS MATCHES (TX POR BLOQUES)
+    # =========================================================
+    @staticmethod
+    def validar_denegar_lote(decisiones: list, id_admin: int, tipo_actor: str):
+        """
+        Valida o deniega muchos matches de una vez.
+
+        Qué hace:
+        - Trocea las decisiones en bloques de TAMANO_LOTE_VALIDACION.
+        - Cada bloque es UNA transacción con operaciones por conjuntos:
+            * 1 SELECT ... FOR UPDATE OF m con la info de todos los matches
+            * 1 UPDATE de `match` por estado final, solo de los que siguen
+              PENDIENTE_VALIDACION (el resto se devuelve como 409)
+            * 1 INSERT multi-fila ... ON DUPLICATE KEY UPDATE en validacion
+              y 1 UPDATE de solicitud (rechazos)
+            * los swaps de los aprobados, aplicados juntos
+        - Si un bloque falla se deshace solo ese bloque; los anteriores
+          ya confirmados se mantienen.
+
+        Parámetros:
+        - decisiones: lista de dicts {id_match, estado ('APROBADA'|'RECHAZADA'), comentario}
+        - id_admin: id del actor que valida (coordinador/admin)
+        - tipo_actor: texto del rol
+
+        Devuelve:
+        - lista de resultados, en el orden de entrada:
+          {id_match, ok, code, msg[, estado, id_emisor, id_receptor]}
+        """
+        resultados = []
+        vistos = set()
+        pendientes = []
+
+        # Un mismo match solo se procesa una vez por petición
+        for d in decisiones:
+            if d["id_match"] in vistos:
+                resultados.append({
+                    "id_match": d["id_match"], "ok": False, "code": 409,
+                    "msg": "Match repetido en la petición.",
+                })
+                continue
+            vistos.add(d["id_match"])
+            resultados.append(None)
+            pendientes.append((len(resultados) - 1, d))
+
+        for i in range(0, len(pendientes), TAMANO_LOTE_VALIDACION):
+            bloque = pendientes[i:i + TAMANO_LOTE_VALIDACION]
+            salida = GestionMatches._validar_denegar_bloque_tx([d for _, d in bloque], id_admin)
+            for (pos, _), resultado in zip(bloque, salida):
+                resultados[pos] = resultado
+
+        if any(r["ok"] for r in resultados):
+            _cache_totales.limpiar()
+            EstadisticasCoordinador.invalidarCache()
+            GestionValidaciones.invalidarTotalesHistorial()
+
+        return resultados
+
     @staticmethod
     def marcar_matches_como_vistos(user_id: int, tipo_actor: str = "trabajador"):
         """
@@ -502,6 +734,7 @@ class GestionMatches:
                          AND visto_por_receptor = 0 
                        """
         ejecuta_all(sql_receptor, [user_id])
+        GestionVersiones.incrementar(clave_usuario(user_id))
 
         return {
             "ok": True,
@@ -518,34 +751,311 @@ class GestionMatches:
         Lee la información mínima del match necesaria para operar en TX (validar/denegar/swap).
 
         Devuelve:
-        - id_match, id_solicitud
+        - id_match, estado, id_solicitud
         - id_emisor (dueño de la solicitud)
         - id_receptor (quien ofreció el turno ganador)
         - id_asig_emisor: id_turno_trabajador del turno que el emisor ofrecía
         - id_asig_receptor: id_turno_trabajador del turno que el receptor ofrecía
+        - turno_emisor / fecha_emisor: id_turno y fecha actuales de id_asig_emisor
+        - turno_receptor / fecha_receptor: id_turno y fecha actuales de id_asig_receptor
+          (None si la asignación ya no existe)
 
         Nota:
         - Se enlaza con respuesta para localizar la asignación del receptor concreta
           que corresponde al receptor del match (la respuesta ganadora).
+        - Los turnos ofertados se leen aquí para que el swap no tenga que volver
+          a consultarlos.
         """
         sql = """
             SELECT
                 m.id_match,
+                m.estado,
                 m.id_solicitud,
                 s.id_emisor,
                 m.id_receptor,
                 s.id_turno_trabajador AS id_asig_emisor,
-                r.id_turno_trabajador_receptor AS id_asig_receptor
+                r.id_turno_trabajador_receptor AS id_asig_receptor,
+                te.id_turno AS turno_emisor,
+                te.fecha_turno AS fecha_emisor,
+                tr.id_turno AS turno_receptor,
+                tr.fecha_turno AS fecha_receptor
             FROM `match` m
             JOIN solicitud s ON s.id_solicitud = m.id_solicitud
             JOIN respuesta r
               ON r.id_solicitud = s.id_solicitud
              AND r.id_receptor  = m.id_receptor
+            LEFT JOIN turno_trabajador tte ON tte.id_turno_trabajador = s.id_turno_trabajador
+            LEFT JOIN turno te ON te.id_turno = tte.id_turno
+            LEFT JOIN turno_trabajador ttr ON ttr.id_turno_trabajador = r.id_turno_trabajador_receptor
+            LEFT JOIN turno tr ON tr.id_turno = ttr.id_turno
             WHERE m.id_match = %s
             LIMIT 1
         """
         return ejecuta_one_tx(conn, sql, [id_match])
 
+    @staticmethod
+    def _validar_denegar_bloque_tx(decisiones: list, id_admin: int):
+        """
+        Procesa un bloque de decisiones en UNA transacción (ver validar_denegar_lote).
+
+        Devuelve:
+        - lista de resultados en el mismo orden que `decisiones`
+        """
+        conn = conecta_rhinder_tx()
+        resultados = []
+        aceptadas = []
+        try:
+            infos = GestionMatches._obtener_info_matches_tx(
+                conn, [d["id_match"] for d in decisiones]
+            )
+
+            # 1) Comprobaciones por match (no escriben nada)
+            for d in decisiones:
+                info = infos.get(d["id_match"])
+                if not info:
+                    resultado = {"ok": False, "code": 404, "msg": "Match no encontrado."}
+                elif info["estado"] != "PENDIENTE_VALIDACION":
+                    resultado = {"ok": False, "code": 409,
+                                 "msg": "El match ya no está pendiente de validación."}
+                elif d["estado"] == "APROBADA" and (
+                        info["turno_emisor"] is None or info["turno_receptor"] is None):
+                    resultado = {"ok": False, "code": 409,
+                                 "msg": "No se pudieron leer los turnos ofertados."}
+                else:
+                    resultado = {"ok": True, "code": 200}
+                    aceptadas.append((d, info))
+
+                resultado["id_match"] = d["id_match"]
+                resultados.append(resultado)
+
+            if not aceptadas:
+                conn.rollback()
+                return resultados
+
+            # 2) Estado del match, por conjuntos y SOLO si sigue pendiente.
+            #    Es la primera escritura: solo los matches que este UPDATE
+            #    cambia de verdad reciben validación, swap y estadísticas.
+            #    Con el FOR UPDATE del paso 1 no debería quedarse ninguno
+            #    fuera; la condición de estado es la última defensa frente
+            #    a la expiración o a otro coordinador.
+            no_pendientes = set()
+            for estado_validacion, estado_match in ESTADO_MATCH_POR_VALIDACION.items():
+                ids = [d["id_match"] for d, _ in aceptadas if d["estado"] == estado_validacion]
+                if not ids:
+                    continue
+
+                cambiados = ejecuta_update_delete_tx(conn, f"""
+                    UPDATE `match`
+                    SET estado=%s,
+                        visto_por_emisor=0,
+                        visto_por_receptor=0,
+                        visto_por_coordinador=0
+                    WHERE id_match IN ({', '.join(['%s'] * len(ids))})
+                      AND estado='PENDIENTE_VALIDACION'
+                """, [estado_match] + ids)
+
+                if cambiados != len(ids):
+                    filas = ejecuta_all_tx(conn, f"""
+                        SELECT id_match FROM `match`
+                        WHERE id_match IN ({', '.join(['%s'] * len(ids))})
+                          AND estado <> %s
+                    """, ids + [estado_match])
+                    no_pendientes.update(int(f["id_match"]) for f in filas)
+
+            if no_pendientes:
+                aceptadas = [(d, info) for d, info in aceptadas if d["id_match"] not in no_pendientes]
+                for resultado in resultados:
+                    if resultado["ok"] and resultado["id_match"] in no_pendientes:
+                        resultado.update({"ok": False, "code": 409,
+                                          "msg": "El match ya no está pendiente de validación."})
+                if not aceptadas:
+                    conn.rollback()
+                    return resultados
+
+            ids_aceptados = [d["id_match"] for d, _ in aceptadas]
+
+            # Validaciones que se van a sobrescribir (para restar del agregado diario)
+            anteriores = ejecuta_all_tx(conn, f"""
+                SELECT estado, fecha_validacion
+                FROM validacion
+                WHERE id_match IN ({', '.join(['%s'] * len(ids_aceptados))})
+            """, ids_aceptados)
+
+            # 3) Validaciones: un único INSERT multi-fila (upsert) + solicitudes rechazadas
+            GestionMatches._upsert_validaciones_tx(conn, id_admin, [d for d, _ in aceptadas])
+
+            solicitudes_rechazadas = [
+                info["id_solicitud"] for d, info in aceptadas if d["estado"] == "RECHAZADA"
+            ]
+            if solicitudes_rechazadas:
+                ejecuta_update_delete_tx(conn, f"""
+                    UPDATE solicitud
+                    SET estado='RECHAZADA'
+                    WHERE id_solicitud IN ({', '.join(['%s'] * len(solicitudes_rechazadas))})
+                """, solicitudes_rechazadas)
+
+            # 4) Swaps de los aprobados, acumulados en un solo conjunto de cambios.
+            #    Si un match toca un (trabajador, fecha) ya movido en este bloque,
+            #    se aplica lo acumulado y se relee su info, como si fueran uno a uno.
+            turnos_creados = []
+            cambios = {}
+            for d, info in aceptadas:
+                if d["estado"] != "APROBADA":
+                    continue
+
+                nuevos = GestionMatches._cambios_swap(info)
+                if cambios.keys() & nuevos.keys():
+                    turnos_creados += GestionMatches._aplicar_swaps_tx(conn, cambios)
+                    cambios = {}
+                    info = GestionMatches._obtener_info_match_tx(conn, d["id_match"])
+                    nuevos = GestionMatches._cambios_swap(info)
+                cambios.update(nuevos)
+
+            if cambios:
+                turnos_creados += GestionMatches._aplicar_swaps_tx(conn, cambios)
+
+            # Versiones: matches de los participantes y lo que muestra sus turnos
+            claves = set()
+            intercambiados = set()
+            for d, info in aceptadas:
+                claves.update([clave_matches(info["id_emisor"]), clave_matches(info["id_receptor"])])
+                if d["estado"] == "APROBADA":
+                    intercambiados.update([info["id_emisor"], info["id_receptor"]])
+            if intercambiados:
+                claves.update(GestionMatches._claves_swap_tx(conn, intercambiados))
+
+            # 5) Agregados del panel del coordinador (todos estaban pendientes)
+            EstadisticasCoordinador.registrar_validaciones_tx(
+                conn,
+                [d["estado"] for d, _ in aceptadas],
+                [(f["fecha_validacion"], f["estado"]) for f in anteriores]
+            )
+            EstadisticasCoordinador.sumar_pendientes_tx(conn, -len(aceptadas))
+
+            conn.commit()
+            # Los turnos L nuevos solo se publican en el catálogo tras el commit
+            catalogo.registrar_turnos(turnos_creados)
+            GestionVersiones.incrementar(*claves)
+
+            por_id = {d["id_match"]: (d, info) for d, info in aceptadas}
+            for resultado in resultados:
+                if resultado["ok"]:
+                    d, info = por_id[resultado["id_match"]]
+                    resultado.update({
+                        "msg": ("Match validado correctamente." if d["estado"] == "APROBADA"
+                                else "Match denegado correctamente."),
+                        "estado": d["estado"],
+                        "id_emisor": info["id_emisor"],
+                        "id_receptor": info["id_receptor"],
+                    })
+            return resultados
+
+        except Exception as e:
+            # Se deshace el bloque entero: ninguno de sus matches queda a medias
+            conn.rollback()
+            for resultado in resultados:
+                if resultado["ok"]:
+                    resultado.update({"ok": False, "code": 500, "msg": f"Error interno: {str(e)}"})
+            if not resultados:
+                resultados = [
+                    {"id_match": d["id_match"], "ok": False, "code": 500,
+                     "msg": f"Error interno: {str(e)}"}
+                    for d in decisiones
+                ]
+            return resultados
+
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _actualizar_estadisticas_tx(conn, info: dict, estado: str, anterior=None):
+        """
+        Refleja una validación/denegación en los agregados del coordinador
+        (misma transacción, justo antes del commit).
+
+        - +1 en el día de hoy para `estado` y -1 en la validación sobrescrita
+        - -1 en pendientes si el match estaba en PENDIENTE_VALIDACION
+        """
+        anteriores = [(anterior["fecha_validacion"], anterior["estado"])] if anterior else []
+        EstadisticasCoordinador.registrar_validaciones_tx(conn, [estado], anteriores)
+
+        if info.get("estado") == "PENDIENTE_VALIDACION":
+            EstadisticasCoordinador.sumar_pendientes_tx(conn, -1)
+
+    @staticmethod
+    def _obtener_info_matches_tx(conn, ids: list) -> dict:
+        """
+        Igual que _obtener_info_match_tx pero para varios matches en un SELECT,
+        añadiendo el estado actual del match.
+
+        FOR UPDATE OF m: bloquea SOLO las filas de `match` hasta el commit (como
+        DB_Expiracion._expirar_matches_tx), así el estado leído es el actual y
+        ni la expiración ni otro coordinador pueden cambiarlo a mitad del bloque.
+        No se bloquean solicitud / respuesta / turno (filas compartidas).
+
+        Devuelve:
+        - dict {id_match: info}
+        """
+        if not ids:
+            return {}
+
+        sql = f"""
+            SELECT
+                m.id_match,
+                m.estado,
+                m.id_solicitud,
+                s.id_emisor,
+                m.id_receptor,
+                s.id_turno_trabajador AS id_asig_emisor,
+                r.id_turno_trabajador_receptor AS id_asig_receptor,
+                te.id_turno AS turno_emisor,
+                te.fecha_turno AS fecha_emisor,
+                tr.id_turno AS turno_receptor,
+                tr.fecha_turno AS fecha_receptor
+            FROM `match` m
+            JOIN solicitud s ON s.id_solicitud = m.id_solicitud
+            JOIN respuesta r
+              ON r.id_solicitud = s.id_solicitud
+             AND r.id_receptor  = m.id_receptor
+            LEFT JOIN turno_trabajador tte ON tte.id_turno_trabajador = s.id_turno_trabajador
+            LEFT JOIN turno te ON te.id_turno = tte.id_turno
+            LEFT JOIN turno_trabajador ttr ON ttr.id_turno_trabajador = r.id_turno_trabajador_receptor
+            LEFT JOIN turno tr ON tr.id_turno = ttr.id_turno
+            WHERE m.id_match IN ({', '.join(['%s'] * len(ids))})
+            FOR UPDATE OF m
+        """
+        filas = ejecuta_all_tx(conn, sql, list(ids))
+        return {int(f["id_match"]): f for f in filas}
+
+    @staticmethod
+    def _upsert_validaciones_tx(conn, id_admin: int, decisiones: list):
+        """
+        Crea o actualiza la validación de varios matches con un único
+        INSERT multi-fila ... ON DUPLICATE KEY UPDATE.
+
+        Requisito:
+        - UNIQUE(validacion.id_match) (migrations/003_validacion_unica_por_match.sql)
+
+        Nota:
+        - Un comentario vacío no borra el que ya hubiera.
+        """
+        filas = []
+        params = []
+        for d in decisiones:
+            filas.append("(%s, %s, %s, %s, 0)")
+            params.extend([d["id_match"], id_admin, d["estado"], d.get("comentario")])
+
+        ejecuta_update_delete_tx(conn, f"""
+            INSERT INTO validacion (id_match, id_admin, estado, comentario, visto_por_coordinador)
+            VALUES {', '.join(filas)}
+            ON DUPLICATE KEY UPDATE
+                estado=VALUES(estado),
+                id_admin=VALUES(id_admin),
+                comentario=COALESCE(VALUES(comentario), comentario),
+                fecha_validacion=CURRENT_TIMESTAMP,
+                visto_por_coordinador=0
+        """, params)
+
     @staticmethod
     def _obtener_id_turno_tmp_tx(conn) -> int:
         """
@@ -562,15 +1072,24 @@ class GestionMatches:
         Lanza:
         - RuntimeError si no existe (para que el desarrollador ejecute el seed SQL).
         """
+        id_tipo_tmp = catalogo.id_tipo("TMP")
+        if id_tipo_tmp is not None:
+            id_turno = catalogo.id_turno("1900-01-01", id_tipo_tmp)
+            if id_turno is not None:
+                return id_turno
+
+        # Fallo de catálogo: se busca en la BD por nomenclatura
         fila = ejecuta_one_tx(conn, """
-            SELECT t.id_turno AS id_turno_tmp
+            SELECT t.id_turno AS id_turno_tmp, t.id_tipo_turno
             FROM turno t
-            JOIN tipo_turno tt ON tt.id_tipo_turno = t.id_tipo_turno
-            WHERE tt.nomenclatura='TMP' AND t.fecha_turno='1900-01-01'
+            JOIN tipo_turno tp ON tp.id_tipo_turno = t.id_tipo_turno
+            WHERE tp.nomenclatura = 'TMP' AND t.fecha_turno='1900-01-01'
             LIMIT 1
         """)
         if not fila:
             raise RuntimeError("No existe el turno TMP. Ejecuta el SQL de creación de TMP.")
+
+        catalogo.registrar_turno("1900-01-01", fila["id_tipo_turno"], fila["id_turno_tmp"])
         return int(fila["id_turno_tmp"])
 
     @staticmethod
@@ -657,52 +1176,113 @@ class GestionMatches:
             * Día B -> L (Libre)
             * Día A -> turno del emisor
 
+        Se aplica por conjuntos, con 1-2 sentencias en lugar de una por movimiento:
+        1) Resuelve los turnos 'L' de los días implicados con el catálogo
+           (solo va a la BD si no los conoce, y solo los crea si no existen).
+        2) UPDATE multi-fila de las asignaciones (trabajador, fecha) que ya existen.
+        3) Solo si faltaba alguna: INSERT de las asignaciones que no existían.
+
         Nota importante:
         - Aquí no se cambian ids de “asignación” (id_turno_trabajador).
           Lo que cambia es el id_turno asociado en turno_trabajador.
-        """
 
-        # 1) Leer el turno+fecha actual del emisor (asignación original del match)
-        rowE = ejecuta_one_tx(conn, """
-                                    SELECT tt.id_turno, t.fecha_turno
-                                    FROM turno_trabajador tt
-                                             JOIN turno t ON t.id_turno = tt.id_turno
-                                    WHERE tt.id_turno_trabajador = %s LIMIT 1
-                                    """, [info["id_asig_emisor"]])
+        Devuelve:
+        - lista de turnos L creados ({fecha_turno, id_tipo_turno, id_turno}),
+          para registrarlos en el catálogo después del commit.
+        """
+        cambios = GestionMatches._cambios_swap(info)
+        return GestionMatches._aplicar_swaps_tx(conn, cambios)
 
-        # 2) Leer el turno+fecha actual del receptor (asignación original del match)
-        rowR = ejecuta_one_tx(conn, """
-                                    SELECT tt.id_turno, t.fecha_turno
-                                    FROM turno_trabajador tt
-                                             JOIN turno t ON t.id_turno = tt.id_turno
-                                    WHERE tt.id_turno_trabajador = %s LIMIT 1
-                                    """, [info["id_asig_receptor"]])
+    @staticmethod
+    def _cambios_swap(info: dict) -> dict:
+        """
+        Calcula los 4 movimientos del swap de un match.
 
-        if not rowE or not rowR:
+        Devuelve:
+        - dict {(id_trabajador, 'YYYY-MM-DD'): id_turno}, con None donde el
+          trabajador pasa a tener el turno L de ese día.
+          Si ambos días coinciden, el último movimiento prevalece, igual que
+          al aplicarlos uno a uno.
+        """
+        if info.get("turno_emisor") is None or info.get("turno_receptor") is None:
             # Si faltan datos, no podemos hacer swap con seguridad
             raise Exception("No se pudieron leer los turnos ofertados.")
 
-        turno_emisor = int(rowE["id_turno"])
-        fecha_emisor = str(rowE["fecha_turno"])
+        turno_emisor = int(info["turno_emisor"])
+        fecha_emisor = str(info["fecha_emisor"])
+
+        turno_receptor = int(info["turno_receptor"])
+        fecha_receptor = str(info["fecha_receptor"])
+
+        cambios = {}
+        cambios[(info["id_emisor"], fecha_emisor)] = None
+        cambios[(info["id_emisor"], fecha_receptor)] = turno_receptor
+        cambios[(info["id_receptor"], fecha_receptor)] = None
+        cambios[(info["id_receptor"], fecha_emisor)] = turno_emisor
+        return cambios
+
+    @staticmethod
+    def _claves_swap_tx(conn, trabajadores) -> list:
+        """
+        Versiones que cambian al intercambiar turnos de `trabajadores`.
+
+        - turnos:<id> de cada trabajador
+        - "solicitudes" si alguno tiene solicitudes abiertas: su turno se
+          muestra en las recibidas de otros trabajadores
+        - respuestas:<emisor> de las solicitudes a las que alguno ha
+          respondido y siguen pendientes (el emisor ve el turno ofrecido)
+
+        Devuelve:
+        - lista de claves (DB_Versiones)
+        """
+        trabajadores = sorted({int(t) for t in trabajadores})
+        en = ", ".join(["%s"] * len(trabajadores))
+
+        filas = ejecuta_all_tx(conn, f"""
+            (SELECT NULL AS id_emisor
+             FROM solicitud
+             WHERE id_emisor IN ({en})
+               AND is_activa = 1
+               AND estado IN ('PENDIENTE', 'RESPONDIDA')
+             LIMIT 1)
+            UNION ALL
+            (SELECT DISTINCT s.id_emisor
+             FROM respuesta r
+                      JOIN solicitud s ON s.id_solicitud = r.id_solicitud
+             WHERE r.id_receptor IN ({en})
+               AND r.estado = 'PENDIENTE'
+               AND s.is_activa = 1)
+        """, trabajadores + trabajadores)
+
+        claves = [clave_turnos(t) for t in trabajadores]
+        for f in filas:
+            claves.append(VERSION_SOLICITUDES if f["id_emisor"] is None else clave_respuestas(f["id_emisor"]))
+        return claves
+
+    @staticmethod
+    def _aplicar_swaps_tx(conn, cambios: dict):
+        """
+        Aplica los movimientos de uno o varios swaps (ver _cambios_swap).
 
-        turno_receptor = int(rowR["id_turno"])
-        fecha_receptor = str(rowR["fecha_turno"])
+        1) Resuelve los turnos 'L' de los días que los necesitan.
+        2) Aplica todos los cambios por conjuntos.
 
-        # 3) Asegurar que existen turnos "L" para ambos días (si no, crearlos)
-        turno_L_emisor = GestionMatches._get_or_create_turno_L_por_fecha_tx(conn, fecha_emisor)
-        turno_L_receptor = GestionMatches._get_or_create_turno_L_por_fecha_tx(conn, fecha_receptor)
+        Devuelve:
+        - lista de turnos L creados en esta transacción
+        """
+        # 1) Turnos "L" de los días que los necesitan (creándolos si no existen)
+        fechas_L = sorted({fecha for (_, fecha), turno in cambios.items() if turno is None})
+        turnos_L, creados = GestionMatches._turnos_L_por_fecha_tx(conn, fechas_L)
 
-        # 4) Aplicar los 4 cambios finales
+        cambios = {
+            clave: turnos_L[clave[1]] if turno is None else turno
+            for clave, turno in cambios.items()
+        }
 
-        # Emisor: su día original pasa a Libre
-        GestionMatches._set_turno_en_fecha_tx(conn, info["id_emisor"], fecha_emisor, turno_L_emisor)
-        # Emisor: en el día del receptor pasa a tener el turno que ofrecía el receptor
-        GestionMatches._set_turno_en_fecha_tx(conn, info["id_emisor"], fecha_receptor, turno_receptor)
+        # 2) + 3) Aplicar todos los cambios
+        GestionMatches._aplicar_cambios_turno_tx(conn, cambios)
 
-        # Receptor: su día original pasa a Libre
-        GestionMatches._set_turno_en_fecha_tx(conn, info["id_receptor"], fecha_receptor, turno_L_receptor)
-        # Receptor: en el día del emisor pasa a tener el turno que ofrecía el emisor
-        GestionMatches._set_turno_en_fecha_tx(conn, info["id_receptor"], fecha_emisor, turno_emisor)
+        return creados
 
     @staticmethod
     def _insertar_log_tx(conn, id_admin: int, tipo_actor: str, id_validacion: int,
@@ -735,82 +1315,104 @@ class GestionMatches:
         ])
 
     @staticmethod
-    def _get_or_create_turno_L_por_fecha_tx(conn, fecha_iso: str) -> int:
+    def _turnos_L_por_fecha_tx(conn, fechas: list):
         """
-        Obtiene (o crea) el turno 'L' (Libre) para una fecha concreta.
+        Obtiene (o crea) el turno 'L' (Libre) de varias fechas.
 
         Pasos:
-        1) Busca el id_tipo_turno asociado a nomenclatura='L'
-        2) Busca si existe un turno (tabla turno) con esa fecha y ese tipo
-        3) Si no existe, lo inserta
-        4) Devuelve id_turno
+        1) id_tipo_turno de 'L' y los id_turno ya conocidos salen del catálogo
+        2) Las fechas que el catálogo no conoce se buscan con un único SELECT
+        3) Las que tampoco existen en la BD se crean
 
         Parámetros:
-        - fecha_iso: fecha en formato 'YYYY-MM-DD'
-        """
-        # 1) id_tipo_turno de 'L'
-        row = ejecuta_one_tx(
-            conn,
-            "SELECT id_tipo_turno FROM tipo_turno WHERE nomenclatura='L' LIMIT 1"
-        )
-        if not row:
-            raise Exception("No existe el tipo_turno 'L'. Ejecuta el seed de tipo_turno.")
-
-        id_tipo_L = row["id_tipo_turno"]
+        - fechas: lista de fechas 'YYYY-MM-DD'
 
-        # 2) ¿Existe ya un turno L para esa fecha?
-        row = ejecuta_one_tx(conn, """
-                                   SELECT id_turno
-                                   FROM turno
-                                   WHERE id_tipo_turno = %s
-                                     AND fecha_turno = %s LIMIT 1
-                                   """, [id_tipo_L, fecha_iso])
-
-        if row:
-            return row["id_turno"]
+        Devuelve:
+        - (dict {fecha: id_turno}, lista de turnos creados en esta transacción)
+        """
+        # Lanza RuntimeError si falta el tipo 'L'
+        id_tipo_L = catalogo.id_tipo_requerido("L")
+
+        turnos = {f: catalogo.id_turno(f, id_tipo_L) for f in fechas}
+        faltan = [f for f, id_turno in turnos.items() if id_turno is None]
+
+        if faltan:
+            # 2) ¿Existen ya en la BD? (filas confirmadas → se pueden cachear)
+            filas = ejecuta_all_tx(conn, f"""
+                SELECT id_turno, fecha_turno, id_tipo_turno
+                FROM turno
+                WHERE id_tipo_turno = %s
+                  AND fecha_turno IN ({', '.join(['%s'] * len(faltan))})
+            """, [id_tipo_L] + faltan)
+
+            catalogo.registrar_turnos(filas)
+            for fila in filas:
+                turnos[str(fila["fecha_turno"])] = fila["id_turno"]
+
+        # 3) Las que siguen sin turno se crean
+        creados = []
+        for fecha, id_turno in turnos.items():
+            if id_turno is None:
+                id_turno = ejecuta_insert_tx(
+                    conn,
+                    "INSERT INTO turno (id_tipo_turno, fecha_turno) VALUES (%s, %s)",
+                    [id_tipo_L, fecha]
+                )
+                turnos[fecha] = id_turno
+                creados.append({"fecha_turno": fecha, "id_tipo_turno": id_tipo_L, "id_turno": id_turno})
 
-        # 3) Si no existe, lo creamos
-        return ejecuta_insert_tx(
-            conn,
-            "INSERT INTO turno (id_tipo_turno, fecha_turno) VALUES (%s, %s)",
-            [id_tipo_L, fecha_iso]
-        )
+        return turnos, creados
 
     @staticmethod
-    def _set_turno_en_fecha_tx(conn, id_trabajador: int, fecha_iso: str, id_turno_nuevo: int):
+    def _aplicar_cambios_turno_tx(conn, cambios: dict):
         """
-        Asigna a un trabajador un turno concreto (id_turno_nuevo) en una fecha dada.
+        Asigna a varios trabajadores un turno concreto en una fecha dada (upsert por conjuntos).
 
         Estrategia:
-        - Si ya existe una fila turno_trabajador para ese trabajador y esa fecha -> UPDATE.
-        - Si no existe -> INSERT.
+        - Un UPDATE multi-fila para las asignaciones (trabajador, fecha) que ya existen.
+        - Si el UPDATE no las cubre todas, un INSERT ... SELECT de las que faltan.
 
         Parámetros:
-        - id_trabajador: id del trabajador
-        - fecha_iso: fecha en formato 'YYYY-MM-DD'
-        - id_turno_nuevo: id_turno que queremos poner ese día
+        - cambios: dict {(id_trabajador, 'YYYY-MM-DD'): id_turno}
+
+        Nota:
+        - turno_trabajador no guarda la fecha (está en turno), por eso la clave
+          (trabajador, fecha) se resuelve con JOIN y no con ON DUPLICATE KEY.
         """
-        fila = ejecuta_one_tx(conn, """
-            SELECT tt.id_turno_trabajador
-            FROM turno_trabajador tt
-            JOIN turno t ON t.id_turno = tt.id_turno
-            WHERE tt.id_trabajador=%s AND t.fecha_turno=%s
-            LIMIT 1
-        """, [id_trabajador, fecha_iso])
+        filas = []
+        params = []
+        for (id_trabajador, fecha), id_turno in cambios.items():
+            filas.append("SELECT %s AS id_trabajador, CAST(%s AS DATE) AS fecha, %s AS id_turno")
+            params.extend([id_trabajador, fecha, id_turno])
 
-        if fila:
-            # Existe asignación para ese día -> la actualizamos
-            ejecuta_update_delete_tx(conn, """
-                UPDATE turno_trabajador
-                SET id_turno=%s
-                WHERE id_turno_trabajador=%s
-            """, [id_turno_nuevo, fila["id_turno_trabajador"]])
-        else:
-            # No existe -> la creamos
-            ejecuta_insert_tx(conn, """
-                INSERT INTO turno_trabajador (id_turno, id_trabajador)
-                VALUES (%s, %s)
-            """, [id_turno_nuevo, id_trabajador])
+        tabla_cambios = "(" + " UNION ALL ".join(filas) + ")"
+
+        # 1) Asignaciones que ya existen -> UPDATE
+        actualizadas = ejecuta_update_delete_tx(conn, f"""
+            UPDATE turno_trabajador tt
+            JOIN turno t ON t.id_turno = tt.id_turno
+            JOIN {tabla_cambios} c
+              ON c.id_trabajador = tt.id_trabajador
+             AND c.fecha = t.fecha_turno
+            SET tt.id_turno = c.id_turno
+        """, params)
+
+        if actualizadas >= len(cambios):
+            return
+
+        # 2) Asignaciones que no existían -> INSERT
+        ejecuta_update_delete_tx(conn, f"""
+            INSERT INTO turno_trabajador (id_turno, id_trabajador)
+            SELECT c.id_turno, c.id_trabajador
+            FROM {tabla_cambios} c
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM turno_trabajador tt
+                JOIN turno t ON t.id_turno = tt.id_turno
+                WHERE tt.id_trabajador = c.id_trabajador
+                  AND t.fecha_turno = c.fecha
+            )
+        """, params)
 
     @staticmethod
     def _obtener_turnos_before_tx(conn, info: dict):
@@ -7,9 +7,19 @@ consultas SQL relacionadas con:
 - Saber qué turnos ha usado un usuario para responder
 - Marcar respuestas como vistas
 - Crear una respuesta y actualizar el estado de la solicitud
+- Limpiar las respuestas expiradas (lo lanza la expiración programada)
 """
 
-from .DB_Conexion import ejecuta_all, ejecuta_insert, ejecuta_Update_Delete
+from collections import Counter
+
+from .DB_Conexion import (
+    ejecuta_all,
+    ejecuta_one,
+    ejecuta_insert,
+    ejecuta_Update_Delete,
+    ejecuta_update_delete_tx
+)
+from .DB_Versiones import GestionVersiones, VERSION_SOLICITUDES, clave_respuestas, clave_usuario
 
 
 class GestionRespuestas:
@@ -164,6 +174,7 @@ class GestionRespuestas:
 
         # 5) Ejecutar actualización
         ejecuta_all(sql, params)
+        GestionVersiones.incrementar(clave_usuario(id_usuario))
 
         # 6) Devolver cuántos ids se intentaron marcar
         #    (no garantiza que todas se actualizaran, pero es útil para UI)
@@ -212,65 +223,88 @@ class GestionRespuestas:
               AND estado = 'PENDIENTE'
               AND is_activa = 1
         """
-        ejecuta_Update_Delete(sql_update, (id_solicitud,))
+        pasa_a_respondida = ejecuta_Update_Delete(sql_update, (id_solicitud,))
 
+        # 3) Versiones: respuestas del receptor y del emisor; el cambio de
+        #    estado de la solicitud lo ven todos sus receptores
+        solicitud = ejecuta_one(
+            "SELECT id_emisor FROM solicitud WHERE id_solicitud = %s",
+            (id_solicitud,)
+        )
+        GestionVersiones.incrementar(
+            clave_respuestas(id_receptor),
+            clave_respuestas(solicitud["id_emisor"]) if solicitud else None,
+            VERSION_SOLICITUDES if pasa_a_respondida else None
+        )
         return new_id
 
+    # =========================================================
+    # RESPUESTAS EXPIRADAS
+    # =========================================================
     @staticmethod
     def countRespuestasExpiradasReceptor(user_id: int):
-        sql = """
-              SELECT COUNT(*) AS total
-              FROM respuesta
-              WHERE id_receptor = %s
-                AND estado = 'EXPIRADA' 
-              """
-        fila = ejecuta_all(sql, (user_id,))
-        # ejecuta_all suele devolver lista de dicts
-        return int(fila[0]["total"]) if fila else 0
-
-    @staticmethod
-    def limpiarRespuestasExpiradasSiSolicitudSigueViva(user_id: int):
         """
-        Elimina respuestas expiradas para permitir que el usuario
-        pueda volver a responder a la solicitud.
+        ---------------------------------------------------------
+        Número de respuestas expiradas del receptor (solo lectura).
+        ---------------------------------------------------------
+        Suma:
+        - las respuestas EXPIRADA que siguen en la tabla
+        - las que el lote ya borró (aviso_respuesta_expirada)
+        Así el total solo crece y el frontend puede avisar de las
+        nuevas comparándolo con el último que vio.
+        ---------------------------------------------------------
+        @param user_id: ID del receptor
+        @return: número de respuestas expiradas (int)
         """
         sql = """
-            DELETE r
-            FROM respuesta r
-            JOIN solicitud s
-                ON s.id_solicitud = r.id_solicitud
-            WHERE r.id_receptor = %s
-              AND r.estado = 'EXPIRADA'
-              AND s.is_activa = 1
-              AND s.estado IN ('PENDIENTE','RESPONDIDA')
-        """
-        return ejecuta_Update_Delete(sql, (user_id,))
+              SELECT
+                  (SELECT COUNT(*)
+                   FROM respuesta
+                   WHERE estado = 'EXPIRADA'
+                     AND id_receptor = %s)
+                + IFNULL((SELECT total
+                          FROM aviso_respuesta_expirada
+                          WHERE id_receptor = %s), 0) AS total
+              """
+        fila = ejecuta_one(sql, (user_id, user_id))
+        return int(fila["total"] or 0) if fila else 0
 
     @staticmethod
-    def expirarRespuestasPorTurnoPasado(user_id: int):
+    def _limpiar_expiradas_tx(conn, filas):
         """
-        Expira respuestas del usuario receptor si el turno ofrecido
-        es hoy o ya ha pasado.
+        ---------------------------------------------------------
+        Borra respuestas expiradas cuya solicitud sigue viva, para
+        que el receptor pueda volver a responder (sin commit).
+        ---------------------------------------------------------
+        Antes de borrarlas las suma por receptor en
+        aviso_respuesta_expirada, para que el aviso las siga
+        contando (countRespuestasExpiradasReceptor).
+        Lo usa la expiración programada (DB_Expiracion.py).
+        ---------------------------------------------------------
+        @param conn: conexión transaccional (filas ya bloqueadas)
+        @param filas: lista de dicts {id_respuesta, id_receptor}
+        @return: número de respuestas borradas
         """
-        sql = """
-              UPDATE respuesta r
-              JOIN solicitud s
-                ON s.id_solicitud = r.id_solicitud
-              JOIN turno_trabajador tt
-                  ON tt.id_turno_trabajador = r.id_turno_trabajador_receptor
-              JOIN turno t
-                  ON t.id_turno = tt.id_turno
-              SET r.estado = 'EXPIRADA'
-              WHERE r.id_receptor = %s
-                AND r.estado = 'PENDIENTE'
-                AND s.is_activa = 1
-                AND s.estado IN ('PENDIENTE' 
-                  , 'RESPONDIDA')
-                AND t.fecha_turno <= CURDATE() 
-              """
-        return ejecuta_Update_Delete(sql, (user_id,))
-
-
+        if not filas:
+            return 0
 
+        # 1) Acumular por receptor antes de borrar
+        por_receptor = Counter(f["id_receptor"] for f in filas)
+        valores = []
+        params = []
+        for id_receptor, total in sorted(por_receptor.items()):
+            valores.append("(%s, %s)")
+            params.extend([id_receptor, total])
 
+        ejecuta_update_delete_tx(conn, f"""
+            INSERT INTO aviso_respuesta_expirada (id_receptor, total)
+            VALUES {', '.join(valores)}
+            ON DUPLICATE KEY UPDATE total = total + VALUES(total)
+        """, params)
 
+        # 2) Borrar para permitir volver a responder
+        ids = [f["id_respuesta"] for f in filas]
+        return ejecuta_update_delete_tx(conn, f"""
+            DELETE FROM respuesta
+            WHERE id_respuesta IN ({', '.join(['%s'] * len(ids))})
+        """, ids)
@@ -7,6 +7,7 @@ con las solicitudes enviadas por los usuarios.
 """
 
 from .DB_Conexion import ejecuta_all, ejecuta_one, ejecuta_insert
+from .DB_Versiones import GestionVersiones, VERSION_SOLICITUDES
 
 
 class GestionSolicitudesEnviadas:
@@ -112,6 +113,7 @@ class GestionSolicitudesEnviadas:
             VALUES (%s, %s)
         """
         id_solicitud = ejecuta_insert(sql_insert, (user_id, id_turno_trabajador))
+        GestionVersiones.incrementar(VERSION_SOLICITUDES)
         return id_solicitud
 
     # =========================================================
@@ -171,10 +173,34 @@ class GestionSolicitudesEnviadas:
             WHERE id_solicitud = %s
         """
         ejecuta_one(sql_update, (id_solicitud,))
+        GestionVersiones.incrementar(VERSION_SOLICITUDES)
         return True
 
     # =========================================================
-    # 4) NUMERO DE SOLICITUDES EXPIRADAS ENVIADAS
+    # 4) EMISOR DE UNA SOLICITUD
+    # =========================================================
+    @staticmethod
+    def getIdEmisor(id_solicitud):
+        """
+        ---------------------------------------------------------
+        Devuelve el id del usuario que creó la solicitud.
+        ---------------------------------------------------------
+        Se usa para notificar al emisor cuando recibe una respuesta.
+        ---------------------------------------------------------
+        @param id_solicitud: ID de la solicitud
+        @return: id_emisor (int) o None si no existe
+        """
+        sql = """
+            SELECT id_emisor
+            FROM solicitud
+            WHERE id_solicitud = %s
+            LIMIT 1
+        """
+        fila = ejecuta_one(sql, (id_solicitud,))
+        return int(fila["id_emisor"]) if fila else None
+
+    # =========================================================
+    # 5) NUMERO DE SOLICITUDES EXPIRADAS ENVIADAS
     # =========================================================
     @staticmethod
     def numeroExpiradasEnviadas(id_emisor: int) -> int:
@@ -6,7 +6,9 @@ Es decir: solicitudes creadas por otros usuarios que yo puedo ver y a las
 que puedo responder, siempre que cumpla condiciones (por ejemplo, estar libre).
 """
 
-from .DB_Conexion import ejecuta_all, ejecuta_insert, ejecuta_one
+from .DB_Conexion import ejecuta_all, ejecuta_insert, ejecuta_one, ejecuta_Update_Delete
+from .DB_Catalogo import catalogo
+from .DB_Versiones import GestionVersiones, clave_usuario
 
 
 class GestionSolicitudesRecibidas:
@@ -36,7 +38,9 @@ class GestionSolicitudesRecibidas:
           (si no existe fila en solicitud_receptor => visto = 0).
         - LEFT JOIN respuesta para saber si ESTE usuario ya respondió.
         - Filtra para que SOLO salgan las solicitudes donde el receptor está
-          libre (turno 'L') en ese día (regla de negocio).
+          libre (turno 'L') en ese día (regla de negocio), con un EXISTS
+          correlacionado por (receptor, fecha_turno) en lugar de cruzar cada
+          solicitud con todos los turnos del receptor.
         - Excluye solicitudes propias (s.id_emisor <> user_id).
         - Excluye solicitudes que ya tienen match (m.id_match IS NULL).
         ---------------------------------------------------------
@@ -50,8 +54,7 @@ class GestionSolicitudesRecibidas:
                      ue.username                                                               AS emisor_username, 
                      s.fecha_solicitud, 
                      t.fecha_turno, 
-                     tp.nomenclatura, 
-                     tp.turno, 
+                     t.id_tipo_turno, 
 
                      -- ✅ visto robusto:
                      -- si no hay fila en solicitud_receptor => NULL -> usamos 0
@@ -75,8 +78,6 @@ class GestionSolicitudesRecibidas:
                             ON tt.id_turno_trabajador = s.id_turno_trabajador
                        JOIN turno t
                             ON t.id_turno = tt.id_turno
-                       JOIN tipo_turno tp
-                            ON tp.id_tipo_turno = t.id_tipo_turno
 
                   -- ✅ CLAVE: LEFT JOIN para que entren solicitudes nuevas
                   -- Si no existe fila sr para (id_solicitud, id_receptor) => visto=0
@@ -93,16 +94,6 @@ class GestionSolicitudesRecibidas:
                        LEFT JOIN `match` m
                                  ON m.id_solicitud = s.id_solicitud
 
-                  -- Turno del receptor en la MISMA fecha del turno del emisor
-                  -- (sirve para filtrar que el receptor esté libre: nomenclatura 'L')
-                       LEFT JOIN turno_trabajador ttr
-                                 ON ttr.id_trabajador = %s
-                       LEFT JOIN turno tr
-                                 ON tr.id_turno = ttr.id_turno
-                                     AND tr.fecha_turno = t.fecha_turno
-                       LEFT JOIN tipo_turno tpr
-                                 ON tpr.id_tipo_turno = tr.id_tipo_turno
-
               WHERE s.is_activa = 1
 
                 -- No mostrar solicitudes propias
@@ -115,13 +106,27 @@ class GestionSolicitudesRecibidas:
                 AND s.estado IN ('PENDIENTE', 'RESPONDIDA', 'EXPIRADA')
 
                 -- ✅ Regla de negocio clave: solo si el receptor está libre ese día
-                AND tpr.nomenclatura = 'L'
+                AND EXISTS (
+                    -- Semi-join por (fecha, receptor): usa turno(fecha_turno, id_tipo_turno)
+                    -- y turno_trabajador(id_trabajador, id_turno) → coste por solicitud,
+                    -- no por todo el historial de turnos del receptor
+                    SELECT 1
+                    FROM turno tr
+                             JOIN turno_trabajador ttr
+                                  ON ttr.id_turno = tr.id_turno
+                                      AND ttr.id_trabajador = %s
+                    WHERE tr.fecha_turno = t.fecha_turno
+                      AND tr.id_tipo_turno = %s
+                )
 
               ORDER BY t.fecha_turno ASC, s.fecha_solicitud DESC 
               """
 
         # Pasamos el user_id varias veces porque se usa en varios LEFT JOIN y filtros
-        return ejecuta_all(sql, (user_id, user_id, user_id, user_id))
+        filas = ejecuta_all(sql, (user_id, user_id, user_id, user_id, catalogo.id_tipo_requerido("L")))
+
+        # nomenclatura/turno del emisor desde el catálogo (sin JOIN a tipo_turno)
+        return catalogo.completar_tipos(filas)
 
     # =========================================================
     # 2) LISTAR / CONTAR SOLICITUDES NUEVAS RECIBIDAS
@@ -133,11 +138,12 @@ class GestionSolicitudesRecibidas:
         Devuelve solicitudes recibidas NUEVAS:
         - No existe fila en solicitud_receptor (sr.id_solicitud IS NULL)
         - La solicitud está PENDIENTE y activa
-        - El receptor está libre (L) en ese día
+        - El receptor está libre (L) en ese día (EXISTS por receptor + fecha)
         ---------------------------------------------------------
         Nota:
-        - Aunque se llame "numero...", este método actualmente devuelve filas.
-          Si el endpoint quiere SOLO el número, puede hacer len(filas).
+        - Aunque se llame "numero...", este método devuelve filas.
+          Para el badge del nav usar contarSolicitudesNuevasRecibidas(),
+          que devuelve solo el número sin traer filas.
         ---------------------------------------------------------
         @param user_id: ID del receptor
         @return: lista de solicitudes nuevas (o se puede convertir a número)
@@ -148,8 +154,7 @@ class GestionSolicitudesRecibidas:
                      u.username AS emisor_username,
                      s.fecha_solicitud,
                      t.fecha_turno,
-                     tp.nomenclatura,
-                     tp.turno
+                     t.id_tipo_turno
               FROM solicitud s
                        JOIN usuario u
                             ON u.id_trabajador = s.id_emisor
@@ -157,23 +162,12 @@ class GestionSolicitudesRecibidas:
                             ON tt.id_turno_trabajador = s.id_turno_trabajador
                        JOIN turno t
                             ON t.id_turno = tt.id_turno
-                       JOIN tipo_turno tp
-                            ON tp.id_tipo_turno = t.id_tipo_turno
 
                   -- Si existe fila sr => ya se ha visto alguna vez
                        LEFT JOIN solicitud_receptor sr
                                  ON sr.id_solicitud = s.id_solicitud
                                      AND sr.id_receptor = %s
 
-                  -- Turno del receptor en esa fecha (para filtrar libre 'L')
-                       LEFT JOIN turno_trabajador ttr
-                                 ON ttr.id_trabajador = %s
-                       LEFT JOIN turno tr
-                                 ON tr.id_turno = ttr.id_turno
-                                     AND tr.fecha_turno = t.fecha_turno
-                       LEFT JOIN tipo_turno tpr
-                                 ON tpr.id_tipo_turno = tr.id_tipo_turno
-
               WHERE s.is_activa = 1
                 AND s.estado = 'PENDIENTE'
 
@@ -184,11 +178,110 @@ class GestionSolicitudesRecibidas:
                 AND sr.id_solicitud IS NULL
 
                 -- ✅ Solo si el receptor está libre ese día
-                AND tpr.nomenclatura = 'L'
+                AND EXISTS (
+                    -- Semi-join por (fecha, receptor): usa turno(fecha_turno, id_tipo_turno)
+                    -- y turno_trabajador(id_trabajador, id_turno) → coste por solicitud,
+                    -- no por todo el historial de turnos del receptor
+                    SELECT 1
+                    FROM turno tr
+                             JOIN turno_trabajador ttr
+                                  ON ttr.id_turno = tr.id_turno
+                                      AND ttr.id_trabajador = %s
+                    WHERE tr.fecha_turno = t.fecha_turno
+                      AND tr.id_tipo_turno = %s
+                )
 
               ORDER BY t.fecha_turno ASC, s.fecha_solicitud DESC
               """
-        return ejecuta_all(sql, (user_id, user_id, user_id))
+        filas = ejecuta_all(sql, (user_id, user_id, user_id, catalogo.id_tipo_requerido("L")))
+        return catalogo.completar_tipos(filas)
+
+    @staticmethod
+    def contarSolicitudesNuevasRecibidas(user_id) -> int:
+        """
+        ---------------------------------------------------------
+        Devuelve SOLO el número de solicitudes recibidas nuevas.
+        ---------------------------------------------------------
+        Mismas reglas que numeroSolicitudesNuevasRecibidas, pero:
+        - COUNT(*) en vez de devolver filas (no hay que serializar
+          ni enviar el listado para pintar un badge)
+        - sin JOIN a usuario / tipo_turno del emisor (no se usan)
+        - "nueva" con NOT EXISTS en solicitud_receptor
+        ---------------------------------------------------------
+        @param user_id: ID del receptor
+        @return: número de solicitudes nuevas (int)
+        """
+        sql = """
+              SELECT COUNT(*) AS total
+              FROM solicitud s
+                       JOIN turno_trabajador tt
+                            ON tt.id_turno_trabajador = s.id_turno_trabajador
+                       JOIN turno t
+                            ON t.id_turno = tt.id_turno
+
+              WHERE s.is_activa = 1
+                AND s.estado = 'PENDIENTE'
+                AND s.id_emisor <> %s
+
+                -- ✅ Nueva = NO existe fila en solicitud_receptor
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM solicitud_receptor sr
+                    WHERE sr.id_solicitud = s.id_solicitud
+                      AND sr.id_receptor = %s
+                )
+
+                -- ✅ Solo si el receptor está libre ese día
+                AND EXISTS (
+                    SELECT 1
+                    FROM turno tr
+                             JOIN turno_trabajador ttr
+                                  ON ttr.id_turno = tr.id_turno
+                                      AND ttr.id_trabajador = %s
+                    WHERE tr.fecha_turno = t.fecha_turno
+                      AND tr.id_tipo_turno = %s
+                )
+              """
+        fila = ejecuta_one(sql, (user_id, user_id, user_id, catalogo.id_tipo_requerido("L")))
+        return int(fila["total"]) if fila else 0
+
+    @staticmethod
+    def receptoresSolicitud(id_solicitud) -> list:
+        """
+        ---------------------------------------------------------
+        Trabajadores que pueden recibir una solicitud: libres (L)
+        el día del turno y distintos del emisor.
+        ---------------------------------------------------------
+        Misma regla de negocio que solicitudesRecibidas(), vista
+        desde la solicitud. Se usa para avisar (SSE) solo a esos
+        trabajadores al crear o cancelar la solicitud.
+        Nunca lanza excepción: la solicitud ya está confirmada.
+        ---------------------------------------------------------
+        @param id_solicitud: solicitud creada / cancelada
+        @return: lista de id_trabajador ([] si falla la consulta)
+        """
+        sql = """
+              SELECT DISTINCT ttr.id_trabajador
+              FROM solicitud s
+                       JOIN turno_trabajador tt
+                            ON tt.id_turno_trabajador = s.id_turno_trabajador
+                       JOIN turno t
+                            ON t.id_turno = tt.id_turno
+                       JOIN turno tr
+                            ON tr.fecha_turno = t.fecha_turno
+                                AND tr.id_tipo_turno = %s
+                       JOIN turno_trabajador ttr
+                            ON ttr.id_turno = tr.id_turno
+
+              WHERE s.id_solicitud = %s
+                AND ttr.id_trabajador <> s.id_emisor
+              """
+        try:
+            filas = ejecuta_all(sql, (catalogo.id_tipo_requerido("L"), id_solicitud)) or []
+        except Exception as e:
+            print(f"[WARN] receptoresSolicitud({id_solicitud}): {e}")
+            return []
+        return [int(f["id_trabajador"]) for f in filas]
 
     # =========================================================
     # 3) MARCAR SOLICITUD COMO VISTA (UPSERT)
@@ -217,7 +310,98 @@ class GestionSolicitudesRecibidas:
               """
 
         # ✅ Esto es escritura (INSERT/UPDATE) → usamos ejecuta_insert (hace commit)
-        return ejecuta_insert(sql, (id_solicitud, user_id))
+        resultado = ejecuta_insert(sql, (id_solicitud, user_id))
+        GestionVersiones.incrementar(clave_usuario(user_id))
+        return resultado
+
+    @staticmethod
+    def marcarSolicitudesComoVistas(user_id, ids=None) -> int:
+        """
+        ---------------------------------------------------------
+        Marca VARIAS solicitudes como vistas (2 sentencias).
+        ---------------------------------------------------------
+        Sustituye a llamar marcarSolicitudComoVista() una vez por
+        solicitud (una petición HTTP y una conexión por cada una).
+        1) SELECT de las solicitudes VISIBLES para el usuario (mismas
+           reglas que solicitudesRecibidas()) y aún no vistas:
+           - ids: solo las de la lista (AND s.id_solicitud IN (...));
+             los ids ajenos, no visibles o inexistentes se ignoran
+           - ids=None: todas las visibles
+        2) UPSERT multi-fila solo de esas solicitudes.
+        ---------------------------------------------------------
+        @param user_id: receptor (usuario autenticado)
+        @param ids: lista de id_solicitud o None para todas las visibles
+        @return: número de solicitudes marcadas ahora como vistas
+        """
+        sql_ids, params_ids = "", []
+        if ids is not None:
+            ids = sorted({int(i) for i in ids})
+            if not ids:
+                return 0
+            sql_ids = f"AND s.id_solicitud IN ({', '.join(['%s'] * len(ids))})"
+            params_ids = ids
+
+        sql = f"""
+              SELECT s.id_solicitud
+              FROM solicitud s
+                       JOIN turno_trabajador tt
+                            ON tt.id_turno_trabajador = s.id_turno_trabajador
+                       JOIN turno t
+                            ON t.id_turno = tt.id_turno
+                       LEFT JOIN `match` m
+                                 ON m.id_solicitud = s.id_solicitud
+
+              WHERE s.is_activa = 1
+                AND s.id_emisor <> %s
+                AND m.id_match IS NULL
+                AND s.estado IN ('PENDIENTE', 'RESPONDIDA', 'EXPIRADA')
+                {sql_ids}
+
+                -- Solo las que aún no están vistas
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM solicitud_receptor sr
+                    WHERE sr.id_solicitud = s.id_solicitud
+                      AND sr.id_receptor = %s
+                      AND sr.visto = 1
+                )
+
+                -- Solo si el receptor está libre ese día
+                AND EXISTS (
+                    SELECT 1
+                    FROM turno tr
+                             JOIN turno_trabajador ttr
+                                  ON ttr.id_turno = tr.id_turno
+                                      AND ttr.id_trabajador = %s
+                    WHERE tr.fecha_turno = t.fecha_turno
+                      AND tr.id_tipo_turno = %s
+                )
+              """
+        filas = ejecuta_all(
+            sql, [user_id] + params_ids + [user_id, user_id, catalogo.id_tipo_requerido("L")]
+        ) or []
+        nuevas = [int(f["id_solicitud"]) for f in filas]
+        if not nuevas:
+            return 0
+
+        # Las que ya estaban vistas (carrera con otra pestaña) conservan su fecha_visto
+        sql_upsert = (
+            "INSERT INTO solicitud_receptor (id_solicitud, id_receptor, visto, fecha_visto) VALUES "
+            + ", ".join(["(%s, %s, 1, NOW())"] * len(nuevas))
+            + """
+              ON DUPLICATE KEY UPDATE
+                  fecha_visto = IF(visto = 1, fecha_visto, NOW()),
+                  visto = 1
+              """
+        )
+        params = []
+        for id_solicitud in nuevas:
+            params.extend((id_solicitud, user_id))
+        ejecuta_Update_Delete(sql_upsert, params)
+
+        GestionVersiones.incrementar(clave_usuario(user_id))
+        return len(nuevas)
+
         # =========================================================
         # 4) NUMERO DE SOLICITUDES RECIBIDAS EXPIRADAS
         # =========================================================
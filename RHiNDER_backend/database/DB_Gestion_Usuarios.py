@@ -10,7 +10,19 @@ consultas y actualizaciones relacionadas con usuarios:
 - listado y activación/bloqueo de usuarios (admin)
 """
 
+import os
+
+from flask_jwt_extended import get_jwt
+
 from .DB_Conexion import ejecuta_one, ejecuta_all, ejecuta_Update_Delete
+from .DB_Cache import CacheTTL
+
+
+# Estado de autorización por usuario (rol normalizado + activo).
+# TTL corto: un bloqueo hecho desde otro worker se aplica en segundos;
+# en el mismo worker se invalida al momento (AdminActualizarEstadoUsuario).
+ROL_CACHE_TTL = float(os.getenv("ROL_CACHE_TTL", "10"))
+_cache_roles = CacheTTL(ttl=ROL_CACHE_TTL, max_size=4096)
 
 
 class GestionUsuarios:
@@ -140,29 +152,51 @@ class GestionUsuarios:
           - "administrador" si el usuario es Administrador/a
           - "" si no tiene permisos especiales o no existe
         ---------------------------------------------------------
+        Se resuelve con estado_autorizacion (cacheado).
+        ---------------------------------------------------------
         @param user_id: id del usuario autenticado
         @return: string con tipo de actor ("coordinador"/"administrador"/"")
         """
+        return GestionUsuarios.estado_autorizacion(user_id)["tipo_actor"]
+
+    @staticmethod
+    def estado_autorizacion(user_id: int) -> dict:
+        """
+        ---------------------------------------------------------
+        Devuelve el rol normalizado y si el usuario está activo.
+        ---------------------------------------------------------
+        El resultado se guarda ROL_CACHE_TTL segundos por usuario,
+        así los guards no consultan la BD en cada petición.
+        ---------------------------------------------------------
+        @param user_id: id del usuario autenticado
+        @return: dict {tipo_actor, activo}
+                 (tipo_actor "" y activo False si no existe)
+        """
+        estado = _cache_roles.obtener(int(user_id))
+        if estado is not None:
+            return estado
+
         sql = """
-              SELECT r.rol
+              SELECT r.rol, u.activo
               FROM usuario u
                        JOIN rol r ON r.id_rol = u.id_rol
               WHERE u.id_trabajador = %s LIMIT 1
               """
         row = ejecuta_one(sql, [user_id])
-        if not row:
-            return ""
 
-        rol = row["rol"]
+        estado = {
+            "tipo_actor": normalizar_rol(row["rol"]) if row else "",
+            "activo": bool(row) and int(row["activo"] or 0) == 1,
+        }
+        _cache_roles.guardar(int(user_id), estado)
+        return estado
 
-        # Normalizamos el texto del rol para usarlo en lógica del backend
-        if rol == "Coordinador/a":
-            return "coordinador"
-        if rol == "Administrador/a":
-            return "administrador"
-
-        # Cualquier otro rol (p. ej. Trabajador/a) no tiene permisos especiales
-        return ""
+    @staticmethod
+    def invalidar_estado_autorizacion(user_id: int):
+        """
+        Descarta el rol/activo cacheado de un usuario (p. ej. tras bloquearlo).
+        """
+        _cache_roles.invalidar(int(user_id))
 
     # =========================================================
     # 6) LISTAR USUARIOS (ADMIN) CON FILTROS
@@ -247,6 +281,61 @@ class GestionUsuarios:
 # ============================================================
 # HELPERS DE AUTORIZACIÓN Y ROL
 # ============================================================
+def normalizar_rol(rol: str) -> str:
+    """
+    ------------------------------------------------------------
+    Convierte el texto de la tabla rol en el tipo de actor que
+    usa el backend.
+    ------------------------------------------------------------
+    @param rol: "Coordinador/a", "Administrador/a", "Trabajador/a"...
+    @return: "coordinador" / "administrador" / ""
+    """
+    if rol == "Coordinador/a":
+        return "coordinador"
+    if rol == "Administrador/a":
+        return "administrador"
+
+    # Cualquier otro rol (p. ej. Trabajador/a) no tiene permisos especiales
+    return ""
+
+
+def tipo_actor_actual(user_id: int) -> str:
+    """
+    ------------------------------------------------------------
+    Tipo de actor del usuario autenticado.
+    ------------------------------------------------------------
+    Se lee del claim "tipo_actor" del JWT (añadido en /login).
+    Tokens sin el claim (emitidos antes) o llamadas fuera de una
+    petición usan estado_autorizacion (cacheado).
+
+    Que el usuario siga activo lo comprueba main.py en cada
+    petición (token_in_blocklist_loader).
+    ------------------------------------------------------------
+    @param user_id: ID del usuario autenticado
+    @return: "coordinador" / "administrador" / ""
+    """
+    try:
+        claims = get_jwt()
+    except RuntimeError:
+        claims = {}
+
+    if "tipo_actor" in claims and str(claims.get("sub")) == str(user_id):
+        return claims["tipo_actor"]
+
+    return GestionUsuarios.obtener_tipo_actor(user_id)
+
+
+def usuario_activo(user_id: int) -> bool:
+    """
+    ------------------------------------------------------------
+    Indica si el usuario sigue activo (no bloqueado).
+    ------------------------------------------------------------
+    @param user_id: ID del usuario
+    @return: True si existe y activo = 1
+    """
+    return GestionUsuarios.estado_autorizacion(user_id)["activo"]
+
+
 def _es_coordinador_o_admin(user_id: int) -> bool:
     """
     ------------------------------------------------------------
@@ -255,5 +344,5 @@ def _es_coordinador_o_admin(user_id: int) -> bool:
     @param user_id: ID del usuario autenticado
     @return: True si es coordinador o administrador
     """
-    tipo_actor = GestionUsuarios.obtener_tipo_actor(user_id)
+    tipo_actor = tipo_actor_actual(user_id)
     return tipo_actor in ("coordinador", "administrador")
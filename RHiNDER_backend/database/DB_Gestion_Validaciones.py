@@ -1,4 +1,60 @@
 from .DB_Conexion import ejecuta_all, ejecuta_one, ejecuta_Update_Delete
+from .DB_Cache import CacheTTL
+from .DB_Paginacion import condicion_cursor, condicion_filtros, orden_keyset, cortar_pagina
+
+
+# Historial de validaciones: columnas + JOINs comunes al listado completo
+# y a la versión paginada. Solo matches ya resueltos.
+_SQL_HISTORIAL = """
+            SELECT
+                m.id_match,
+                m.estado AS estado_match,
+                m.fecha_match,
+
+                -- Usuarios implicados
+                ue.username AS emisor_username,
+                ur.username AS receptor_username,
+
+                -- Usuario que valida (admin/coordinador)
+                ua.username AS admin_username,
+
+                -- Datos de la validación
+                v.fecha_validacion,
+                v.comentario AS comentario_validacion,
+                v.estado AS estado_validacion,
+                v.visto_por_coordinador,
+
+                -- ✅ snapshots del intercambio (guardados en match)
+                -- Permiten mostrar qué turnos se intercambiaron
+                m.emisor_fecha          AS fecha_turno_emisor,
+                m.emisor_nomenclatura   AS nomenclatura_emisor,
+                m.receptor_fecha        AS fecha_turno_receptor,
+                m.receptor_nomenclatura AS nomenclatura_receptor
+
+            FROM `match` m
+            JOIN solicitud s ON s.id_solicitud = m.id_solicitud
+            JOIN usuario ue ON ue.id_trabajador = s.id_emisor
+            JOIN usuario ur ON ur.id_trabajador = m.id_receptor
+
+            -- Validación asociada al match (obligatoria)
+            JOIN validacion v ON v.id_match = m.id_match
+
+            -- Usuario que valida (LEFT JOIN por seguridad)
+            LEFT JOIN usuario ua ON ua.id_trabajador = v.id_admin
+
+            WHERE m.estado IN ('VALIDADO', 'RECHAZADO','EXPIRADO')
+"""
+
+# Filtro de estado del historial (valores de filtros_historial_validaciones.js)
+ESTADOS_FILTRO = {
+    "aprobada": ("APROBADA",),
+    "rechazada": ("RECHAZADA",),
+    "expirada": ("EXPIRADA",),
+    "expirado": ("EXPIRADA",),
+}
+
+# Totales del historial por filtros (TTL corto; se limpia al validar/denegar)
+_cache_totales = CacheTTL(ttl=60, max_size=256)
 
 
 class GestionValidaciones:
@@ -41,46 +97,7 @@ class GestionValidaciones:
         @return: lista de validaciones (ordenadas por fecha desc)
         """
 
-        sql = """
-            SELECT
-                m.id_match,
-                m.estado AS estado_match,
-                m.fecha_match,
-
-                -- Usuarios implicados
-                ue.username AS emisor_username,
-                ur.username AS receptor_username,
-
-                -- Usuario que valida (admin/coordinador)
-                ua.username AS admin_username,
-
-                -- Datos de la validación
-                v.fecha_validacion,
-                v.comentario AS comentario_validacion,
-                v.estado AS estado_validacion,
-                v.visto_por_coordinador,
-
-                -- ✅ snapshots del intercambio (guardados en match)
-                -- Permiten mostrar qué turnos se intercambiaron
-                m.emisor_fecha          AS fecha_turno_emisor,
-                m.emisor_nomenclatura   AS nomenclatura_emisor,
-                m.receptor_fecha        AS fecha_turno_receptor,
-                m.receptor_nomenclatura AS nomenclatura_receptor
-
-            FROM `match` m
-            JOIN solicitud s ON s.id_solicitud = m.id_solicitud
-            JOIN usuario ue ON ue.id_trabajador = s.id_emisor
-            JOIN usuario ur ON ur.id_trabajador = m.id_receptor
-
-            -- Validación asociada al match (obligatoria)
-            JOIN validacion v ON v.id_match = m.id_match
-
-            -- Usuario que valida (LEFT JOIN por seguridad)
-            LEFT JOIN usuario ua ON ua.id_trabajador = v.id_admin
-
-            WHERE m.estado IN ('VALIDADO', 'RECHAZADO','EXPIRADO')
-            ORDER BY v.fecha_validacion DESC
-        """
+        sql = _SQL_HISTORIAL + " ORDER BY v.fecha_validacion DESC"
         return ejecuta_all(sql)
 
     # =========================================================
@@ -142,3 +159,90 @@ class GestionValidaciones:
               """
         filas = ejecuta_Update_Delete(sql)
         return filas
+
+    # =========================================================
+    # 4) HISTORIAL DE VALIDACIONES PAGINADO (KEYSET)
+    # =========================================================
+    @staticmethod
+    def getHistorialValidacionesPagina(limite: int, cursor=None, estado=None,
+                                       desde=None, hasta=None, orden="desc"):
+        """
+        ---------------------------------------------------------
+        Devuelve una página del historial de validaciones.
+        ---------------------------------------------------------
+        Mismas columnas que getHistorialValidaciones, pero:
+        - ordenado por (fecha_validacion, id_match)
+        - continúa a partir de `cursor` en vez de usar OFFSET
+        - filtra en la BD por estado y rango de fechas
+        ---------------------------------------------------------
+        @param limite: número máximo de filas de la página
+        @param cursor: (fecha_validacion, id_match) de la última
+                       fila de la página anterior, o None
+        @param estado: clave de ESTADOS_FILTRO o None
+        @param desde / hasta: date (incluidos) o None
+        @param orden: "desc" (más nuevas primero) | "asc"
+        @return: (lista de validaciones, cursor siguiente o None)
+        """
+        sql_filtros, p_filtros = condicion_filtros(
+            "v.estado", "v.fecha_validacion", ESTADOS_FILTRO.get(estado), desde, hasta
+        )
+        sql_cursor, p_cursor = condicion_cursor(
+            "v.fecha_validacion", "v.id_match", cursor, orden
+        )
+
+        sql = (
+            _SQL_HISTORIAL
+            + sql_filtros
+            + sql_cursor
+            + orden_keyset("v.fecha_validacion", "v.id_match", orden)
+            + " LIMIT %s"
+        )
+        filas = ejecuta_all(sql, p_filtros + p_cursor + (limite + 1,))
+
+        return cortar_pagina(filas, limite, "fecha_validacion", "id_match")
+
+    # =========================================================
+    # 5) TOTALES DEL HISTORIAL DE VALIDACIONES
+    # =========================================================
+    @staticmethod
+    def contarHistorialValidaciones(desde=None, hasta=None) -> dict:
+        """
+        ---------------------------------------------------------
+        Devuelve cuántas validaciones hay de cada estado en el
+        rango de fechas indicado.
+        ---------------------------------------------------------
+        El resultado se guarda en caché unos segundos: la
+        paginación lo pide con cada filtro y el COUNT recorre todo
+        el historial.
+        ---------------------------------------------------------
+        @param desde / hasta: date (incluidos) o None
+        @return: dict {estado_validacion: total}
+        """
+        clave = ("validaciones", desde, hasta)
+        totales = _cache_totales.obtener(clave)
+        if totales is not None:
+            return totales
+
+        sql_filtros, params = condicion_filtros(
+            "v.estado", "v.fecha_validacion", None, desde, hasta
+        )
+        sql = f"""
+            SELECT v.estado AS estado_validacion, COUNT(*) AS total
+            FROM `match` m
+            JOIN validacion v ON v.id_match = m.id_match
+            WHERE m.estado IN ('VALIDADO', 'RECHAZADO','EXPIRADO')
+            {sql_filtros}
+            GROUP BY v.estado
+        """
+        filas = ejecuta_all(sql, params) or []
+
+        totales = {f["estado_validacion"]: int(f["total"]) for f in filas}
+        _cache_totales.guardar(clave, totales)
+        return totales
+
+    @staticmethod
+    def invalidarTotalesHistorial():
+        """
+        Descarta los totales en caché (tras validar o denegar un match).
+        """
+        _cache_totales.limpiar()
@@ -0,0 +1,132 @@
+"""
+Operaciones relacionadas con las notificaciones (badges) del nav.
+
+Este módulo DAL calcula en UNA sola consulta los contadores que el
+nav necesita pintar, en lugar de descargar listados completos y
+contar en el navegador.
+"""
+
+from .DB_Conexion import ejecuta_one
+from .DB_Catalogo import catalogo
+
+
+class GestionNotificaciones:
+    """
+    ---------------------------------------------------------
+    Clase DAL para los contadores de notificaciones.
+    ---------------------------------------------------------
+    Cada contador es una subconsulta agregada sobre los flags
+    visto_* correspondientes; todas se resuelven en un único
+    viaje a la base de datos.
+    ---------------------------------------------------------
+    """
+
+    # =========================================================
+    # 1) RESUMEN DEL TRABAJADOR
+    # =========================================================
+    @staticmethod
+    def resumenTrabajador(user_id) -> dict:
+        """
+        ---------------------------------------------------------
+        Devuelve los tres contadores del nav del trabajador.
+        ---------------------------------------------------------
+        - respuestas_no_vistas: solicitudes ACTIVAS del usuario con
+          alguna respuesta PENDIENTE no vista (visto_por_solicitante=0)
+        - solicitudes_nuevas: solicitudes recibidas nuevas (mismas
+          reglas que GestionSolicitudesRecibidas.contarSolicitudesNuevasRecibidas)
+        - matches_no_vistos: matches no vistos según el rol del usuario
+          (EMISOR → visto_por_emisor, RECEPTOR → visto_por_receptor)
+        ---------------------------------------------------------
+        @param user_id: ID del trabajador autenticado
+        @return: dict con los tres contadores (int)
+        """
+        sql = """
+              SELECT
+                  -- 1) Solicitudes con respuestas no vistas
+                  (SELECT COUNT(DISTINCT s.id_solicitud)
+                   FROM solicitud s
+                            JOIN respuesta r
+                                 ON r.id_solicitud = s.id_solicitud
+                   WHERE s.id_emisor = %s
+                     AND s.is_activa = 1
+                     AND r.estado = 'PENDIENTE'
+                     AND r.visto_por_solicitante = 0) AS respuestas_no_vistas,
+
+                  -- 2) Solicitudes recibidas nuevas (no vistas y receptor libre ese día)
+                  (SELECT COUNT(*)
+                   FROM solicitud s
+                            JOIN turno_trabajador tt
+                                 ON tt.id_turno_trabajador = s.id_turno_trabajador
+                            JOIN turno t
+                                 ON t.id_turno = tt.id_turno
+                   WHERE s.is_activa = 1
+                     AND s.estado = 'PENDIENTE'
+                     AND s.id_emisor <> %s
+                     AND NOT EXISTS (
+                         SELECT 1
+                         FROM solicitud_receptor sr
+                         WHERE sr.id_solicitud = s.id_solicitud
+                           AND sr.id_receptor = %s
+                     )
+                     AND EXISTS (
+                         SELECT 1
+                         FROM turno tr
+                                  JOIN turno_trabajador ttr
+                                       ON ttr.id_turno = tr.id_turno
+                                           AND ttr.id_trabajador = %s
+                         WHERE tr.fecha_turno = t.fecha_turno
+                           AND tr.id_tipo_turno = %s
+                     )) AS solicitudes_nuevas,
+
+                  -- 3) Matches no vistos (según mi rol en cada match)
+                  (SELECT COUNT(*)
+                   FROM `match` m
+                            JOIN solicitud s
+                                 ON s.id_solicitud = m.id_solicitud
+                   WHERE (s.id_emisor = %s AND m.visto_por_emisor = 0)
+                      OR (s.id_emisor <> %s AND m.id_receptor = %s AND m.visto_por_receptor = 0)
+                  ) AS matches_no_vistos
+              """
+        id_tipo_L = catalogo.id_tipo_requerido("L")
+        fila = ejecuta_one(sql, (user_id,) * 4 + (id_tipo_L,) + (user_id,) * 3) or {}
+
+        return {
+            "respuestas_no_vistas": int(fila.get("respuestas_no_vistas") or 0),
+            "solicitudes_nuevas": int(fila.get("solicitudes_nuevas") or 0),
+            "matches_no_vistos": int(fila.get("matches_no_vistos") or 0),
+        }
+
+    # =========================================================
+    # 2) RESUMEN DEL COORDINADOR
+    # =========================================================
+    @staticmethod
+    def resumenCoordinador() -> dict:
+        """
+        ---------------------------------------------------------
+        Devuelve los contadores del nav del coordinador/administrador.
+        ---------------------------------------------------------
+        - pendientes_no_vistos: matches PENDIENTE_VALIDACION con
+          visto_por_coordinador = 0
+        - validaciones_no_vistas: validaciones resueltas no vistas
+          (mismas reglas que GestionValidaciones.numeroValidacionesNoVistas)
+        ---------------------------------------------------------
+        @return: dict con los dos contadores (int)
+        """
+        sql = """
+              SELECT
+                  (SELECT COUNT(*)
+                   FROM `match` m
+                   WHERE m.estado = 'PENDIENTE_VALIDACION'
+                     AND m.visto_por_coordinador = 0) AS pendientes_no_vistos,
+
+                  (SELECT COUNT(*)
+                   FROM validacion v
+                   WHERE v.estado IN ('APROBADA', 'RECHAZADA', 'EXPIRADA')
+                     AND v.visto_por_coordinador = 0) AS validaciones_no_vistas
+              """
+        fila = ejecuta_one(sql) or {}
+
+        return {
+            "pendientes_no_vistos": int(fila.get("pendientes_no_vistos") or 0),
+            "validaciones_no_vistas": int(fila.get("validaciones_no_vistas") or 0),
+        }
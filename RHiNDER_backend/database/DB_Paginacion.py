@@ -0,0 +1,85 @@
+"""
+Utilidades para la paginación por cursor (keyset) de los historiales.
+
+En lugar de OFFSET, cada página continúa a partir de la última fila
+de la anterior, identificada por el par (fecha, id). Así el coste de
+una página no crece con el tamaño del historial.
+"""
+
+from datetime import timedelta
+
+
+def condicion_cursor(col_fecha: str, col_id: str, cursor, orden: str):
+    """
+    ---------------------------------------------------------
+    Condición SQL para continuar después del cursor.
+    ---------------------------------------------------------
+    Se expande la comparación de tuplas para que MySQL pueda
+    usar el índice (fecha, id) como rango.
+    ---------------------------------------------------------
+    @param col_fecha: columna de fecha (p. ej. "m.fecha_match")
+    @param col_id: columna de desempate (p. ej. "m.id_match")
+    @param cursor: tupla (fecha, id) de la última fila o None
+    @param orden: "asc" | "desc"
+    @return: (fragmento SQL que empieza por AND, parámetros)
+    """
+    if not cursor:
+        return "", ()
+
+    fecha, id_ = cursor
+    op = ">" if orden == "asc" else "<"
+    sql = f" AND ({col_fecha} {op} %s OR ({col_fecha} = %s AND {col_id} {op} %s))"
+    return sql, (fecha, fecha, id_)
+
+
+def condicion_filtros(col_estado: str, col_fecha: str, estados=None, desde=None, hasta=None):
+    """
+    ---------------------------------------------------------
+    Filtros de estado y rango de fechas del historial.
+    ---------------------------------------------------------
+    - estados: lista de valores admitidos para `col_estado`
+    - desde / hasta: date, ambos incluidos (se traduce a un
+      rango semiabierto para no aplicar funciones a la columna)
+    ---------------------------------------------------------
+    @return: (fragmento SQL que empieza por AND, parámetros)
+    """
+    sql = ""
+    params = []
+
+    if estados:
+        sql += f" AND {col_estado} IN ({', '.join(['%s'] * len(estados))})"
+        params.extend(estados)
+
+    if desde:
+        sql += f" AND {col_fecha} >= %s"
+        params.append(desde)
+
+    if hasta:
+        sql += f" AND {col_fecha} < %s"
+        params.append(hasta + timedelta(days=1))
+
+    return sql, tuple(params)
+
+
+def orden_keyset(col_fecha: str, col_id: str, orden: str) -> str:
+    direccion = "ASC" if orden == "asc" else "DESC"
+    return f" ORDER BY {col_fecha} {direccion}, {col_id} {direccion}"
+
+
+def cortar_pagina(filas, limite: int, col_fecha: str, col_id: str):
+    """
+    ---------------------------------------------------------
+    Separa la página pedida de la fila extra de control.
+    ---------------------------------------------------------
+    La consulta pide `limite + 1` filas: si llega la extra, hay
+    página siguiente y el cursor es la última fila devuelta.
+    ---------------------------------------------------------
+    @return: (filas de la página, cursor siguiente o None)
+    """
+    filas = filas or []
+    if len(filas) <= limite:
+        return filas, None
+
+    pagina = filas[:limite]
+    ultima = pagina[-1]
+    return pagina, (ultima[col_fecha], ultima[col_id])
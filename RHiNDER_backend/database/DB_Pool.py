@@ -0,0 +1,271 @@
+"""
+Pool de conexiones MySQL para la DAL de RHiNDER.
+
+Responsabilidades:
+- Reutilizar conexiones abiertas en lugar de abrir una por consulta
+- Limitar el número máximo de conexiones simultáneas (min/max)
+- Reciclar conexiones ociosas y comprobar su salud (ping) al prestarlas
+- Recoger métricas de espera para detectar saturación del pool
+"""
+
+import os
+import threading
+import time
+
+
+class ConexionPool:
+    """
+    ---------------------------------------------------------
+    Envoltorio de una conexión prestada por el pool.
+    ---------------------------------------------------------
+    Se comporta como la conexión pymysql original (cursor,
+    commit, rollback...), pero close() NO cierra el socket:
+    devuelve la conexión al pool para reutilizarla.
+    ---------------------------------------------------------
+    Así el código existente (conn.close() en un finally)
+    sigue funcionando sin cambios.
+    ---------------------------------------------------------
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self):
+        # Devolver al pool (solo la primera vez)
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.devolver(conn)
+
+    def __getattr__(self, nombre):
+        if self._conn is None:
+            raise RuntimeError("La conexión ya fue devuelta al pool.")
+        return getattr(self._conn, nombre)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PoolConexiones:
+    """
+    ---------------------------------------------------------
+    Pool de conexiones acotado y seguro entre hilos.
+    ---------------------------------------------------------
+    Parámetros:
+    - crear_conexion: función que abre una conexión nueva
+    - min_size: conexiones ociosas que se conservan siempre
+    - max_size: máximo de conexiones abiertas (prestadas + ociosas)
+    - max_idle: segundos que una conexión puede estar ociosa
+                antes de reciclarse (si sobra respecto a min_size)
+    - timeout: segundos máximos de espera para obtener conexión
+    - transaccional: si True, al devolverla se hace rollback de
+                     lo que no se haya confirmado
+    ---------------------------------------------------------
+    """
+
+    def __init__(self, crear_conexion, min_size=1, max_size=10,
+                 max_idle=300, timeout=10, transaccional=False):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Tamaños de pool inválidos (0 <= min_size <= max_size, max_size >= 1).")
+
+        self._crear_conexion = crear_conexion
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.transaccional = transaccional
+
+        self._lock = threading.Condition()
+        self._reiniciar()
+
+    def _reiniciar(self):
+        # Pila LIFO de (conexion, instante_devolucion): la más reciente
+        # se reutiliza primero y las antiguas envejecen hasta reciclarse
+        self._ociosas = []
+        self._abiertas = 0
+        self._pid = os.getpid()
+        self._metricas = {
+            "prestamos": 0,
+            "creadas": 0,
+            "recicladas": 0,
+            "descartadas": 0,
+            "timeouts": 0,
+            "esperas": 0,
+            "espera_total_ms": 0.0,
+            "espera_max_ms": 0.0,
+        }
+
+    # =====================================================
+    # PRÉSTAMO
+    # =====================================================
+    def obtener(self):
+        """
+        -----------------------------------------------------
+        Presta una conexión del pool (o abre una nueva si
+        aún no se ha alcanzado max_size).
+        -----------------------------------------------------
+        - Si todas están prestadas, espera hasta `timeout`.
+        - Antes de entregarla se hace ping: si la conexión
+          está rota se descarta y se abre otra.
+        -----------------------------------------------------
+        @return: ConexionPool (close() la devuelve al pool)
+        """
+        inicio = time.monotonic()
+
+        with self._lock:
+            # Tras un fork (gunicorn) las conexiones heredadas no son válidas
+            if self._pid != os.getpid():
+                self._reiniciar()
+
+            self._reciclar_ociosas()
+
+            esperado = False
+            while not self._ociosas and self._abiertas >= self.max_size:
+                esperado = True
+                restante = self.timeout - (time.monotonic() - inicio)
+                if restante <= 0:
+                    self._metricas["timeouts"] += 1
+                    raise RuntimeError(
+                        f"Timeout esperando conexión del pool ({self.max_size} en uso)."
+                    )
+                self._lock.wait(restante)
+
+            if self._ociosas:
+                conn, _ = self._ociosas.pop()
+            else:
+                # Reservamos el hueco antes de abrir (fuera del lock)
+                conn = None
+                self._abiertas += 1
+
+            espera_ms = (time.monotonic() - inicio) * 1000
+            self._metricas["prestamos"] += 1
+            self._metricas["espera_total_ms"] += espera_ms
+            self._metricas["espera_max_ms"] = max(self._metricas["espera_max_ms"], espera_ms)
+            if esperado:
+                self._metricas["esperas"] += 1
+
+        try:
+            if conn is None:
+                conn = self._abrir()
+            elif not self._sana(conn):
+                conn = self._abrir()
+        except Exception:
+            self._liberar_hueco()
+            raise
+
+        return ConexionPool(self, conn)
+
+    def devolver(self, conn):
+        """
+        -----------------------------------------------------
+        Devuelve una conexión al pool.
+        -----------------------------------------------------
+        - En el pool transaccional se hace rollback de lo
+          pendiente para no "contaminar" al siguiente uso.
+        - Si la conexión falla, se cierra y se libera su hueco.
+        -----------------------------------------------------
+        """
+        try:
+            if self.transaccional:
+                conn.rollback()
+        except Exception:
+            self._cerrar(conn)
+            with self._lock:
+                self._metricas["descartadas"] += 1
+            self._liberar_hueco()
+            return
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Conexión de otro proceso: no se reutiliza
+                self._cerrar(conn)
+                return
+            self._ociosas.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    # =====================================================
+    # MÉTRICAS
+    # =====================================================
+    def estadisticas(self):
+        """
+        -----------------------------------------------------
+        Devuelve un snapshot de las métricas del pool.
+        -----------------------------------------------------
+        Incluye tamaño actual (abiertas / ociosas / en uso) y
+        tiempos de espera para obtener conexión.
+        -----------------------------------------------------
+        @return: diccionario con métricas
+        """
+        with self._lock:
+            datos = dict(self._metricas)
+            datos["abiertas"] = self._abiertas
+            datos["ociosas"] = len(self._ociosas)
+            datos["en_uso"] = self._abiertas - len(self._ociosas)
+            datos["min_size"] = self.min_size
+            datos["max_size"] = self.max_size
+
+        prestamos = datos["prestamos"]
+        datos["espera_media_ms"] = datos["espera_total_ms"] / prestamos if prestamos else 0.0
+        return datos
+
+    def cerrar_todas(self):
+        """
+        -----------------------------------------------------
+        Cierra todas las conexiones ociosas del pool.
+        -----------------------------------------------------
+        """
+        with self._lock:
+            ociosas, self._ociosas = self._ociosas, []
+            self._abiertas -= len(ociosas)
+            self._lock.notify_all()
+
+        for conn, _ in ociosas:
+            self._cerrar(conn)
+
+    # =====================================================
+    # HELPERS INTERNOS
+    # =====================================================
+    def _abrir(self):
+        conn = self._crear_conexion()
+        with self._lock:
+            self._metricas["creadas"] += 1
+        return conn
+
+    def _sana(self, conn):
+        # Ping sin reconectar: si falla, se descarta la conexión
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            self._cerrar(conn)
+            with self._lock:
+                self._metricas["descartadas"] += 1
+            return False
+
+    def _reciclar_ociosas(self):
+        # Se llama con el lock adquirido.
+        # Las más antiguas están al principio de la pila.
+        if not self.max_idle:
+            return
+
+        limite = time.monotonic() - self.max_idle
+        while len(self._ociosas) > self.min_size and self._ociosas[0][1] < limite:
+            conn, _ = self._ociosas.pop(0)
+            self._abiertas -= 1
+            self._metricas["recicladas"] += 1
+            self._cerrar(conn)
+
+    def _liberar_hueco(self):
+        with self._lock:
+            self._abiertas -= 1
+            self._lock.notify()
+
+    @staticmethod
+    def _cerrar(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -6,7 +6,78 @@ de consultar los turnos asignados a los trabajadores, así como
 información derivada como los días libres.
 """
 
+from datetime import date
+
 from .DB_Conexion import ejecuta_all
+from .DB_Catalogo import catalogo
+
+
+# =========================================================
+# HELPER: RANGO DE FECHAS DE UN MES
+# =========================================================
+def _rango_mes(year, month):
+    """
+    ---------------------------------------------------------
+    Devuelve el rango semiabierto [primer_dia, primer_dia_mes_siguiente)
+    de un mes concreto.
+    ---------------------------------------------------------
+    Se usa en lugar de YEAR(fecha)=... AND MONTH(fecha)=...
+    porque una comparación directa sobre la columna permite a
+    MySQL usar el índice de turno.fecha_turno (consulta "sargable").
+    ---------------------------------------------------------
+    @param year: año numérico (ej. 2025)
+    @param month: mes numérico (1..12)
+    @return: tupla (date inicio, date fin_exclusivo)
+    """
+    year = int(year)
+    month = int(month)
+
+    inicio = date(year, month, 1)
+    if month == 12:
+        fin = date(year + 1, 1, 1)
+    else:
+        fin = date(year, month + 1, 1)
+
+    return inicio, fin
+
+
+def sumar_meses(year, month, delta):
+    """
+    @return: (year, month) desplazado `delta` meses
+    """
+    indice = int(year) * 12 + int(month) - 1 + int(delta)
+    return indice // 12, indice % 12 + 1
+
+
+def _rango_meses(year_desde, month_desde, year_hasta, month_hasta):
+    """
+    ---------------------------------------------------------
+    Rango semiabierto que cubre varios meses completos.
+    ---------------------------------------------------------
+    @return: tupla (date inicio, date fin_exclusivo, lista de
+             claves "YYYY-MM" de los meses incluidos)
+    """
+    inicio, _ = _rango_mes(year_desde, month_desde)
+    _, fin = _rango_mes(year_hasta, month_hasta)
+
+    meses = []
+    year, month = int(year_desde), int(month_desde)
+    while (year, month) <= (int(year_hasta), int(month_hasta)):
+        meses.append(f"{year:04d}-{month:02d}")
+        year, month = sumar_meses(year, month, 1)
+
+    return inicio, fin, meses
+
+
+def _agrupar_por_mes(filas, meses):
+    """
+    Reparte las filas (con fecha_turno) por mes "YYYY-MM".
+    Todos los meses pedidos aparecen, aunque no tengan filas.
+    """
+    por_mes = {mes: [] for mes in meses}
+    for fila in filas or []:
+        por_mes[str(fila["fecha_turno"])[:7]].append(fila)
+    return por_mes
 
 
 class GestionTurnos:
@@ -15,6 +86,8 @@ class GestionTurnos:
     Clase DAL para gestionar consultas sobre turnos.
     ---------------------------------------------------------
     No modifica datos, solo realiza consultas SELECT.
+    Los datos de tipo_turno se toman del catálogo en memoria
+    (DB_Catalogo) en lugar de hacer JOIN en cada consulta.
     Se utiliza principalmente para:
     - Calendarios mensuales
     - Comprobación de días libres
@@ -55,29 +128,8 @@ class GestionTurnos:
         ---------------------------------------------------------
         """
 
-        sql = """
-            SELECT
-                tt.id_trabajador AS id_user,
-                tt.id_turno_trabajador,
-                t.id_turno,
-                t.fecha_turno,
-                tp.id_tipo_turno,
-                tp.nomenclatura,
-                tp.turno
-            FROM turno_trabajador tt
-            JOIN turno t
-                ON t.id_turno = tt.id_turno
-            JOIN tipo_turno tp
-                ON tp.id_tipo_turno = t.id_tipo_turno
-            WHERE
-                tt.id_trabajador = %s
-                AND YEAR(t.fecha_turno) = %s
-                AND MONTH(t.fecha_turno) = %s
-            ORDER BY
-                t.fecha_turno ASC;
-        """
-
-        return ejecuta_all(sql, (user_id, year, month))
+        inicio, fin = _rango_mes(year, month)
+        return GestionTurnos._turnos_trabajador(user_id, inicio, fin)
 
     # =========================================================
     # 2) DÍAS LIBRES DE UN USUARIO EN UN MES CONCRETO
@@ -104,18 +156,87 @@ class GestionTurnos:
         ---------------------------------------------------------
         """
 
+        inicio, fin = _rango_mes(year, month)
+        return GestionTurnos._dias_libres(user_id, inicio, fin)
+
+    # =========================================================
+    # 3) TURNOS DE UN TRABAJADOR EN VARIOS MESES
+    # =========================================================
+    @staticmethod
+    def getTurnosTrabajadorRango(user_id, year_desde, month_desde, year_hasta, month_hasta):
+        """
+        ---------------------------------------------------------
+        Turnos de varios meses completos en una sola consulta.
+        ---------------------------------------------------------
+        Lo usa el calendario para precargar los meses vecinos y
+        navegar sin una petición por clic.
+        ---------------------------------------------------------
+        Devuelve:
+        {"YYYY-MM": [turnos del mes (como getTurnosTrabajadorMes)], ...}
+        con todos los meses del rango, aunque estén vacíos.
+        ---------------------------------------------------------
+        """
+        inicio, fin, meses = _rango_meses(year_desde, month_desde, year_hasta, month_hasta)
+        return _agrupar_por_mes(GestionTurnos._turnos_trabajador(user_id, inicio, fin), meses)
+
+    # =========================================================
+    # 4) DÍAS LIBRES DE UN USUARIO EN VARIOS MESES
+    # =========================================================
+    @staticmethod
+    def diasLibresUsuarioRango(user_id, year_desde, month_desde, year_hasta, month_hasta):
+        """
+        ---------------------------------------------------------
+        Días libres ('L') de varios meses en una sola consulta.
+        ---------------------------------------------------------
+        Devuelve:
+        {"YYYY-MM": [{"fecha_turno": ...}, ...], ...}
+        ---------------------------------------------------------
+        """
+        inicio, fin, meses = _rango_meses(year_desde, month_desde, year_hasta, month_hasta)
+        return _agrupar_por_mes(GestionTurnos._dias_libres(user_id, inicio, fin), meses)
+
+    # =========================================================
+    # CONSULTAS POR RANGO [inicio, fin)
+    # =========================================================
+    @staticmethod
+    def _turnos_trabajador(user_id, inicio, fin):
+        sql = """
+            SELECT
+                tt.id_trabajador AS id_user,
+                tt.id_turno_trabajador,
+                t.id_turno,
+                t.fecha_turno,
+                t.id_tipo_turno
+            FROM turno_trabajador tt
+            JOIN turno t
+                ON t.id_turno = tt.id_turno
+            WHERE
+                tt.id_trabajador = %s
+                AND t.fecha_turno >= %s
+                AND t.fecha_turno < %s
+            ORDER BY
+                t.fecha_turno ASC;
+        """
+
+        filas = ejecuta_all(sql, (user_id, inicio, fin))
+
+        # nomenclatura/turno salen del catálogo (sin JOIN a tipo_turno);
+        # de paso, el catálogo aprende los id_turno del rango
+        catalogo.registrar_turnos(filas)
+        return catalogo.completar_tipos(filas)
+
+    @staticmethod
+    def _dias_libres(user_id, inicio, fin):
         sql = """
         SELECT t.fecha_turno
         FROM turno_trabajador tt
         JOIN turno t
             ON t.id_turno = tt.id_turno
-        JOIN tipo_turno tp
-            ON tp.id_tipo_turno = t.id_tipo_turno
         WHERE tt.id_trabajador = %s
-          AND YEAR(t.fecha_turno) = %s
-          AND MONTH(t.fecha_turno) = %s
-          AND tp.nomenclatura = 'L'
+          AND t.fecha_turno >= %s
+          AND t.fecha_turno < %s
+          AND t.id_tipo_turno = %s
         ORDER BY t.fecha_turno ASC;
         """
 
-        return ejecuta_all(sql, (user_id, year, month))
+        return ejecuta_all(sql, (user_id, inicio, fin, catalogo.id_tipo_requerido("L")))
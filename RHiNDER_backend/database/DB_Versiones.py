@@ -0,0 +1,96 @@
+"""
+Versiones de los recursos para las peticiones condicionales (ETag).
+
+Cada clave tiene un contador en la tabla version_recurso (migración 007)
+que se incrementa DESPUÉS de confirmar cada escritura que la afecta:
+
+- "turnos:<id>", "matches:<id>", "respuestas:<id>": datos de un usuario.
+  Cada escritura incrementa solo las de sus participantes (emisor,
+  receptor, trabajadores del intercambio)
+- "usuario:<id>": cambios que solo ve ese usuario (marcas de visto)
+- "solicitudes": cambios que ven todos, p. ej. una solicitud que aparece
+  o desaparece de las recibidas de cualquier trabajador libre ese día
+- "general": mantenimiento masivo que no sabe a quién afecta (expiración
+  con el procedimiento almacenado, cargas manuales). Todos los endpoints
+  versionados dependen de ella
+
+Los endpoints leen las versiones (una consulta por PK) ANTES de la
+consulta completa y derivan de ellas el ETag: si el cliente ya tiene esa
+versión se responde 304 sin ejecutar la consulta. Leer antes garantiza
+que un ETag nunca acompaña a datos más antiguos que su versión.
+"""
+
+from .DB_Conexion import ejecuta_all, ejecuta_Update_Delete
+
+
+VERSION_GENERAL = "general"
+VERSION_SOLICITUDES = "solicitudes"
+
+
+def clave_usuario(user_id) -> str:
+    return f"usuario:{int(user_id)}"
+
+
+def clave_turnos(user_id) -> str:
+    return f"turnos:{int(user_id)}"
+
+
+def clave_matches(user_id) -> str:
+    return f"matches:{int(user_id)}"
+
+
+def clave_respuestas(user_id) -> str:
+    return f"respuestas:{int(user_id)}"
+
+
+class GestionVersiones:
+    """
+    ---------------------------------------------------------
+    Contadores de versión de los recursos.
+    ---------------------------------------------------------
+    Nunca lanzan excepción: un fallo al versionar no debe
+    romper la escritura ya confirmada ni la lectura (sin
+    versión, el endpoint responde completo y sin ETag).
+    ---------------------------------------------------------
+    """
+
+    @staticmethod
+    def leer(claves):
+        """
+        @param claves: lista de claves
+        @return: dict clave -> versión (0 si aún no existe),
+                 o None si no se han podido leer
+        """
+        claves = list(claves)
+        try:
+            filas = ejecuta_all(
+                f"SELECT clave, version FROM version_recurso "
+                f"WHERE clave IN ({', '.join(['%s'] * len(claves))})",
+                claves
+            ) or []
+        except Exception as e:
+            print(f"[WARN] GestionVersiones.leer({claves}): {e}")
+            return None
+
+        versiones = dict.fromkeys(claves, 0)
+        versiones.update({f["clave"]: int(f["version"]) for f in filas})
+        return versiones
+
+    @staticmethod
+    def incrementar(*claves):
+        """
+        Incrementa las versiones de `claves` (una sola sentencia).
+        Llamar después del commit de la escritura.
+        """
+        claves = sorted({c for c in claves if c})
+        if not claves:
+            return
+        try:
+            ejecuta_Update_Delete(
+                f"INSERT INTO version_recurso (clave, version) "
+                f"VALUES {', '.join(['(%s, 1)'] * len(claves))} "
+                f"ON DUPLICATE KEY UPDATE version = version + 1",
+                claves
+            )
+        except Exception as e:
+            print(f"[WARN] GestionVersiones.incrementar({claves}): {e}")
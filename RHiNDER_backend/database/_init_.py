@@ -6,13 +6,14 @@ Su objetivo es separar el acceso a base de datos del resto de la lógica
 de la aplicación (endpoints, servicios, etc.).
 """
 
-from .DB_Conexion import conecta_rhinder, ejecuta_all, ejecuta_one, ejecuta_insert
+from .DB_Conexion import conecta_rhinder, ejecuta_all, ejecuta_one, ejecuta_insert, estadisticas_pool
 from .DB_Gestion_Usuarios import GestionUsuarios
 from .DB_Turnos import GestionTurnos
 from .DB_Gestion_Solicitudes_Enviadas import GestionSolicitudesEnviadas
 from .DB_Gestion_Respuestas import GestionRespuestas
 from .DB_Gestion_Solicitudes_Recibidas import GestionSolicitudesRecibidas
 from .DB_Gestion_Matches import GestionMatches
+from .DB_Catalogo import catalogo
 
 
 
@@ -29,10 +30,12 @@ __all__ = [
     "ejecuta_all",
     "ejecuta_one",
     "ejecuta_insert",
+    "estadisticas_pool",
     "GestionUsuarios",
     "GestionTurnos",
     "GestionSolicitudesEnviadas",
     "GestionRespuestas",
     "GestionSolicitudesRecibidas",
     "GestionMatches",
+    "catalogo",
 ]
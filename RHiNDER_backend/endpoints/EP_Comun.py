@@ -0,0 +1,348 @@
+# endpoints/EP_Comun.py
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+from datetime import date, datetime
+
+from flask import request, make_response
+
+from database.DB_Versiones import GestionVersiones, VERSION_GENERAL
+
+try:
+    import brotli
+except ImportError:     # opcional: sin brotli se comprime solo con gzip
+    brotli = None
+
+
+# ============================================================
+# PETICIONES CONDICIONALES (ETag / If-None-Match)
+# ============================================================
+# El navegador puede guardar la respuesta, pero debe revalidarla
+CACHE_CONTROL_ETAG = "private, no-cache"
+
+# Cambiar si cambia el formato de las respuestas versionadas
+# (invalida los ETag que tengan guardados los clientes)
+FORMATO_ETAG = 1
+
+def calcular_etag(data) -> str:
+    """
+    ------------------------------------------------------------
+    Calcula un ETag a partir del contenido de la respuesta.
+    ------------------------------------------------------------
+    Se serializa con claves ordenadas para que el mismo contenido
+    genere siempre el mismo ETag.
+    ------------------------------------------------------------
+    @param data: datos que devolvería el endpoint
+    @return: hash hexadecimal (sin comillas)
+    """
+    texto = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def respuesta_con_etag(data, code=200, etag=None):
+    """
+    ------------------------------------------------------------
+    Devuelve la respuesta de un recurso con cabecera ETag y
+    responde 304 (sin cuerpo) si el cliente ya tiene esa versión.
+    ------------------------------------------------------------
+    - Si no se indica `etag`, se calcula sobre `data`.
+    - Cache-Control: no-cache → el navegador puede guardar la
+      respuesta, pero debe revalidarla siempre con If-None-Match.
+    ------------------------------------------------------------
+    @param data: datos del recurso (dict / list / número)
+    @param code: código HTTP si hay cuerpo (por defecto 200)
+    @param etag: versión ya calculada (opcional)
+    @return: tupla (data, code, headers) o Response 304
+    """
+    if etag is None:
+        etag = calcular_etag(data)
+
+    # El cliente ya tiene esta versión → 304 sin cuerpo
+    # (comparación débil: el ETag de una respuesta comprimida es W/"...")
+    if request.if_none_match.contains_weak(etag):
+        return _no_modificado(etag)
+
+    return data, code, {"Cache-Control": CACHE_CONTROL_ETAG, "ETag": f'"{etag}"'}
+
+
+def respuesta_versionada(user_id, claves, calcular, code=200):
+    """
+    ------------------------------------------------------------
+    Como respuesta_con_etag, pero el ETag sale de las versiones
+    de los recursos (DB_Versiones) y no del contenido.
+    ------------------------------------------------------------
+    - Si el cliente ya tiene la versión → 304 SIN ejecutar
+      `calcular` (la consulta completa).
+    - Las versiones se leen ANTES de calcular los datos: así un
+      ETag nunca acompaña a datos más antiguos que su versión.
+    - Además de `claves` se incluye siempre VERSION_GENERAL
+      (mantenimiento masivo).
+    - El ETag incluye usuario, ruta y query string.
+    - Si no se pueden leer las versiones, se responde completo
+      y sin ETag.
+    ------------------------------------------------------------
+    @param user_id: usuario autenticado
+    @param claves: claves de versión de las que dependen los datos
+    @param calcular: función sin argumentos que devuelve los datos
+    @param code: código HTTP si hay cuerpo (por defecto 200)
+    @return: tupla (data, code, headers) o Response 304
+    """
+    claves = [VERSION_GENERAL] + list(claves)
+    versiones = GestionVersiones.leer(claves)
+    if versiones is None:
+        return calcular(), code
+
+    etag = calcular_etag([
+        FORMATO_ETAG,
+        int(user_id),
+        request.path,
+        request.query_string.decode("latin-1"),
+        [versiones[c] for c in claves],
+    ])
+
+    if request.if_none_match.contains_weak(etag):
+        return _no_modificado(etag)
+
+    return calcular(), code, {"Cache-Control": CACHE_CONTROL_ETAG, "ETag": f'"{etag}"'}
+
+
+def _no_modificado(etag):
+    resp = make_response("", 304)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = CACHE_CONTROL_ETAG
+    # Mismo Vary que la respuesta 200 (comprimir_respuesta)
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+# ============================================================
+# COMPRESIÓN DE RESPUESTAS (Accept-Encoding)
+# ============================================================
+# Por debajo de este tamaño no compensa (cabeceras + CPU)
+COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", "1024"))
+
+# gzip: 1 (rápido) .. 9 (máximo) · brotli: 0 .. 11
+COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", "6"))
+COMPRESION_NIVEL_BROTLI = int(os.getenv("COMPRESION_NIVEL_BROTLI", "4"))
+
+
+def codificaciones_disponibles():
+    """
+    Codificaciones que sabe generar el servidor, por preferencia.
+    """
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def comprimir(cuerpo: bytes, codificacion: str) -> bytes:
+    """
+    ------------------------------------------------------------
+    Comprime `cuerpo` con la codificación indicada ("br" o
+    "gzip") y el nivel configurado.
+    ------------------------------------------------------------
+    gzip se genera con mtime=0: el mismo cuerpo produce siempre
+    los mismos bytes.
+    ------------------------------------------------------------
+    """
+    if codificacion == "br":
+        return brotli.compress(cuerpo, quality=COMPRESION_NIVEL_BROTLI)
+    return gzip.compress(cuerpo, compresslevel=COMPRESION_NIVEL_GZIP, mtime=0)
+
+
+def comprimir_respuesta(resp):
+    """
+    ------------------------------------------------------------
+    Comprime la respuesta si el cliente lo admite.
+    ------------------------------------------------------------
+    - Siempre añade Vary: Accept-Encoding (la misma URL puede
+      devolver cuerpos distintos según la cabecera).
+    - Solo comprime cuerpos de al menos COMPRESION_MIN_BYTES y
+      que no estén ya codificados; nunca 204 / 304.
+    - Se elige br o gzip según las calidades de Accept-Encoding
+      (q=0 excluye una codificación).
+    - Un ETag fuerte identifica bytes exactos: al comprimir pasa
+      a débil (W/"..."), y las comparaciones de If-None-Match
+      se hacen en modo débil.
+    ------------------------------------------------------------
+    @param resp: Response de Flask con el cuerpo ya serializado
+    @return: la misma Response
+    """
+    resp.vary.add("Accept-Encoding")
+
+    if (resp.status_code in (204, 304)
+            or resp.direct_passthrough
+            or "Content-Encoding" in resp.headers):
+        return resp
+
+    cuerpo = resp.get_data()
+    if len(cuerpo) < COMPRESION_MIN_BYTES:
+        return resp
+
+    codificacion = request.accept_encodings.best_match(codificaciones_disponibles())
+    if codificacion is None:
+        return resp
+
+    resp.set_data(comprimir(cuerpo, codificacion))
+    resp.headers["Content-Encoding"] = codificacion
+
+    etag, debil = resp.get_etag()
+    if etag and not debil:
+        resp.set_etag(etag, weak=True)
+
+    return resp
+
+
+# ============================================================
+# FORMATO COLUMNAR (?formato=columnas)
+# ============================================================
+FORMATO_COLUMNAS = "columnas"
+
+
+def leer_formato():
+    """
+    ------------------------------------------------------------
+    Lee ?formato= de la query string.
+    ------------------------------------------------------------
+    Sin parámetro → formato de siempre (lista de objetos).
+    ------------------------------------------------------------
+    @return: (True si se piden columnas, error | None)
+    """
+    formato = (request.args.get("formato") or "").lower()
+    if formato and formato != FORMATO_COLUMNAS:
+        return False, "Formato no válido."
+    return formato == FORMATO_COLUMNAS, None
+
+
+def a_columnas(filas):
+    """
+    ------------------------------------------------------------
+    Convierte una lista de filas (dict) en formato columnar:
+      {"columns": [...], "rows": [[...], ...], "dict": {...}}
+    ------------------------------------------------------------
+    - Los nombres de columna se envían una sola vez.
+    - Las columnas de texto con valores repetidos (usernames,
+      nomenclaturas, estados) se codifican con diccionario: la
+      celda lleva el índice en dict[columna] (NULL sigue null).
+    - El cliente lo decodifica con desdeColumnas (store_api.js).
+    ------------------------------------------------------------
+    @param filas: lista de dicts con las mismas claves
+    @return: dict en formato columnar
+    """
+    columnas = list(filas[0].keys()) if filas else []
+    rows = [[fila.get(c) for c in columnas] for fila in filas]
+
+    diccionario = {}
+    for i, columna in enumerate(columnas):
+        valores = {}
+        for fila in rows:
+            valor = fila[i]
+            if valor is None:
+                continue
+            if not isinstance(valor, str):
+                break
+            valores.setdefault(valor, len(valores))
+        else:
+            # Compensa solo si cada valor aparece de media 2+ veces
+            if valores and len(valores) * 2 <= len(rows):
+                for fila in rows:
+                    if fila[i] is not None:
+                        fila[i] = valores[fila[i]]
+                diccionario[columna] = list(valores)
+
+    return {"columns": columnas, "rows": rows, "dict": diccionario}
+
+
+# ============================================================
+# PAGINACIÓN POR CURSOR (KEYSET)
+# ============================================================
+LIMITE_MAX = 100
+
+
+def codificar_cursor(cursor):
+    """
+    ------------------------------------------------------------
+    Convierte el par (fecha, id) de la última fila en un token
+    opaco para la URL (?cursor=...).
+    ------------------------------------------------------------
+    @param cursor: tupla (fecha, id) o None
+    @return: str base64 url-safe o None
+    """
+    if cursor is None:
+        return None
+
+    fecha, id_ = cursor
+    if isinstance(fecha, datetime):
+        fecha = fecha.isoformat(sep=" ")
+    elif isinstance(fecha, date):
+        fecha = fecha.isoformat()
+
+    crudo = json.dumps([fecha, int(id_)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(token: str):
+    """
+    ------------------------------------------------------------
+    Inverso de codificar_cursor.
+    ------------------------------------------------------------
+    @return: tupla (fecha_iso, id)
+    @raise ValueError: si el token no es válido
+    """
+    try:
+        relleno = "=" * (-len(token) % 4)
+        fecha, id_ = json.loads(base64.urlsafe_b64decode(token + relleno))
+        return str(fecha), int(id_)
+    except Exception:
+        raise ValueError("Cursor no válido.")
+
+
+def leer_paginacion(estados_validos):
+    """
+    ------------------------------------------------------------
+    Lee los parámetros de paginación y filtros de la query string.
+    ------------------------------------------------------------
+    ?limite=20&cursor=<token>&estado=...&desde=YYYY-MM-DD
+     &hasta=YYYY-MM-DD&orden=desc|asc&total=1
+    ------------------------------------------------------------
+    - Sin ?limite ni ?cursor → None (el endpoint mantiene el
+      listado completo de siempre).
+    ------------------------------------------------------------
+    @param estados_validos: claves admitidas en ?estado=
+    @return: (dict de parámetros | None, error | None)
+    """
+    args = request.args
+    if "limite" not in args and "cursor" not in args:
+        return None, None
+
+    try:
+        limite = int(args.get("limite", 20))
+        if not 1 <= limite <= LIMITE_MAX:
+            raise ValueError
+
+        token = args.get("cursor")
+        cursor = decodificar_cursor(token) if token else None
+
+        estado = (args.get("estado") or "").lower() or None
+        if estado is not None and estado not in estados_validos:
+            raise ValueError
+
+        desde = date.fromisoformat(args["desde"]) if args.get("desde") else None
+        hasta = date.fromisoformat(args["hasta"]) if args.get("hasta") else None
+
+        orden = args.get("orden", "desc").lower()
+        if orden not in ("asc", "desc"):
+            raise ValueError
+    except ValueError:
+        return None, "Parámetros de paginación no válidos."
+
+    return {
+        "limite": limite,
+        "cursor": cursor,
+        "estado": estado,
+        "desde": desde,
+        "hasta": hasta,
+        "orden": orden,
+        "total": args.get("total") in ("1", "true"),
+    }, None
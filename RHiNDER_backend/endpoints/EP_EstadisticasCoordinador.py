@@ -1,9 +1,10 @@
 from flask import request
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
 
 # Importar módulo de acceso a datos de estadísticas
 from database.DB_Estadisticas_Coordinador import EstadisticasCoordinador
+from database.DB_Gestion_Usuarios import _es_coordinador_o_admin
 
 
 # ============================================================
@@ -77,3 +78,38 @@ class EstadisticasValidacionesEstado(Resource):
 
         # Devolver resumen estadístico
         return data, 200
+
+
+# ============================================================
+# ESTADÍSTICAS: MÉTRICAS DE LA CACHÉ
+# ============================================================
+class EstadisticasCache(Resource):
+    """
+    ------------------------------------------------------------
+    Endpoint que devuelve los contadores de la caché de
+    resultados de las estadísticas (aciertos / fallos).
+    ------------------------------------------------------------
+    """
+
+    @jwt_required()
+    def get(self):
+        """
+        --------------------------------------------------------
+        GET /coordinador/estadisticas/cache
+        --------------------------------------------------------
+        Las cifras son de este proceso (cada worker tiene su
+        propia caché).
+        --------------------------------------------------------
+        @return:
+          - 200 + {ttl, entradas, hits, misses}
+          - 403 si el usuario no tiene permisos
+        """
+
+        # Usuario autenticado
+        user_id = int(get_jwt_identity())
+
+        # Control de permisos
+        if not _es_coordinador_o_admin(user_id):
+            return {"ok": False, "msg": "No autorizado."}, 403
+
+        return EstadisticasCoordinador.estadisticasCache(), 200
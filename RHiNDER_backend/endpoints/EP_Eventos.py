@@ -0,0 +1,244 @@
+# endpoints/EP_Eventos.py
+
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, stream_with_context
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+
+# Importar módulos de acceso a base de datos
+from database.DB_Notificaciones import GestionNotificaciones
+from database.DB_Gestion_Usuarios import _es_coordinador_o_admin
+
+
+# ============================================================
+# CONFIGURACIÓN DEL STREAM
+# ============================================================
+KEEPALIVE_S = 25        # comentario ": ping" para que proxies no corten la conexión
+RESYNC_S = 300          # recálculo periódico (cubre cambios de otros procesos, p. ej. expirar.py)
+AGRUPAR_S = 0.5         # ventana para agrupar varios eventos seguidos en un solo recálculo
+RETRY_MS = 10000        # reintento sugerido al EventSource del navegador
+
+
+# ============================================================
+# PUB/SUB EN MEMORIA
+# ============================================================
+class Suscripcion:
+    """
+    ------------------------------------------------------------
+    Suscripción de un stream a uno o varios canales.
+    ------------------------------------------------------------
+    Los eventos son solo avisos de "algo ha cambiado": si la cola
+    se llena se descartan, porque el stream recalcula el resumen
+    completo igualmente.
+    ------------------------------------------------------------
+    """
+
+    def __init__(self, canales):
+        self.canales = tuple(canales)
+        self._cola = queue.Queue(maxsize=100)
+
+    def entregar(self, evento):
+        try:
+            self._cola.put_nowait(evento)
+        except queue.Full:
+            pass
+
+    def esperar(self, timeout):
+        """
+        Espera hasta `timeout` segundos a que llegue un evento.
+        Tras el primero, agrupa los que lleguen en AGRUPAR_S.
+        @return: lista de eventos (vacía si no llegó ninguno)
+        """
+        try:
+            eventos = [self._cola.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        time.sleep(AGRUPAR_S)
+        while True:
+            try:
+                eventos.append(self._cola.get_nowait())
+            except queue.Empty:
+                return eventos
+
+
+class BusEventosMemoria:
+    """
+    ------------------------------------------------------------
+    Bus de eventos publicar/suscribir dentro del proceso.
+    ------------------------------------------------------------
+    Interfaz (la misma que debe cumplir un bus alternativo):
+    - suscribir(canales) -> Suscripcion
+    - cancelar(suscripcion)
+    - publicar(canal, evento)
+    ------------------------------------------------------------
+    Limitación: solo llega a los streams del MISMO proceso. Con
+    varios workers de gunicorn, o para recibir avisos de scripts
+    externos, hay que sustituirlo con configurar_bus() por uno
+    respaldado por un broker local (Redis, etc.).
+    ------------------------------------------------------------
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._suscripciones = defaultdict(set)
+
+    def suscribir(self, canales):
+        sub = Suscripcion(canales)
+        with self._lock:
+            for canal in sub.canales:
+                self._suscripciones[canal].add(sub)
+        return sub
+
+    def cancelar(self, sub):
+        with self._lock:
+            for canal in sub.canales:
+                subs = self._suscripciones.get(canal)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._suscripciones[canal]
+
+    def publicar(self, canal, evento):
+        with self._lock:
+            destinatarios = list(self._suscripciones.get(canal, ()))
+        for sub in destinatarios:
+            sub.entregar(evento)
+
+
+_bus = BusEventosMemoria()
+
+
+def configurar_bus(nuevo_bus):
+    """
+    ------------------------------------------------------------
+    Sustituye el bus en memoria por otra implementación con la
+    misma interfaz (suscribir / cancelar / publicar).
+    ------------------------------------------------------------
+    """
+    global _bus
+    _bus = nuevo_bus
+
+
+def canal_usuario(user_id) -> str:
+    return f"usuario:{int(user_id)}"
+
+
+# Canales comunes
+CANAL_TODOS = "todos"
+CANAL_TRABAJADORES = "trabajadores"
+CANAL_COORDINADORES = "coordinadores"
+
+
+def publicar_evento(canales, tipo: str):
+    """
+    ------------------------------------------------------------
+    Publica un aviso de cambio en uno o varios canales.
+    ------------------------------------------------------------
+    Se llama desde los endpoints tras una escritura que afecta a
+    los badges. Nunca lanza excepción: un fallo del bus no debe
+    romper la operación que ya se ha confirmado en BD.
+    ------------------------------------------------------------
+    @param canales: lista de canales (canal_usuario(id), CANAL_TODOS...)
+    @param tipo: nombre del cambio (p. ej. "respuesta_creada")
+    """
+    evento = {"tipo": tipo, "ts": time.time()}
+    for canal in canales:
+        try:
+            _bus.publicar(canal, evento)
+        except Exception as e:
+            print(f"[WARN] publicar_evento({canal}, {tipo}): {e}")
+
+
+# ============================================================
+# STREAM SSE DE NOTIFICACIONES
+# ============================================================
+def _formato_sse(evento: str, datos) -> str:
+    return f"event: {evento}\ndata: {json.dumps(datos)}\n\n"
+
+
+class EventosStream(Resource):
+    """
+    ------------------------------------------------------------
+    GET /eventos/stream?jwt=<token>
+    ------------------------------------------------------------
+    Stream Server-Sent Events con los contadores del nav.
+    ------------------------------------------------------------
+    EventSource no permite cabeceras, por eso en ESTE endpoint
+    el JWT se acepta también en el parámetro ?jwt= (el resto de
+    la API solo lo acepta en la cabecera, ver main.py).
+    ------------------------------------------------------------
+    """
+
+    @jwt_required(locations=["headers", "query_string"])
+    def get(self):
+        """
+        --------------------------------------------------------
+        Mantiene abierta la conexión y envía un evento "resumen"
+        cada vez que cambia algún contador del usuario.
+        --------------------------------------------------------
+        - Al conectar se envía el resumen completo.
+        - Después solo se envían los contadores que cambian
+          (delta), tras recibir un aviso del bus o en el
+          recálculo periódico (RESYNC_S).
+        - El stream se cierra cuando caduca el JWT; el cliente
+          vuelve a conectar con un token nuevo.
+        --------------------------------------------------------
+        @return:
+          - 200 text/event-stream
+        """
+
+        user_id = int(get_jwt_identity())
+        caduca = get_jwt().get("exp") or (time.time() + 15 * 60)
+
+        # El rol decide qué resumen y qué canales le corresponden
+        if _es_coordinador_o_admin(user_id):
+            calcular = GestionNotificaciones.resumenCoordinador
+            canales = [CANAL_TODOS, CANAL_COORDINADORES, canal_usuario(user_id)]
+        else:
+            calcular = lambda: GestionNotificaciones.resumenTrabajador(user_id)
+            canales = [CANAL_TODOS, CANAL_TRABAJADORES, canal_usuario(user_id)]
+
+        bus = _bus
+        sub = bus.suscribir(canales)
+
+        def generar():
+            try:
+                yield f"retry: {RETRY_MS}\n\n"
+
+                ultimo = {}
+                ultimo_calculo = 0.0
+                recalcular = True
+
+                while time.time() < caduca:
+                    if recalcular:
+                        actual = calcular()
+                        ultimo_calculo = time.time()
+
+                        # Solo los contadores que han cambiado (todos en el primer envío)
+                        delta = {k: v for k, v in actual.items() if ultimo.get(k) != v}
+                        if delta:
+                            yield _formato_sse("resumen", delta)
+                        ultimo = actual
+
+                    espera = min(KEEPALIVE_S, max(0.0, caduca - time.time()))
+                    eventos = sub.esperar(espera)
+
+                    if eventos:
+                        recalcular = True
+                    else:
+                        # Sin avisos: keepalive y, de vez en cuando, recálculo de seguridad
+                        yield ": ping\n\n"
+                        recalcular = time.time() - ultimo_calculo >= RESYNC_S
+            finally:
+                bus.cancelar(sub)
+
+        resp = Response(stream_with_context(generar()), mimetype="text/event-stream")
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers["X-Accel-Buffering"] = "no"  # nginx: no bufferizar el stream
+        return resp
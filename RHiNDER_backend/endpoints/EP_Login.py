@@ -6,7 +6,7 @@ from flask_jwt_extended import create_access_token
 import hashlib
 
 # Importar módulos de acceso a base de datos
-from database.DB_Gestion_Usuarios import GestionUsuarios
+from database.DB_Gestion_Usuarios import GestionUsuarios, normalizar_rol
 
 
 # ============================================================
@@ -72,9 +72,12 @@ class Login(Resource):
         if int(user.get("activo", 0)) != 1:
             return {"msg": "Usuario bloqueado. Contacte con el administrador."}, 403
 
-        # Generar token JWT con el ID del usuario como identidad
+        # Generar token JWT con el ID del usuario como identidad.
+        # El rol normalizado va como claim para que los guards no
+        # tengan que consultarlo en la BD en cada petición.
         access_token = create_access_token(
-            identity=str(user["id_user"])
+            identity=str(user["id_user"]),
+            additional_claims={"tipo_actor": normalizar_rol(user["rol"])}
         )
 
         # Respuesta de login correcto
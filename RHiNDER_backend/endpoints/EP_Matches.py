@@ -5,9 +5,25 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 # Importar módulos de acceso a base de datos
-from database.DB_Gestion_Matches import GestionMatches
-from database.DB_Gestion_Usuarios import GestionUsuarios
-from database.DB_Gestion_Usuarios import _es_coordinador_o_admin
+from database.DB_Gestion_Matches import GestionMatches, ESTADOS_FILTRO as ESTADOS_FILTRO_MATCHES
+from database.DB_Gestion_Usuarios import _es_coordinador_o_admin, tipo_actor_actual
+
+from database.DB_Versiones import clave_matches, clave_usuario
+
+from endpoints.EP_Comun import leer_paginacion, codificar_cursor, respuesta_versionada, leer_formato, a_columnas
+from endpoints.EP_Eventos import publicar_evento, canal_usuario, CANAL_COORDINADORES
+
+
+# Decisiones admitidas en la validación en bloque -> estado de la validación
+DECISIONES_LOTE = {
+    "validar": "APROBADA",
+    "aprobar": "APROBADA",
+    "denegar": "RECHAZADA",
+    "rechazar": "RECHAZADA",
+}
+
+# Máximo de matches por petición de validación en bloque
+MAX_DECISIONES_LOTE = 1000
 
 
 # ============================================================
@@ -27,17 +43,60 @@ class HistorialMatches(Resource):
         --------------------------------------------------------
         Devuelve el historial de matches del usuario autenticado.
         --------------------------------------------------------
+        Sin parámetros devuelve la lista completa. Con ?limite=
+        o ?cursor= devuelve una página (keyset sobre
+        fecha_match, id_match):
+          ?limite=20&cursor=<token>&estado=validado
+          &desde=YYYY-MM-DD&hasta=YYYY-MM-DD&orden=desc&total=1
+        Soporta If-None-Match (ETag por versión de los datos y
+        parámetros de la petición).
+
+        Con ?formato=columnas la lista (o `items`) se devuelve en
+        formato columnar: {columns, rows, dict} (ver a_columnas).
+        --------------------------------------------------------
         @return:
           - 200 + lista de matches
+          - 200 + {items, siguiente[, total]} si se pagina
+          - 304 si el cliente ya tiene la versión actual
+          - 400 si los parámetros de paginación o el formato no
+            son válidos
         """
 
         # ID del usuario autenticado
         user_id = int(get_jwt_identity())
 
-        # Obtener historial desde la base de datos
-        historial = GestionMatches.getHistorialMatchesUsuario(user_id)
+        pag, error = leer_paginacion(ESTADOS_FILTRO_MATCHES)
+        if error:
+            return {"ok": False, "msg": error}, 400
+
+        columnas, error = leer_formato()
+        if error:
+            return {"ok": False, "msg": error}, 400
 
-        return historial, 200
+        def calcular():
+            # Sin paginación: historial completo (comportamiento original)
+            if pag is None:
+                data = GestionMatches.getHistorialMatchesUsuario(user_id)
+                return a_columnas(data) if columnas else data
+
+            items, siguiente = GestionMatches.getHistorialMatchesPagina(
+                user_id, pag["limite"], pag["cursor"], pag["estado"],
+                pag["desde"], pag["hasta"], pag["orden"]
+            )
+
+            pagina = {
+                "items": a_columnas(items) if columnas else items,
+                "siguiente": codificar_cursor(siguiente)
+            }
+
+            # El total es opcional (COUNT cacheado)
+            if pag["total"]:
+                pagina["total"] = GestionMatches.contarHistorialMatches(
+                    user_id, pag["estado"], pag["desde"], pag["hasta"]
+                )
+            return pagina
+
+        return respuesta_versionada(user_id, [clave_matches(user_id), clave_usuario(user_id)], calcular)
 
     @jwt_required()
     def post(self):
@@ -55,6 +114,8 @@ class HistorialMatches(Resource):
         @return:
           - 201 + datos del match creado
           - 400 si faltan datos obligatorios
+          - 404 si la respuesta no existe
+          - 409 si la solicitud ya tiene match
         """
 
         # Leer el cuerpo JSON
@@ -72,10 +133,23 @@ class HistorialMatches(Resource):
             }, 400
 
         # Crear el match (el método ya devuelve el formato adecuado)
-        return GestionMatches.crear_match(
+        resultado = GestionMatches.crear_match(
             id_solicitud,
             id_respuesta
-        ), 201
+        )
+
+        # En caso de error la capa de datos devuelve (dict, http_code)
+        if isinstance(resultado, tuple):
+            return resultado
+
+        # Avisar a emisor, receptor y coordinadores (nuevo pendiente)
+        publicar_evento([
+            canal_usuario(int(get_jwt_identity())),
+            canal_usuario(resultado["id_receptor"]),
+            CANAL_COORDINADORES,
+        ], "match_creado")
+
+        return resultado, 201
 
 
 # ============================================================
@@ -94,9 +168,11 @@ class MatchesPendientesValidacion(Resource):
         """
         --------------------------------------------------------
         Devuelve los matches pendientes de validación.
+        Con ?formato=columnas, en formato columnar (a_columnas).
         --------------------------------------------------------
         @return:
           - 200 + lista de matches
+          - 400 si el formato no es válido
           - 403 si el usuario no tiene permisos
         """
 
@@ -107,10 +183,14 @@ class MatchesPendientesValidacion(Resource):
         if not _es_coordinador_o_admin(user_id):
             return {"ok": False, "msg": "No autorizado."}, 403
 
+        columnas, error = leer_formato()
+        if error:
+            return {"ok": False, "msg": error}, 400
+
         # Consulta a base de datos
         data = GestionMatches.getMatchesPendientesValidacion()
 
-        return data, 200
+        return (a_columnas(data) if columnas else data), 200
 
 
 # ============================================================
@@ -132,26 +212,40 @@ class MatchValidar(Resource):
         @param id_match: ID del match a validar
         @return:
           - respuesta generada por la capa de datos
+          - 400 si 'comentario' no es texto
         """
 
         # Usuario autenticado
         user_id = int(get_jwt_identity())
 
-        # Control de permisos
-        if not _es_coordinador_o_admin(user_id):
+        # Control de permisos (el rol viene en el JWT: una sola comprobación)
+        tipo_actor = tipo_actor_actual(user_id)
+        if tipo_actor not in ("coordinador", "administrador"):
             return {"ok": False, "msg": "No autorizado."}, 403
 
         # Leer cuerpo JSON (comentario opcional)
         payload = request.get_json(silent=True) or {}
         comentario = payload.get("comentario")
+        if comentario is not None and not isinstance(comentario, str):
+            return {"ok": False, "msg": "'comentario' debe ser texto."}, 400
 
         # Delegar validación a la capa de datos
-        return GestionMatches.validar_match(
+        body, code = GestionMatches.validar_match(
             int(id_match),
             user_id,
-            GestionUsuarios. obtener_tipo_actor(user_id)
+            tipo_actor
         )
 
+        # Avisar a los implicados y al resto de coordinadores
+        if body.get("ok"):
+            publicar_evento([
+                canal_usuario(body["id_emisor"]),
+                canal_usuario(body["id_receptor"]),
+                CANAL_COORDINADORES,
+            ], "match_validado")
+
+        return body, code
+
 
 # ============================================================
 # DENEGAR MATCH (COORDINADOR / ADMIN)
@@ -172,26 +266,135 @@ class MatchDenegar(Resource):
         @param id_match: ID del match a denegar
         @return:
           - respuesta generada por la capa de datos
+          - 400 si 'comentario' no es texto
         """
 
         # Usuario autenticado
         user_id = int(get_jwt_identity())
 
-        # Control de permisos
-        if not _es_coordinador_o_admin(user_id):
+        # Control de permisos (el rol viene en el JWT: una sola comprobación)
+        tipo_actor = tipo_actor_actual(user_id)
+        if tipo_actor not in ("coordinador", "administrador"):
             return {"ok": False, "msg": "No autorizado."}, 403
 
         # Leer cuerpo JSON (comentario opcional)
         payload = request.get_json(silent=True) or {}
         comentario = payload.get("comentario")
+        if comentario is not None and not isinstance(comentario, str):
+            return {"ok": False, "msg": "'comentario' debe ser texto."}, 400
 
         # Delegar denegación a la capa de datos
-        return GestionMatches.denegar_match(
+        body, code = GestionMatches.denegar_match(
             int(id_match),
             user_id,
-            GestionUsuarios. obtener_tipo_actor(user_id)
+            tipo_actor
         )
 
+        # Avisar a los implicados y al resto de coordinadores
+        if body.get("ok"):
+            publicar_evento([
+                canal_usuario(body["id_emisor"]),
+                canal_usuario(body["id_receptor"]),
+                CANAL_COORDINADORES,
+            ], "match_denegado")
+
+        return body, code
+
+
+# ============================================================
+# VALIDAR / DENEGAR VARIOS MATCHES (COORDINADOR / ADMIN)
+# ============================================================
+class MatchesLote(Resource):
+    """
+    ------------------------------------------------------------
+    Endpoint para validar y/o denegar muchos matches pendientes
+    en una sola petición.
+    ------------------------------------------------------------
+    """
+
+    @jwt_required()
+    def post(self):
+        """
+        --------------------------------------------------------
+        POST /matches/lote
+        --------------------------------------------------------
+        Body JSON:
+          {"decisiones": [
+              {"id_match": 1, "decision": "validar", "comentario": "..."},
+              {"id_match": 2, "decision": "denegar"}
+          ]}
+
+        Se procesan en transacciones por bloques: un error en un
+        bloque no deshace los bloques ya confirmados.
+        --------------------------------------------------------
+        @return:
+          - 200 + {ok, procesados, fallidos, resultados: [{id_match, ok, code, msg, ...}]}
+          - 400 si el body no es válido
+          - 403 si el usuario no tiene permisos
+        """
+
+        # Usuario autenticado
+        user_id = int(get_jwt_identity())
+
+        # Control de permisos (el rol viene en el JWT: una sola comprobación)
+        tipo_actor = tipo_actor_actual(user_id)
+        if tipo_actor not in ("coordinador", "administrador"):
+            return {"ok": False, "msg": "No autorizado."}, 403
+
+        payload = request.get_json(silent=True) or {}
+        entrada = payload.get("decisiones")
+
+        if not isinstance(entrada, list) or not entrada:
+            return {"ok": False, "msg": "Falta 'decisiones' (lista no vacía)."}, 400
+        if len(entrada) > MAX_DECISIONES_LOTE:
+            return {"ok": False, "msg": f"Máximo {MAX_DECISIONES_LOTE} decisiones por petición."}, 400
+
+        # Validación básica de cada decisión
+        decisiones = []
+        for pos, item in enumerate(entrada):
+            if not isinstance(item, dict):
+                return {"ok": False, "msg": f"Decisión {pos}: debe ser un objeto."}, 400
+
+            estado = DECISIONES_LOTE.get(str(item.get("decision", "")).lower())
+            if estado is None:
+                return {"ok": False, "msg": f"Decisión {pos}: 'decision' debe ser validar o denegar."}, 400
+
+            try:
+                id_match = int(item.get("id_match"))
+            except (TypeError, ValueError):
+                return {"ok": False, "msg": f"Decisión {pos}: 'id_match' no válido."}, 400
+
+            comentario = item.get("comentario")
+            if comentario is not None and not isinstance(comentario, str):
+                return {"ok": False, "msg": f"Decisión {pos}: 'comentario' debe ser texto."}, 400
+
+            decisiones.append({
+                "id_match": id_match,
+                "estado": estado,
+                "comentario": comentario or None,
+            })
+
+        # Delegar en la capa de datos
+        resultados = GestionMatches.validar_denegar_lote(decisiones, user_id, tipo_actor)
+
+        # Avisar a los implicados y al resto de coordinadores (un aviso por canal)
+        for estado, tipo_evento in (("APROBADA", "match_validado"), ("RECHAZADA", "match_denegado")):
+            canales = set()
+            for r in resultados:
+                if r["ok"] and r["estado"] == estado:
+                    canales.add(canal_usuario(r["id_emisor"]))
+                    canales.add(canal_usuario(r["id_receptor"]))
+            if canales:
+                publicar_evento(sorted(canales) + [CANAL_COORDINADORES], tipo_evento)
+
+        procesados = sum(1 for r in resultados if r["ok"])
+        return {
+            "ok": procesados == len(resultados),
+            "procesados": procesados,
+            "fallidos": len(resultados) - procesados,
+            "resultados": resultados,
+        }, 200
+
 
 # ============================================================
 # MARCAR MATCHES COMO VISTOS
@@ -220,5 +423,5 @@ class MatchesVistos(Resource):
         # Actualizar estado de vistos según rol
         return GestionMatches.marcar_matches_como_vistos(
             user_id,
-            GestionUsuarios. obtener_tipo_actor(user_id)
+            tipo_actor_actual(user_id)
         ), 200
@@ -0,0 +1,86 @@
+# endpoints/EP_Notificaciones.py
+
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+# Importar módulos de acceso a base de datos
+from database.DB_Notificaciones import GestionNotificaciones
+from database.DB_Gestion_Usuarios import _es_coordinador_o_admin
+
+from endpoints.EP_Comun import respuesta_con_etag
+
+
+# ============================================================
+# RESUMEN DE NOTIFICACIONES (TRABAJADOR)
+# ============================================================
+class NotificacionesResumen(Resource):
+    """
+    ------------------------------------------------------------
+    Endpoint que devuelve de una vez los contadores del nav del
+    trabajador (respuestas, solicitudes nuevas y matches).
+    ------------------------------------------------------------
+    """
+
+    @jwt_required()
+    def get(self):
+        """
+        --------------------------------------------------------
+        GET /notificaciones/resumen
+        --------------------------------------------------------
+        Sustituye a las tres peticiones que hacía el nav cada
+        minuto (/respuestas, /solicitudes/recibidas/nuevas y
+        /matches) por una sola consulta agregada.
+        --------------------------------------------------------
+        @return:
+          - 200 + {respuestas_no_vistas, solicitudes_nuevas,
+                   matches_no_vistos}
+        """
+
+        # ID del usuario autenticado
+        user_id = int(get_jwt_identity())
+
+        # Contadores calculados en un único viaje a la BD
+        resumen = GestionNotificaciones.resumenTrabajador(user_id)
+
+        return resumen, 200
+
+
+# ============================================================
+# RESUMEN DE NOTIFICACIONES (COORDINADOR / ADMIN)
+# ============================================================
+class NotificacionesResumenCoordinador(Resource):
+    """
+    ------------------------------------------------------------
+    Endpoint que devuelve los contadores del nav del coordinador
+    (matches pendientes y validaciones no vistas).
+    ------------------------------------------------------------
+    """
+
+    @jwt_required()
+    def get(self):
+        """
+        --------------------------------------------------------
+        GET /notificaciones/coordinador/resumen
+        --------------------------------------------------------
+        Sustituye a la descarga de /matches/pendientes y a
+        /validaciones/nuevas por una sola consulta agregada.
+
+        Soporta If-None-Match: si los contadores no han cambiado
+        se responde 304 sin cuerpo.
+        --------------------------------------------------------
+        @return:
+          - 200 + {pendientes_no_vistos, validaciones_no_vistas}
+          - 304 si el cliente ya tiene la versión actual
+          - 403 si el usuario no tiene permisos
+        """
+
+        # Usuario autenticado
+        user_id = int(get_jwt_identity())
+
+        # Control de permisos
+        if not _es_coordinador_o_admin(user_id):
+            return {"ok": False, "msg": "No autorizado."}, 403
+
+        resumen = GestionNotificaciones.resumenCoordinador()
+
+        return respuesta_con_etag(resumen)
@@ -6,6 +6,12 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 
 # Importar módulos de acceso a base de datos
 from database.DB_Gestion_Respuestas import GestionRespuestas
+from database.DB_Gestion_Solicitudes_Enviadas import GestionSolicitudesEnviadas
+
+from database.DB_Versiones import VERSION_SOLICITUDES, clave_respuestas, clave_usuario
+
+from endpoints.EP_Comun import respuesta_versionada
+from endpoints.EP_Eventos import publicar_evento, canal_usuario
 
 
 # ============================================================
@@ -28,18 +34,23 @@ class RespuestasSolicitudesActivasUsuario(Resource):
         Devuelve todas las respuestas asociadas a solicitudes
         activas del usuario autenticado.
 
+        Soporta If-None-Match (ETag por versión de los datos).
+
         @return:
           - 200 + lista de respuestas
+          - 304 si el cliente ya tiene la versión actual
         """
 
         # ID del usuario autenticado (extraído del JWT)
         user_id = int(get_jwt_identity())
 
         # Consulta a base de datos de las respuestas activas
-        respuestas = GestionRespuestas.getRespuestasSolicitudesActivasUsuario( user_id )
-
-        # Devolver el listado de respuestas
-        return respuestas, 200
+        # (solo si el cliente no tiene ya la versión actual)
+        return respuesta_versionada(
+            user_id,
+            [VERSION_SOLICITUDES, clave_respuestas(user_id), clave_usuario(user_id)],
+            lambda: GestionRespuestas.getRespuestasSolicitudesActivasUsuario(user_id)
+        )
 
     # --------------------------------------------------------
     # PUT /respuestas
@@ -126,6 +137,11 @@ class RespuestasSolicitudesActivasUsuario(Resource):
                 int(id_tt)
             )
 
+            # Avisar al emisor de la solicitud (badge de respuestas)
+            id_emisor = GestionSolicitudesEnviadas.getIdEmisor(int(id_solicitud))
+            if id_emisor:
+                publicar_evento([canal_usuario(id_emisor)], "respuesta_creada")
+
             return {
                 "ok": True,
                 "id_respuesta": new_id
@@ -198,19 +214,26 @@ class TurnosUsadosRespuestas(Resource):
 # endpoints/EP_Respuestas.py
 
 class RespuestasExpiradasAviso(Resource):
+    """
+    ------------------------------------------------------------
+    Endpoint del aviso de respuestas expiradas del receptor.
+    ------------------------------------------------------------
+    """
 
     @jwt_required()
     def get(self):
+        """
+        --------------------------------------------------------
+        GET /respuestas/expiradas/avisar
+        --------------------------------------------------------
+        Solo lectura: la expiración y la limpieza de respuestas
+        las hace la expiración programada (scripts/expirar.py).
+        --------------------------------------------------------
+        @return:
+          - 200 + número de respuestas expiradas del usuario
+        """
         user_id = int(get_jwt_identity())
 
-        # 1) Expirar respuestas cuyo turno ofrecido ya es hoy o pasado
-        GestionRespuestas.expirarRespuestasPorTurnoPasado(user_id)
-
-        # 2) Contar expiradas (para aviso al usuario)
         total = GestionRespuestas.countRespuestasExpiradasReceptor(user_id)
 
-        # 3) Limpiar expiradas para permitir volver a responder
-        limpiadas = GestionRespuestas.limpiarRespuestasExpiradasSiSolicitudSigueViva(user_id)
-
         return total, 200
-
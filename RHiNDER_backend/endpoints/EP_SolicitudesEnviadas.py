@@ -6,6 +6,25 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 
 # Importar módulos de acceso a base de datos
 from database.DB_Gestion_Solicitudes_Enviadas import GestionSolicitudesEnviadas
+from database.DB_Gestion_Solicitudes_Recibidas import GestionSolicitudesRecibidas
+
+from database.DB_Versiones import VERSION_SOLICITUDES, clave_matches, clave_turnos
+
+from endpoints.EP_Comun import respuesta_versionada
+from endpoints.EP_Eventos import publicar_evento, canal_usuario
+
+
+def avisar_receptores(id_solicitud, tipo: str):
+    """
+    ------------------------------------------------------------
+    Avisa (SSE) solo a los trabajadores libres el día de la
+    solicitud: son los únicos cuyo badge de solicitudes puede
+    cambiar. Publicar en todos los trabajadores haría recalcular
+    el resumen a cada stream abierto.
+    ------------------------------------------------------------
+    """
+    receptores = GestionSolicitudesRecibidas.receptoresSolicitud(id_solicitud)
+    publicar_evento([canal_usuario(i) for i in receptores], tipo)
 
 
 # ============================================================
@@ -28,18 +47,23 @@ class SolicitudesEnviadas(Resource):
         Devuelve las solicitudes activas enviadas por el usuario
         autenticado.
 
+        Soporta If-None-Match (ETag por versión de los datos).
+
         @return:
           - 200 + lista de solicitudes activas
+          - 304 si el cliente ya tiene la versión actual
         """
 
         # ID del usuario autenticado (obtenido desde el JWT)
         user_id = int(get_jwt_identity())
 
         # Consulta a base de datos de las solicitudes activas
-        solicitudes_activas =  GestionSolicitudesEnviadas.getSolicitudesActivasUsuario(user_id)
-
-        # Devolver el listado de solicitudes
-        return solicitudes_activas, 200
+        # (solo si el cliente no tiene ya la versión actual)
+        return respuesta_versionada(
+            user_id,
+            [VERSION_SOLICITUDES, clave_matches(user_id), clave_turnos(user_id)],
+            lambda: GestionSolicitudesEnviadas.getSolicitudesActivasUsuario(user_id)
+        )
 
     # --------------------------------------------------------
     # POST /solicitud
@@ -77,6 +101,9 @@ class SolicitudesEnviadas(Resource):
             id_turno_trabajador
         )
 
+        # Cualquier trabajador libre ese día puede recibirla (badge de solicitudes)
+        avisar_receptores(id_solicitud, "solicitud_creada")
+
         # Respuesta de éxito
         return {
             "ok": True,
@@ -113,6 +140,9 @@ class SolicitudesEnviadas(Resource):
                 id_solicitud
             )
 
+            # Deja de ser "nueva" para los receptores
+            avisar_receptores(id_solicitud, "solicitud_cancelada")
+
             # Respuesta de éxito
             return {
                 "ok": True,
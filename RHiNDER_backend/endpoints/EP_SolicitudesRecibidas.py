@@ -1,11 +1,21 @@
 # endpoints/Solicitudes.py
 
+from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 # Importar módulos de acceso a base de datos
 from database.DB_Gestion_Solicitudes_Recibidas import GestionSolicitudesRecibidas
 
+from database.DB_Versiones import VERSION_SOLICITUDES, clave_respuestas, clave_turnos, clave_usuario
+
+from endpoints.EP_Comun import respuesta_versionada
+from endpoints.EP_Eventos import publicar_evento, canal_usuario
+
+
+# Máximo de ids aceptados en una sola petición de marcado en bloque
+MAX_IDS_VISTAS = 500
+
 
 # ============================================================
 # SOLICITUDES RECIBIDAS POR EL USUARIO
@@ -27,18 +37,23 @@ class SolicitudesRecibidas(Resource):
         Devuelve el listado completo de solicitudes recibidas
         por el usuario autenticado.
 
+        Soporta If-None-Match (ETag por versión de los datos).
+
         @return:
           - 200 + lista de solicitudes
+          - 304 si el cliente ya tiene la versión actual
         """
 
         # Obtener el ID del usuario autenticado desde el JWT
         user_id = int(get_jwt_identity())
 
         # Consultar en base de datos las solicitudes recibidas
-        solicitudes_recibidas = GestionSolicitudesRecibidas.solicitudesRecibidas( user_id )
-
-        # Devolver la lista de solicitudes
-        return solicitudes_recibidas, 200
+        # (solo si el cliente no tiene ya la versión actual)
+        return respuesta_versionada(
+            user_id,
+            [VERSION_SOLICITUDES, clave_respuestas(user_id), clave_turnos(user_id), clave_usuario(user_id)],
+            lambda: GestionSolicitudesRecibidas.solicitudesRecibidas(user_id)
+        )
 
     # --------------------------------------------------------
     # PUT /solicitudes-recibidas/{id_solicitud}
@@ -90,15 +105,23 @@ class SolicitudesNuevasRecibidas(Resource):
         Devuelve el número de solicitudes recibidas que aún no
         han sido vistas por el usuario autenticado.
 
+        Query params:
+          - detalle=1 (opcional): devuelve el listado de filas
+            en lugar del número
+
         @return:
-          - 200 + número entero
+          - 200 + número entero (o lista si detalle=1)
         """
 
         # ID del usuario autenticado
         user_id = int(get_jwt_identity())
 
-        # Obtener el número de solicitudes nuevas
-        nuevas = GestionSolicitudesRecibidas.numeroSolicitudesNuevasRecibidas( user_id )
+        # Listado completo solo si se pide explícitamente
+        if request.args.get("detalle", 0, type=int) == 1:
+            return GestionSolicitudesRecibidas.numeroSolicitudesNuevasRecibidas(user_id), 200
+
+        # Obtener el número de solicitudes nuevas (COUNT en BD)
+        nuevas = GestionSolicitudesRecibidas.contarSolicitudesNuevasRecibidas(user_id)
 
         # Se devuelve SOLO el número
         return nuevas, 200
@@ -159,6 +182,66 @@ class SolicitudesNuevasRecibidas(Resource):
         }, 200
 
 
+# ============================================================
+# MARCAR VARIAS SOLICITUDES RECIBIDAS COMO VISTAS
+# ============================================================
+class SolicitudesRecibidasVistas(Resource):
+    """
+    ------------------------------------------------------------
+    Marcado en bloque de solicitudes recibidas como vistas.
+    ------------------------------------------------------------
+    Sustituye a un POST /solicitudes/recibidas/nuevas/vista/<id>
+    por cada solicitud no vista.
+    ------------------------------------------------------------
+    """
+
+    # --------------------------------------------------------
+    # POST /solicitudes/recibidas/vistas
+    # --------------------------------------------------------
+    @jwt_required()
+    def post(self):
+        """
+        Marca como vistas varias solicitudes en un único UPSERT.
+
+        Body JSON (una de las dos opciones):
+          - {"ids": [id_solicitud, ...]}  (se ignoran las no visibles)
+          - {"todas": true}  → todas las recibidas visibles
+
+        @return:
+          - 200 + {ok, updated} (solicitudes marcadas ahora como vistas)
+          - 400 si el body no es válido
+        """
+
+        # ID del usuario autenticado
+        user_id = int(get_jwt_identity())
+
+        data = request.get_json(silent=True) or {}
+
+        if data.get("todas") is True:
+            ids = None
+        else:
+            ids = data.get("ids")
+            if not isinstance(ids, list):
+                return {"ok": False, "msg": "Falta 'ids' (lista) o 'todas': true."}, 400
+            if len(ids) > MAX_IDS_VISTAS:
+                return {"ok": False, "msg": f"Máximo {MAX_IDS_VISTAS} ids por petición."}, 400
+            try:
+                ids = [int(i) for i in ids]
+            except (TypeError, ValueError):
+                return {"ok": False, "msg": "Los ids deben ser números enteros."}, 400
+
+        filas = GestionSolicitudesRecibidas.marcarSolicitudesComoVistas(user_id, ids)
+
+        # El badge de solicitudes nuevas de este usuario puede haber cambiado
+        if filas:
+            publicar_evento([canal_usuario(user_id)], "solicitudes_vistas")
+
+        return {
+            "ok": True,
+            "updated": filas
+        }, 200
+
+
 # ============================================================
 # SOLICITUDES EXPIRADAS RECIBIDAS
 # ============================================================
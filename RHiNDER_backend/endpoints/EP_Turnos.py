@@ -5,7 +5,77 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 # Importar módulos de acceso a base de datos
-from database.DB_Turnos import GestionTurnos
+from database.DB_Turnos import GestionTurnos, sumar_meses
+from database.DB_Versiones import clave_turnos
+
+from endpoints.EP_Comun import respuesta_versionada
+
+
+# Meses máximos por petición de rango (p. ej. month ± 6)
+MAX_MESES_RANGO = 13
+
+# Años admitidos: el fin exclusivo de diciembre (1 de enero del año
+# siguiente) tiene que seguir siendo una fecha válida para date()
+YEAR_MIN = 1
+YEAR_MAX = 9998
+
+
+def _mes_valido(year, month):
+    return YEAR_MIN <= year <= YEAR_MAX and 1 <= month <= 12
+
+
+def _leer_mes(texto):
+    """
+    "YYYY-MM" -> (year, month), o None si no es válido.
+    """
+    try:
+        year, month = (int(x) for x in str(texto).split("-"))
+    except (TypeError, ValueError):
+        return None
+    return (year, month) if _mes_valido(year, month) else None
+
+
+def _leer_rango_meses():
+    """
+    ------------------------------------------------------------
+    Lee el rango de meses de la query string.
+    ------------------------------------------------------------
+    Admite:
+      - desde=YYYY-MM&hasta=YYYY-MM (ambos incluidos)
+      - year=<int>&month=<int>&meses=<N> (month ± N meses)
+    ------------------------------------------------------------
+    @return: ((year_desde, month_desde, year_hasta, month_hasta), None)
+             o (None, respuesta de error 400)
+    """
+    if request.args.get("desde") or request.args.get("hasta"):
+        desde = _leer_mes(request.args.get("desde"))
+        hasta = _leer_mes(request.args.get("hasta"))
+        if not desde or not hasta or desde > hasta:
+            return None, ({"ok": False, "msg": "Parámetros desde y hasta obligatorios (YYYY-MM, desde <= hasta)."}, 400)
+    else:
+        year = request.args.get("year", type=int)
+        month = request.args.get("month", type=int)
+        meses = request.args.get("meses", default=1, type=int)
+        if year is None or month is None or meses is None or meses < 0:
+            return None, ({"ok": False, "msg": "Parámetros year, month (1..12) y meses (>= 0) obligatorios."}, 400)
+        desde = sumar_meses(year, month, -meses)
+        hasta = sumar_meses(year, month, meses)
+        if not 1 <= month <= 12 or not _mes_valido(*desde) or not _mes_valido(*hasta):
+            return None, ({"ok": False, "msg": f"Mes fuera de rango (años {YEAR_MIN}..{YEAR_MAX}, month 1..12)."}, 400)
+
+    total = (hasta[0] - desde[0]) * 12 + hasta[1] - desde[1] + 1
+    if total > MAX_MESES_RANGO:
+        return None, ({"ok": False, "msg": f"Como máximo {MAX_MESES_RANGO} meses por petición."}, 400)
+
+    return (*desde, *hasta), None
+
+
+def _respuesta_rango(rango, meses):
+    return {
+        "desde": f"{rango[0]:04d}-{rango[1]:02d}",
+        "hasta": f"{rango[2]:04d}-{rango[3]:02d}",
+        "meses": meses,
+    }
 
 
 # ============================================================
@@ -33,6 +103,8 @@ class Turnos(Resource):
         --------------------------------------------------------
         @return:
           - 200 + lista de turnos
+          - 304 si el cliente ya tiene la versión actual (ETag)
+          - 400 si year/month no son válidos
         """
 
         # ID del usuario autenticado (extraído del JWT)
@@ -42,16 +114,18 @@ class Turnos(Resource):
         year = request.args.get("year", type=int)
         month = request.args.get("month", type=int)
 
-        # Llamada a la capa de acceso a datos
-        turnos = GestionTurnos.getTurnosTrabajadorMes(
+        # Validación de parámetros (el rango de fechas necesita un mes válido)
+        if year is None or month is None or not _mes_valido(year, month):
+            return {"ok": False, "msg": f"Parámetros year ({YEAR_MIN}..{YEAR_MAX}) y month (1..12) obligatorios."}, 400
+
+        # Llamada a la capa de acceso a datos (solo si el cliente no
+        # tiene ya la versión actual: If-None-Match → 304)
+        return respuesta_versionada(
             user_id,
-            year,
-            month
+            [clave_turnos(user_id)],
+            lambda: GestionTurnos.getTurnosTrabajadorMes(user_id, year, month)
         )
 
-        # Devuelve los turnos del mes solicitado
-        return turnos, 200
-
 
 # ============================================================
 # DÍAS LIBRES DE UN USUARIO
@@ -79,18 +153,88 @@ class DiasLibresUsuario(Resource):
         --------------------------------------------------------
         @return:
           - 200 + lista de días libres
+          - 400 si year/month no son válidos
         """
 
         # Leer parámetros obligatorios de la URL
-        year = int(request.args.get("year"))
-        month = int(request.args.get("month"))
-
-        # Consulta a base de datos
-        filas = GestionTurnos.diasLibresUsuario(
-            id_user,
-            year,
-            month
+        year = request.args.get("year", type=int)
+        month = request.args.get("month", type=int)
+
+        if year is None or month is None or not _mes_valido(year, month):
+            return {"ok": False, "msg": f"Parámetros year ({YEAR_MIN}..{YEAR_MAX}) y month (1..12) obligatorios."}, 400
+
+        # Consulta a base de datos (o 304 si no ha cambiado)
+        return respuesta_versionada(
+            int(get_jwt_identity()),
+            [clave_turnos(id_user)],
+            lambda: GestionTurnos.diasLibresUsuario(id_user, year, month)
+        )
+
+
+# ============================================================
+# TURNOS DEL USUARIO (VARIOS MESES)
+# ============================================================
+class TurnosRango(Resource):
+    """
+    ------------------------------------------------------------
+    GET /turnos/rango?desde=YYYY-MM&hasta=YYYY-MM
+    GET /turnos/rango?year=<int>&month=<int>&meses=<N>
+    ------------------------------------------------------------
+    Turnos del usuario autenticado de varios meses en una sola
+    consulta (el calendario precarga los meses vecinos).
+    ------------------------------------------------------------
+    """
+
+    @jwt_required()
+    def get(self):
+        """
+        --------------------------------------------------------
+        @return:
+          - 200 + {desde, hasta, meses: {"YYYY-MM": [turnos]}}
+          - 400 si el rango no es válido o supera MAX_MESES_RANGO
+        """
+        user_id = int(get_jwt_identity())
+
+        rango, error = _leer_rango_meses()
+        if error:
+            return error
+
+        return respuesta_versionada(
+            user_id,
+            [clave_turnos(user_id)],
+            lambda: _respuesta_rango(rango, GestionTurnos.getTurnosTrabajadorRango(user_id, *rango))
         )
 
-        # Devuelve los días libres
-        return filas, 200
+
+# ============================================================
+# DÍAS LIBRES DE UN USUARIO (VARIOS MESES)
+# ============================================================
+class DiasLibresUsuarioRango(Resource):
+    """
+    ------------------------------------------------------------
+    GET /turnos/libres/<id_user>/rango?desde=YYYY-MM&hasta=YYYY-MM
+    GET /turnos/libres/<id_user>/rango?year=<int>&month=<int>&meses=<N>
+    ------------------------------------------------------------
+    Días libres de un usuario de varios meses en una sola
+    consulta (mini calendario de respuesta).
+    ------------------------------------------------------------
+    """
+
+    @jwt_required()
+    def get(self, id_user):
+        """
+        --------------------------------------------------------
+        @param id_user: ID del usuario consultado
+        @return:
+          - 200 + {desde, hasta, meses: {"YYYY-MM": [{fecha_turno}]}}
+          - 400 si el rango no es válido o supera MAX_MESES_RANGO
+        """
+        rango, error = _leer_rango_meses()
+        if error:
+            return error
+
+        return respuesta_versionada(
+            int(get_jwt_identity()),
+            [clave_turnos(id_user)],
+            lambda: _respuesta_rango(rango, GestionTurnos.diasLibresUsuarioRango(id_user, *rango))
+        )
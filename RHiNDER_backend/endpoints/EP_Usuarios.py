@@ -4,7 +4,8 @@ from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from database.DB_Gestion_Usuarios import GestionUsuarios
+from database.DB_Gestion_Usuarios import GestionUsuarios, tipo_actor_actual
+from endpoints.EP_Comun import leer_formato, a_columnas
 
 import hashlib
 
@@ -22,7 +23,7 @@ def exigir_admin(user_id: int):
       - (True, None) si es administrador
       - (False, (respuesta_json, http_code)) si no lo es
     """
-    tipo = GestionUsuarios.obtener_tipo_actor(user_id)
+    tipo = tipo_actor_actual(user_id)
 
     if tipo != "administrador":
         return False, (
@@ -157,6 +158,7 @@ class AdminDameUsuarios(Resource):
       - activo=0|1
       - id_rol=<int>
       - q=<texto>
+      - formato=columnas  → `data` en formato columnar (a_columnas)
     ------------------------------------------------------------
     """
 
@@ -192,6 +194,10 @@ class AdminDameUsuarios(Resource):
                 "message": "Parámetro 'activo' inválido. Usa 0 o 1."
             }, 400
 
+        columnas, error = leer_formato()
+        if error:
+            return {"ok": False, "message": error}, 400
+
         # Consulta a base de datos
         usuarios = GestionUsuarios.listar_usuarios(
             activo=activo,
@@ -202,7 +208,7 @@ class AdminDameUsuarios(Resource):
         # Respuesta estándar
         return {
             "ok": True,
-            "data": usuarios,
+            "data": a_columnas(usuarios) if columnas else usuarios,
             "count": len(usuarios)
         }, 200
 
@@ -261,6 +267,10 @@ class AdminActualizarEstadoUsuario(Resource):
             int(activo)
         )
 
+        # El rol/activo cacheado deja de valer: si se ha bloqueado,
+        # la siguiente petición del usuario ya se rechaza
+        GestionUsuarios.invalidar_estado_autorizacion(int(id_user))
+
         # Usuario no encontrado o sin cambios
         if rows == 0:
             return {
@@ -1,9 +1,11 @@
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from database.DB_Gestion_Validaciones import GestionValidaciones
+from database.DB_Gestion_Validaciones import GestionValidaciones, ESTADOS_FILTRO
 from database.DB_Gestion_Usuarios import _es_coordinador_o_admin
 
+from endpoints.EP_Comun import leer_paginacion, codificar_cursor, leer_formato, a_columnas
+
 
 # ============================================================
 # HISTORIAL DE VALIDACIONES
@@ -18,9 +20,21 @@ class HistorialValidaciones(Resource):
         --------------------------------------------------------
         Devuelve el historial completo de validaciones realizadas
         (solo accesible para coordinadores y administradores).
+
+        Con ?limite= o ?cursor= devuelve solo una página (keyset
+        sobre fecha_validacion, id_match):
+          ?limite=20&cursor=<token>&estado=aprobada
+          &desde=YYYY-MM-DD&hasta=YYYY-MM-DD&orden=desc&total=1
+        Con total=1 se añaden los totales por estado (cacheados).
+
+        Con ?formato=columnas la lista (o `items`) se devuelve en
+        formato columnar: {columns, rows, dict} (ver a_columnas).
         --------------------------------------------------------
         @return:
           - 200 + lista de validaciones si está autorizado
+          - 200 + {items, siguiente[, total, por_estado]} si se pagina
+          - 400 si los parámetros de paginación o el formato no
+            son válidos
           - 403 si el usuario no tiene permisos
         """
         # Obtiene el ID del usuario autenticado desde el JWT
@@ -30,11 +44,39 @@ class HistorialValidaciones(Resource):
         if not _es_coordinador_o_admin(user_id):
             return {"ok": False, "msg": "No autorizado."}, 403
 
-        # Recupera el historial completo desde la capa de datos
-        data = GestionValidaciones.getHistorialValidaciones()
+        pag, error = leer_paginacion(ESTADOS_FILTRO)
+        if error:
+            return {"ok": False, "msg": error}, 400
+
+        columnas, error = leer_formato()
+        if error:
+            return {"ok": False, "msg": error}, 400
+
+        if pag is None:
+            # Recupera el historial completo desde la capa de datos
+            data = GestionValidaciones.getHistorialValidaciones()
+
+            # Devuelve directamente la lista (formato JSON)
+            return (a_columnas(data) if columnas else data), 200
+
+        items, siguiente = GestionValidaciones.getHistorialValidacionesPagina(
+            pag["limite"], pag["cursor"], pag["estado"],
+            pag["desde"], pag["hasta"], pag["orden"]
+        )
+
+        pagina = {
+            "items": a_columnas(items) if columnas else items,
+            "siguiente": codificar_cursor(siguiente)
+        }
+
+        if pag["total"]:
+            por_estado = GestionValidaciones.contarHistorialValidaciones(pag["desde"], pag["hasta"])
+            estados = ESTADOS_FILTRO.get(pag["estado"], por_estado.keys())
+
+            pagina["por_estado"] = por_estado
+            pagina["total"] = sum(por_estado.get(e, 0) for e in estados)
 
-        # Devuelve directamente la lista (formato JSON)
-        return data, 200
+        return pagina, 200
 
 
 # ============================================================
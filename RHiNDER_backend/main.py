@@ -1,9 +1,11 @@
 # main.py
-from flask import Flask, make_response
+from flask import Flask, make_response, jsonify
 from flask_restful import Api
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 import datetime
+import decimal
+import os
 from datetime import timedelta
 from flask.json.provider import DefaultJSONProvider
 
@@ -15,18 +17,20 @@ from flask.json.provider import DefaultJSONProvider
 
 # trabajador
 from endpoints.EP_Login import Login
-from endpoints.EP_Turnos import Turnos, DiasLibresUsuario
+from endpoints.EP_Turnos import Turnos, DiasLibresUsuario, TurnosRango, DiasLibresUsuarioRango
 from endpoints.EP_SolicitudesEnviadas import SolicitudesEnviadas, SolicitudesEnviadasExpiradasCount
 from endpoints.EP_Respuestas import RespuestasSolicitudesActivasUsuario, TurnosUsadosRespuestas, RespuestasExpiradasAviso
-from endpoints.EP_SolicitudesRecibidas import SolicitudesRecibidas,SolicitudesNuevasRecibidas, SolicitudesRecibidasExpiradasCount
+from endpoints.EP_SolicitudesRecibidas import SolicitudesRecibidas,SolicitudesNuevasRecibidas, SolicitudesRecibidasExpiradasCount, SolicitudesRecibidasVistas
 
 from endpoints.EP_Matches import HistorialMatches
 from endpoints.EP_Usuarios import UsuarioPorId, UsuarioPassword
+from endpoints.EP_Notificaciones import NotificacionesResumen, NotificacionesResumenCoordinador
+from endpoints.EP_Eventos import EventosStream
 
 
 # coordinador
-from endpoints.EP_EstadisticasCoordinador import  EstadisticasValidacionesEstado,  EstadisticasValidacionesPorDia
-from endpoints.EP_Matches import MatchesPendientesValidacion, MatchesVistos, MatchValidar, MatchDenegar
+from endpoints.EP_EstadisticasCoordinador import  EstadisticasValidacionesEstado,  EstadisticasValidacionesPorDia, EstadisticasCache
+from endpoints.EP_Matches import MatchesPendientesValidacion, MatchesVistos, MatchValidar, MatchDenegar, MatchesLote
 from endpoints.EP_Validaciones import HistorialValidaciones, ValidacionesNuevas, ValidacionesVistas
 
 
@@ -34,6 +38,10 @@ from endpoints.EP_Validaciones import HistorialValidaciones, ValidacionesNuevas,
 # administrador
 from endpoints.EP_Usuarios import AdminDameUsuarios, AdminActualizarEstadoUsuario
 
+from database.DB_Gestion_Usuarios import usuario_activo
+from database.DB_Catalogo import catalogo
+from endpoints.EP_Comun import comprimir_respuesta
+
 
 
 
@@ -86,9 +94,48 @@ CORS(app, resources={r"/*": {
 #     al formato ISO8601 (ejemplo: "2025-11-22T14:30:00")
 #
 # Esto permite devolver objetos Python "normales" sin preocuparse.
+#
+# Serializador rápido (JSON_SERIALIZADOR=auto|orjson|stdlib):
+#   - Si está instalado orjson (opcional), se usa para todo el
+#     volcado: fechas, datetime y Decimal se convierten en C sin una
+#     llamada a default() por valor. Las fechas salen con el mismo
+#     texto ISO8601 que isoformat().
+#   - Sin orjson, o si un valor no lo admite, se usa el json de la
+#     librería estándar de siempre.
 # ================================================================
+try:
+    import orjson
+except ImportError:     # opcional: sin orjson se usa el json de la stdlib
+    orjson = None
+
+
+def _orjson_por_defecto(obj):
+    """
+    Tipos que orjson no serializa por sí mismo (Decimal: DECIMAL de MySQL).
+    """
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    raise TypeError
+
+
 class CustomJSONProvider(DefaultJSONProvider):
 
+    # Serializador activo: "orjson" o "stdlib"
+    serializador = "stdlib"
+
+    # Mismo orden de claves que la stdlib (sort_keys=True)
+    OPCIONES_ORJSON = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def __init__(self, app, serializador=None):
+        super().__init__(app)
+        serializador = (serializador or os.getenv("JSON_SERIALIZADOR", "auto")).lower()
+        if serializador == "auto":
+            serializador = "orjson" if orjson is not None else "stdlib"
+        if serializador == "orjson" and orjson is None:
+            print("[WARN] JSON_SERIALIZADOR=orjson pero orjson no está instalado: se usa stdlib")
+            serializador = "stdlib"
+        self.serializador = serializador
+
     def default(self, obj):
 
         # Si el objeto es una fecha, lo convertimos a texto ISO8601
@@ -98,6 +145,17 @@ class CustomJSONProvider(DefaultJSONProvider):
         # Para cualquier otro tipo, usamos el método estándar
         return super().default(obj)
 
+    def dumps(self, obj, **kwargs):
+
+        # Camino rápido: sin opciones de formato (output_json) o compacto (jsonify)
+        if self.serializador == "orjson" and (not kwargs or kwargs == {"separators": (",", ":")}):
+            try:
+                return orjson.dumps(obj, default=_orjson_por_defecto, option=self.OPCIONES_ORJSON).decode("utf-8")
+            except TypeError:
+                pass    # tipo no admitido (o entero > 64 bits) → stdlib
+
+        return super().dumps(obj, **kwargs)
+
 # Reemplazamos el serializador interno de Flask por el nuestro
 app.json = CustomJSONProvider(app)
 
@@ -117,9 +175,44 @@ app.json = CustomJSONProvider(app)
 # ================================================================
 app.config["JWT_SECRET_KEY"] = "cambia-esta-clave-secreta"
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(minutes=15)
+
+# El token solo se acepta en la cabecera Authorization. La excepción es
+# /eventos/stream: EventSource (SSE) no permite enviar cabeceras y ese
+# endpoint acepta también ?jwt=<token> (locations en su @jwt_required).
+# No se habilita en el resto para que el token no acabe en los logs.
+app.config["JWT_TOKEN_LOCATION"] = ["headers"]
+app.config["JWT_QUERY_STRING_NAME"] = "jwt"
 jwt = JWTManager(app)
 
 
+# Usuarios bloqueados: su token deja de valer aunque no haya caducado.
+# usuario_activo() está cacheado unos segundos por usuario (no hay
+# consulta a la BD en cada petición) y se invalida al bloquear.
+@jwt.token_in_blocklist_loader
+def token_de_usuario_bloqueado(jwt_header, jwt_payload):
+    return not usuario_activo(int(jwt_payload["sub"]))
+
+
+@jwt.revoked_token_loader
+def respuesta_usuario_bloqueado(jwt_header, jwt_payload):
+    return make_response(
+        jsonify({"msg": "Usuario bloqueado. Contacte con el administrador."}), 401
+    )
+
+
+# ================================================================
+# 4.1) CATÁLOGO DE TURNOS EN MEMORIA
+# ----------------------------------------------------------------
+# tipo_turno se carga una vez al arrancar; el DAL lo usa en lugar de
+# hacer JOIN con tipo_turno en cada consulta. Si la BD aún no está
+# disponible, se cargará en el primer uso.
+# ================================================================
+try:
+    catalogo.cargar()
+except Exception as e:
+    print(f"[WARN] No se pudo cargar el catálogo de turnos: {e}")
+
+
 # ================================================================
 # 5) API RESTful
 # ----------------------------------------------------------------
@@ -145,9 +238,17 @@ api = Api(app)
 #   - TODAS las respuestas JSON pasen por output_json()
 #   - TODAS las fechas se conviertan correctamente
 #   - SIEMPRE se envíe Content-Type: application/json
+#   - Los cuerpos grandes viajen comprimidos (gzip / br) si el
+#     navegador lo admite (ver comprimir_respuesta en EP_Comun)
 #
 # El método output_json recibe el "data" que devuelve un recurso,
 # y lo convierte a JSON usando nuestra configuración personalizada.
+#
+# Compresión (variables de entorno):
+#   COMPRESION_MIN_BYTES     tamaño mínimo a comprimir   (1024)
+#   COMPRESION_NIVEL_GZIP    nivel gzip 1..9             (6)
+#   COMPRESION_NIVEL_BROTLI  nivel brotli 0..11          (4, si
+#                            está instalado el paquete brotli)
 # ================================================================
 @api.representation('application/json')
 def output_json(data, code, headers=None):
@@ -168,7 +269,8 @@ def output_json(data, code, headers=None):
     # aseguramos que el navegador lo trate como JSON
     resp.headers['Content-Type'] = 'application/json'
 
-    return resp
+    # gzip / br según Accept-Encoding (+ Vary: Accept-Encoding)
+    return comprimir_respuesta(resp)
 
 
 
@@ -197,9 +299,15 @@ api.add_resource(Login, "/login")
 # GET  /calendario
 #       → Obtiene los turnos de un trabajador
 #
+# GET  /turnos/rango?desde=YYYY-MM&hasta=YYYY-MM
+# GET  /turnos/libres/<id_user>/rango?year=&month=&meses=N
+#       → Varios meses en una consulta (precarga del calendario)
+#
 # -----------------------------------------------------
 api.add_resource( Turnos,"/turnos")
 api.add_resource( DiasLibresUsuario,  "/turnos/libres/<int:id_user>")
+api.add_resource( TurnosRango, "/turnos/rango")
+api.add_resource( DiasLibresUsuarioRango, "/turnos/libres/<int:id_user>/rango")
 
 
 # -----------------------------------------------------
@@ -269,12 +377,47 @@ api.add_resource(SolicitudesNuevasRecibidas,
                  "/solicitudes/recibidas/nuevas/vista/<int:id_solicitud>")
 
 
+# -----------------------------------------------------
+# ENDPOINT MARCAR SOLICITUDES RECIBIDAS COMO VISTAS (requiere JWT)
+#   POST /solicitudes/recibidas/vistas
+#
+# Body {"ids": [...]} o {"todas": true}. Un único UPSERT
+# en lugar de una petición por solicitud.
+# -----------------------------------------------------
+api.add_resource(
+    SolicitudesRecibidasVistas,
+    "/solicitudes/recibidas/vistas"
+)
+
+
 api.add_resource(
     SolicitudesRecibidasExpiradasCount,
     "/solicitudes/recibidas/expiradas/count"
 )
 
 
+# -----------------------------------------------------
+# ENDPOINT RESUMEN DE NOTIFICACIONES (requiere JWT)
+#   GET /notificaciones/resumen
+#
+# Devuelve los tres contadores del nav del trabajador
+# (respuestas, solicitudes nuevas y matches no vistos)
+# calculados en una sola consulta.
+# -----------------------------------------------------
+api.add_resource(NotificacionesResumen, "/notificaciones/resumen")
+
+
+# -----------------------------------------------------
+# ENDPOINT STREAM DE EVENTOS (SSE) (requiere JWT)
+#   GET /eventos/stream?jwt=<token>
+#
+# Envía los contadores del nav (trabajador o coordinador)
+# cada vez que cambian, en lugar de sondear cada minuto.
+# Requiere un servidor con hilos (gunicorn gthread/gevent).
+# -----------------------------------------------------
+api.add_resource(EventosStream, "/eventos/stream")
+
+
 # -----------------------------------------------------
 # ENDPOINT DE HISTORIAL DE MATCHES (requiere JWT)
 #   GET /matches
@@ -309,10 +452,16 @@ api.add_resource(UsuarioPassword, "/usuario/password")
 api.add_resource(EstadisticasValidacionesEstado, "/coordinador/estadisticas/validaciones/estado")
 api.add_resource(EstadisticasValidacionesPorDia, "/coordinador/estadisticas/validaciones/por-dia")
 
+# Aciertos / fallos de la caché de resultados de las estadísticas
+api.add_resource(EstadisticasCache, "/coordinador/estadisticas/cache")
+
 # -----------------------------------------------------
 # ENDPOINT VALIDACIÓN DE MATCHES (requiere JWT)
 #   GET /matches
 #
+# GET /matches, /matches/pendientes, /validaciones y /usuarios
+# admiten ?formato=columnas → {columns, rows, dict} con los
+# textos repetidos codificados por diccionario (a_columnas).
 # -----------------------------------------------------
 api.add_resource(HistorialMatches,"/matches")
 api.add_resource(MatchesPendientesValidacion, "/matches/pendientes")
@@ -320,6 +469,24 @@ api.add_resource(MatchesVistos, "/matches/vistos")
 api.add_resource(MatchValidar, "/matches/validar/<int:id_match>")
 api.add_resource(MatchDenegar, "/matches/denegar/<int:id_match>")
 
+# -----------------------------------------------------
+# ENDPOINT VALIDACIÓN EN BLOQUE (requiere JWT, coordinador/admin)
+#   POST /matches/lote
+#
+# Valida o deniega muchos matches en transacciones por bloques
+# y devuelve el resultado de cada uno.
+# -----------------------------------------------------
+api.add_resource(MatchesLote, "/matches/lote")
+
+
+
+# -----------------------------------------------------
+# ENDPOINT RESUMEN DE NOTIFICACIONES COORDINADOR (requiere JWT)
+#   GET /notificaciones/coordinador/resumen
+#
+# Contadores del nav del coordinador (con ETag → 304).
+# -----------------------------------------------------
+api.add_resource(NotificacionesResumenCoordinador, "/notificaciones/coordinador/resumen")
 
 
 # -----------------------------------------------------
@@ -0,0 +1,20 @@
+-- =====================================================================
+-- 001 - Índices para las consultas de calendario (GestionTurnos)
+-- ---------------------------------------------------------------------
+-- getTurnosTrabajadorMes y diasLibresUsuario filtran ahora por rango
+-- semiabierto:  fecha_turno >= inicio AND fecha_turno < fin
+--
+-- - turno(fecha_turno, id_tipo_turno): permite resolver el rango de
+--   fechas por índice y devolver id_tipo_turno sin leer la fila.
+-- - turno_trabajador(id_trabajador, id_turno): localiza los turnos de
+--   un trabajador sin recorrer toda la tabla y cubre el JOIN con turno.
+--
+-- Ejecutar una sola vez:
+--   mysql -u remoto -p rhinder_db < migrations/001_indices_calendario.sql
+-- =====================================================================
+
+CREATE INDEX idx_turno_fecha_tipo
+    ON turno (fecha_turno, id_tipo_turno);
+
+CREATE INDEX idx_tt_trabajador_turno
+    ON turno_trabajador (id_trabajador, id_turno);
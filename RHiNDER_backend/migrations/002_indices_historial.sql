@@ -0,0 +1,23 @@
+-- =====================================================================
+-- 002 - Índices para la paginación por cursor de los historiales
+-- ---------------------------------------------------------------------
+-- /validaciones y /matches paginan con keyset sobre (fecha, id):
+--   ORDER BY fecha DESC, id DESC
+--   WHERE fecha < ? OR (fecha = ? AND id < ?)
+--   LIMIT n
+--
+-- - validacion(fecha_validacion, id_match): cada página del historial
+--   del coordinador es un rango del índice, sin ordenar todo el
+--   historial ni saltar filas con OFFSET.
+-- - match(fecha_match, id_match): lo mismo para el historial de
+--   matches y para el filtro desde/hasta por fecha_match.
+--
+-- Ejecutar una sola vez:
+--   mysql -u remoto -p rhinder_db < migrations/002_indices_historial.sql
+-- =====================================================================
+
+CREATE INDEX idx_validacion_fecha_match
+    ON validacion (fecha_validacion, id_match);
+
+CREATE INDEX idx_match_fecha_id
+    ON `match` (fecha_match, id_match);
@@ -0,0 +1,24 @@
+-- =====================================================================
+-- 003 - Una sola validación por match
+-- ---------------------------------------------------------------------
+-- La validación en bloque (POST /matches/lote) crea o actualiza las
+-- validaciones de muchos matches con un único
+--   INSERT ... VALUES (...), (...) ON DUPLICATE KEY UPDATE
+-- y para eso validacion(id_match) tiene que ser UNIQUE. Hasta ahora
+-- solo lo garantizaba el código (SELECT y después UPDATE o INSERT).
+--
+-- 1) Si hubiera duplicados, se conserva la validación más reciente.
+-- 2) Se crea el índice único.
+--
+-- Ejecutar una sola vez:
+--   mysql -u remoto -p rhinder_db < migrations/003_validacion_unica_por_match.sql
+-- =====================================================================
+
+DELETE v_old
+FROM validacion v_old
+JOIN validacion v_new
+  ON v_new.id_match = v_old.id_match
+ AND v_new.id_validacion > v_old.id_validacion;
+
+CREATE UNIQUE INDEX uq_validacion_id_match
+    ON validacion (id_match);
@@ -0,0 +1,44 @@
+-- =====================================================================
+-- 004 - Agregados diarios para las estadísticas del coordinador
+-- ---------------------------------------------------------------------
+-- Las gráficas del panel del coordinador ya no recorren validacion con
+-- DATE()/YEAR()/MONTH() en cada carga. Ahora leen de dos tablas que se
+-- mantienen de forma incremental:
+--
+-- - estadistica_validacion_dia(fecha, estado, total): validaciones por
+--   día y estado. La actualizan validar_match / denegar_match / el lote
+--   en la misma transacción que la validación.
+-- - estadistica_contador(nombre, valor): contadores globales; por ahora
+--   'matches_pendientes' (matches en PENDIENTE_VALIDACION).
+--
+-- Lo que cambie fuera de la API (sp_expirar_registros, cambios a mano)
+-- lo corrige scripts/reconciliar_estadisticas.py.
+--
+-- Ejecutar una sola vez:
+--   mysql -u remoto -p rhinder_db < migrations/004_estadisticas_diarias.sql
+-- =====================================================================
+
+CREATE TABLE estadistica_validacion_dia (
+    fecha  DATE        NOT NULL,
+    estado VARCHAR(20) NOT NULL,
+    total  INT         NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, estado)
+);
+
+CREATE TABLE estadistica_contador (
+    nombre      VARCHAR(50) NOT NULL,
+    valor       INT         NOT NULL DEFAULT 0,
+    actualizado TIMESTAMP   NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (nombre)
+);
+
+-- Carga inicial a partir del histórico
+INSERT INTO estadistica_validacion_dia (fecha, estado, total)
+SELECT DATE(v.fecha_validacion), v.estado, COUNT(*)
+FROM validacion v
+GROUP BY DATE(v.fecha_validacion), v.estado;
+
+INSERT INTO estadistica_contador (nombre, valor)
+SELECT 'matches_pendientes', COUNT(*)
+FROM `match` m
+WHERE m.estado = 'PENDIENTE_VALIDACION';
@@ -0,0 +1,28 @@
+-- =====================================================================
+-- 005 - Expiración de respuestas en lote (fuera de las peticiones GET)
+-- ---------------------------------------------------------------------
+-- GET /respuestas/expiradas/avisar ya no expira ni borra nada: lo hace
+-- scripts/expirar.py para todos los usuarios a la vez. Como el lote borra
+-- las respuestas expiradas cuya solicitud sigue viva (para que se pueda
+-- volver a responder), antes de borrarlas las suma aquí, y el aviso al
+-- usuario sigue contándolas:
+--
+-- - aviso_respuesta_expirada(id_receptor, total): respuestas expiradas
+--   ya borradas por el lote, por receptor (acumulado).
+-- - respuesta(estado, id_receptor): el lote localiza las PENDIENTE /
+--   EXPIRADA sin recorrer la tabla, y el aviso cuenta las EXPIRADA de un
+--   usuario desde el índice.
+--
+-- Ejecutar una sola vez:
+--   mysql -u remoto -p rhinder_db < migrations/005_aviso_respuestas_expiradas.sql
+-- =====================================================================
+
+CREATE TABLE aviso_respuesta_expirada (
+    id_receptor INT       NOT NULL,
+    total       INT       NOT NULL DEFAULT 0,
+    actualizado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_receptor)
+);
+
+CREATE INDEX idx_respuesta_estado_receptor
+    ON respuesta (estado, id_receptor);
@@ -0,0 +1,30 @@
+-- =====================================================================
+-- 006 - Expiración por bloques con marca de agua
+-- ---------------------------------------------------------------------
+-- scripts/expirar.py ya no llama a sp_expirar_registros() (una sola
+-- transacción sobre todas las tablas). Ahora recorre cada entidad por
+-- bloques ordenados por la fecha del turno (DB_Expiracion.py):
+--
+-- - expiracion_marca(entidad, fecha, id): último (fecha, id) procesado
+--   por entidad; cada pasada continúa desde ahí.
+-- - solicitud(estado, is_activa) y `match`(estado): los candidatos se
+--   buscan solo entre las filas vivas, no en todo el histórico.
+--   (respuesta(estado, id_receptor) ya existe desde la migración 005.)
+--
+-- Ejecutar una sola vez:
+--   mysql -u remoto -p rhinder_db < migrations/006_expiracion_por_bloques.sql
+-- =====================================================================
+
+CREATE TABLE expiracion_marca (
+    entidad     VARCHAR(20) NOT NULL,
+    fecha       DATE        NOT NULL,
+    id          INT         NOT NULL,
+    actualizado TIMESTAMP   NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (entidad)
+);
+
+CREATE INDEX idx_solicitud_estado_activa
+    ON solicitud (estado, is_activa);
+
+CREATE INDEX idx_match_estado
+    ON `match` (estado);
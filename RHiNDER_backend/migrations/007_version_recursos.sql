@@ -0,0 +1,26 @@
+-- =====================================================================
+-- 007 - Versiones de recursos para ETag / If-None-Match
+-- ---------------------------------------------------------------------
+-- GET /turnos, /solicitud, /solicitudes/recibidas, /respuestas y /matches
+-- devuelven un ETag derivado de estos contadores (DB_Versiones.py). Si el
+-- cliente envía el mismo ETag, se responde 304 sin ejecutar la consulta.
+--
+-- - version_recurso(clave, version): por usuario "turnos:<id>",
+--   "matches:<id>", "respuestas:<id>" y "usuario:<id>" (marcas de visto);
+--   globales "solicitudes" (cambios que ven todos) y "general".
+--   Cada escritura confirmada incrementa solo las claves que afecta.
+--
+-- IMPORTANTE: si se modifican turnos/solicitudes fuera de la aplicación
+-- (cargas manuales), incrementar la versión general, p. ej.:
+--   UPDATE version_recurso SET version = version + 1 WHERE clave = 'general';
+--
+-- Ejecutar una sola vez:
+--   mysql -u remoto -p rhinder_db < migrations/007_version_recursos.sql
+-- =====================================================================
+
+CREATE TABLE version_recurso (
+    clave       VARCHAR(40)     NOT NULL,
+    version     BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    actualizado TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (clave)
+);
@@ -0,0 +1,273 @@
+"""
+Benchmark de las consultas de calendario (GestionTurnos).
+
+Compara la versión ANTERIOR (YEAR()/MONTH() sobre fecha_turno, sin índices
+compuestos) con la ACTUAL (rango semiabierto + índices de la migración 001)
+sobre un dataset sembrado de 5 años x 2.000 trabajadores (~3,6M asignaciones).
+
+Trabaja en una base de datos aparte (DB_BENCH_NAME, por defecto rhinder_bench)
+con las tablas mínimas que usan las consultas, para no tocar rhinder_db.
+
+Uso:
+    python scripts/bench_calendario.py --seed      # crea y siembra el dataset
+    python scripts/bench_calendario.py             # EXPLAIN + latencias
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import date
+
+import pymysql
+import pymysql.cursors
+
+
+BENCH_DB = os.getenv("DB_BENCH_NAME", "rhinder_bench")
+TRABAJADORES = 2000
+ANIO_INICIO = 2021
+ANIOS = 5
+TIPOS = [("Mañana", "M"), ("Tarde", "T"), ("Noche", "N"), ("Libre", "L")]
+
+
+# =====================================================
+# CONSULTAS A COMPARAR
+# =====================================================
+SQL_TURNOS_ANTES = """
+    SELECT tt.id_trabajador AS id_user, tt.id_turno_trabajador, t.id_turno,
+           t.fecha_turno, tp.id_tipo_turno, tp.nomenclatura, tp.turno
+    FROM turno_trabajador tt
+    JOIN turno t ON t.id_turno = tt.id_turno
+    JOIN tipo_turno tp ON tp.id_tipo_turno = t.id_tipo_turno
+    WHERE tt.id_trabajador = %s
+      AND YEAR(t.fecha_turno) = %s
+      AND MONTH(t.fecha_turno) = %s
+    ORDER BY t.fecha_turno ASC
+"""
+
+SQL_TURNOS_DESPUES = """
+    SELECT tt.id_trabajador AS id_user, tt.id_turno_trabajador, t.id_turno,
+           t.fecha_turno, tp.id_tipo_turno, tp.nomenclatura, tp.turno
+    FROM turno_trabajador tt
+    JOIN turno t ON t.id_turno = tt.id_turno
+    JOIN tipo_turno tp ON tp.id_tipo_turno = t.id_tipo_turno
+    WHERE tt.id_trabajador = %s
+      AND t.fecha_turno >= %s
+      AND t.fecha_turno < %s
+    ORDER BY t.fecha_turno ASC
+"""
+
+SQL_LIBRES_ANTES = """
+    SELECT t.fecha_turno
+    FROM turno_trabajador tt
+    JOIN turno t ON t.id_turno = tt.id_turno
+    JOIN tipo_turno tp ON tp.id_tipo_turno = t.id_tipo_turno
+    WHERE tt.id_trabajador = %s
+      AND YEAR(t.fecha_turno) = %s
+      AND MONTH(t.fecha_turno) = %s
+      AND tp.nomenclatura = 'L'
+    ORDER BY t.fecha_turno ASC
+"""
+
+SQL_LIBRES_DESPUES = """
+    SELECT t.fecha_turno
+    FROM turno_trabajador tt
+    JOIN turno t ON t.id_turno = tt.id_turno
+    JOIN tipo_turno tp ON tp.id_tipo_turno = t.id_tipo_turno
+    WHERE tt.id_trabajador = %s
+      AND t.fecha_turno >= %s
+      AND t.fecha_turno < %s
+      AND tp.nomenclatura = 'L'
+    ORDER BY t.fecha_turno ASC
+"""
+
+INDICES = [
+    ("turno", "idx_turno_fecha_tipo", "(fecha_turno, id_tipo_turno)"),
+    ("turno_trabajador", "idx_tt_trabajador_turno", "(id_trabajador, id_turno)"),
+]
+
+
+def conectar(database=None):
+    return pymysql.connect(
+        host=os.getenv("DB_HOST", "127.0.0.1"),
+        user=os.getenv("DB_USER", "remoto"),
+        password=os.getenv("DB_PASS", "1111"),
+        database=database,
+        port=int(os.getenv("DB_PORT", "3306")),
+        autocommit=True,
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.DictCursor,
+    )
+
+
+# =====================================================
+# SIEMBRA DEL DATASET
+# =====================================================
+def sembrar():
+    cnx = conectar()
+    try:
+        cur = cnx.cursor()
+        cur.execute(f"DROP DATABASE IF EXISTS `{BENCH_DB}`")
+        cur.execute(f"CREATE DATABASE `{BENCH_DB}` CHARACTER SET utf8mb4")
+        cur.execute(f"USE `{BENCH_DB}`")
+
+        cur.execute("""
+            CREATE TABLE tipo_turno (
+                id_tipo_turno INT AUTO_INCREMENT PRIMARY KEY,
+                turno VARCHAR(50) NOT NULL,
+                nomenclatura VARCHAR(10) NOT NULL
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE turno (
+                id_turno INT AUTO_INCREMENT PRIMARY KEY,
+                id_tipo_turno INT NOT NULL,
+                fecha_turno DATE NOT NULL,
+                KEY fk_turno_tipo (id_tipo_turno)
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE turno_trabajador (
+                id_turno_trabajador INT AUTO_INCREMENT PRIMARY KEY,
+                id_turno INT NOT NULL,
+                id_trabajador INT NOT NULL,
+                KEY fk_tt_turno (id_turno),
+                KEY fk_tt_trabajador (id_trabajador)
+            )
+        """)
+        cur.execute("CREATE TABLE numeros (n INT PRIMARY KEY)")
+
+        cur.executemany(
+            "INSERT INTO tipo_turno (turno, nomenclatura) VALUES (%s, %s)", TIPOS
+        )
+        cur.executemany(
+            "INSERT INTO numeros (n) VALUES (%s)", [(i,) for i in range(1, TRABAJADORES + 1)]
+        )
+
+        # Un turno (fecha, tipo) por cada día del periodo y tipo
+        inicio = date(ANIO_INICIO, 1, 1)
+        fin = date(ANIO_INICIO + ANIOS, 1, 1)
+        cur.execute("""
+            INSERT INTO turno (id_tipo_turno, fecha_turno)
+            SELECT tp.id_tipo_turno, DATE_ADD(%s, INTERVAL (n.n - 1) DAY)
+            FROM numeros n
+            CROSS JOIN tipo_turno tp
+            WHERE DATE_ADD(%s, INTERVAL (n.n - 1) DAY) < %s
+        """, (inicio, inicio, fin))
+
+        # Cada trabajador tiene un turno al día, rotando M/T/N/L
+        t0 = time.perf_counter()
+        cur.execute("""
+            INSERT INTO turno_trabajador (id_turno, id_trabajador)
+            SELECT t.id_turno, w.n
+            FROM turno t
+            JOIN numeros w
+              ON t.id_tipo_turno = 1 + MOD(w.n + DATEDIFF(t.fecha_turno, %s), 4)
+        """, (inicio,))
+        print(f"turno_trabajador sembrada: {cur.rowcount} filas en {time.perf_counter() - t0:.1f}s")
+
+        cur.execute("ANALYZE TABLE turno, turno_trabajador, tipo_turno")
+    finally:
+        cnx.close()
+
+
+# =====================================================
+# MEDICIÓN
+# =====================================================
+def gestionar_indices(cur, crear):
+    for tabla, nombre, columnas in INDICES:
+        cur.execute(
+            "SELECT COUNT(*) AS n FROM information_schema.statistics "
+            "WHERE table_schema = %s AND table_name = %s AND index_name = %s",
+            (BENCH_DB, tabla, nombre),
+        )
+        existe = cur.fetchone()["n"] > 0
+        if crear and not existe:
+            cur.execute(f"CREATE INDEX {nombre} ON {tabla} {columnas}")
+        elif not crear and existe:
+            cur.execute(f"DROP INDEX {nombre} ON {tabla}")
+
+
+def explain(cur, sql, params):
+    cur.execute("EXPLAIN " + sql, params)
+    for fila in cur.fetchall():
+        print(
+            f"    {fila['table']:<4} type={fila['type']:<7} key={str(fila['key']):<24} "
+            f"rows={fila['rows']:<8} extra={fila['Extra']}"
+        )
+
+
+def medir(cur, sql, generar_params, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        params = generar_params()
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+
+    tiempos.sort()
+    return {
+        "media": statistics.mean(tiempos),
+        "p50": tiempos[len(tiempos) // 2],
+        "p95": tiempos[int(len(tiempos) * 0.95) - 1],
+    }
+
+
+def bench(repeticiones):
+    cnx = conectar(BENCH_DB)
+    rnd = random.Random(42)
+
+    def params_antes():
+        return (rnd.randint(1, TRABAJADORES), rnd.randint(ANIO_INICIO, ANIO_INICIO + ANIOS - 1), rnd.randint(1, 12))
+
+    def params_despues():
+        id_user, year, month = params_antes()
+        inicio = date(year, month, 1)
+        fin = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return (id_user, inicio, fin)
+
+    casos = [
+        ("getTurnosTrabajadorMes", SQL_TURNOS_ANTES, SQL_TURNOS_DESPUES),
+        ("diasLibresUsuario", SQL_LIBRES_ANTES, SQL_LIBRES_DESPUES),
+    ]
+
+    try:
+        cur = cnx.cursor()
+        ejemplo_antes = (1000, ANIO_INICIO + 2, 6)
+        ejemplo_despues = (1000, date(ANIO_INICIO + 2, 6, 1), date(ANIO_INICIO + 2, 7, 1))
+
+        for nombre, sql_antes, sql_despues in casos:
+            print(f"\n=== {nombre} ===")
+
+            gestionar_indices(cur, crear=False)
+            print("  ANTES (YEAR/MONTH, sin índices compuestos)")
+            explain(cur, sql_antes, ejemplo_antes)
+            rnd.seed(42)
+            r = medir(cur, sql_antes, params_antes, repeticiones)
+            print(f"    latencia ms: media={r['media']:.2f} p50={r['p50']:.2f} p95={r['p95']:.2f}")
+
+            gestionar_indices(cur, crear=True)
+            print("  DESPUÉS (rango semiabierto + índices 001)")
+            explain(cur, sql_despues, ejemplo_despues)
+            rnd.seed(42)
+            r = medir(cur, sql_despues, params_despues, repeticiones)
+            print(f"    latencia ms: media={r['media']:.2f} p50={r['p50']:.2f} p95={r['p95']:.2f}")
+    finally:
+        cnx.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="(re)crea y siembra la BD de benchmark")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.seed:
+        sembrar()
+    bench(args.repeticiones)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark de la compresión de respuestas (output_json + comprimir_respuesta).
+
+Genera historiales sintéticos con la forma de GET /matches y GET /validaciones
+(mismas columnas que los _SQL_HISTORIAL del DAL) y los pasa por la
+representación JSON real de main.py, variando Accept-Encoding y el nivel:
+
+- identity:  sin comprimir (comportamiento anterior)
+- gzip N:    niveles 1, 6 y 9
+- br N:      niveles 1, 4 y 6 (solo si está instalado el paquete brotli)
+
+Cada historial se mide también con ?formato=columnas (a_columnas).
+
+Muestra bytes en la red, ratio, CPU por respuesta (serializar + comprimir)
+y el tiempo estimado de transferencia a --mbps (Wi-Fi lenta del hospital).
+
+No necesita base de datos.
+
+Uso:
+    python scripts/bench_compresion.py
+    python scripts/bench_compresion.py --filas 5000 --mbps 1 --repeticiones 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Permite ejecutar el script desde cualquier carpeta (importa main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from endpoints import EP_Comun
+from endpoints.EP_Comun import a_columnas
+
+
+USUARIOS = [f"trabajador{n:03d}" for n in range(120)]
+COORDINADORES = ["coordinacion1", "coordinacion2", "supervisora"]
+NOMENCLATURAS = ["M", "T", "N", "L", "MT", "TN"]
+COMENTARIOS = [None, "", "Aprobado", "Cobertura insuficiente en planta", "Cambio conforme al cuadrante"]
+
+
+# =====================================================
+# DATOS SINTÉTICOS
+# =====================================================
+def _fechas(rng, i):
+    base = datetime(2025, 1, 1) + timedelta(minutes=37 * i)
+    turno = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+    return base, turno
+
+
+def historial_matches(filas, rng):
+    datos = []
+    for i in range(filas):
+        fecha_match, turno = _fechas(rng, i)
+        validado = rng.random() < 0.8
+        datos.append({
+            "id_match": 100000 + i,
+            "estado_match": rng.choice(["VALIDADO", "RECHAZADO", "EXPIRADO", "PENDIENTE_VALIDACION"]),
+            "fecha_match": fecha_match,
+            "fecha_ultimo_cambio": fecha_match + timedelta(hours=rng.randrange(1, 72)),
+            "emisor_username": rng.choice(USUARIOS),
+            "receptor_username": rng.choice(USUARIOS),
+            "estado_validacion": rng.choice(["APROBADA", "RECHAZADA"]) if validado else None,
+            "fecha_validacion": fecha_match + timedelta(hours=5) if validado else None,
+            "comentario_validacion": rng.choice(COMENTARIOS) if validado else None,
+            "fecha_turno_emisor": turno,
+            "nomenclatura_emisor": rng.choice(NOMENCLATURAS),
+            "fecha_turno_receptor": turno + timedelta(days=rng.randrange(-3, 4)),
+            "nomenclatura_receptor": rng.choice(NOMENCLATURAS),
+            "visto_por_emisor": rng.randrange(2),
+            "visto_por_receptor": rng.randrange(2),
+            "mi_rol_en_match": rng.choice(["EMISOR", "RECEPTOR"]),
+        })
+    return datos
+
+
+def historial_validaciones(filas, rng):
+    datos = []
+    for i in range(filas):
+        fecha_match, turno = _fechas(rng, i)
+        datos.append({
+            "id_match": 200000 + i,
+            "estado_match": rng.choice(["VALIDADO", "RECHAZADO", "EXPIRADO"]),
+            "fecha_match": fecha_match,
+            "emisor_username": rng.choice(USUARIOS),
+            "receptor_username": rng.choice(USUARIOS),
+            "admin_username": rng.choice(COORDINADORES),
+            "fecha_validacion": fecha_match + timedelta(hours=rng.randrange(1, 48)),
+            "comentario_validacion": rng.choice(COMENTARIOS),
+            "estado_validacion": rng.choice(["APROBADA", "RECHAZADA", "EXPIRADA"]),
+            "visto_por_coordinador": rng.randrange(2),
+            "fecha_turno_emisor": turno,
+            "nomenclatura_emisor": rng.choice(NOMENCLATURAS),
+            "fecha_turno_receptor": turno + timedelta(days=rng.randrange(-3, 4)),
+            "nomenclatura_receptor": rng.choice(NOMENCLATURAS),
+        })
+    return datos
+
+
+# =====================================================
+# MEDICIÓN
+# =====================================================
+def medir(datos, aceptar, repeticiones):
+    """
+    CPU (ms) de output_json por respuesta y bytes del cuerpo enviado.
+    """
+    tiempos = []
+    with main.app.test_request_context(headers={"Accept-Encoding": aceptar}):
+        resp = main.output_json(datos, 200)      # calentamiento
+
+        for _ in range(repeticiones):
+            t0 = time.process_time()
+            resp = main.output_json(datos, 200)
+            tiempos.append((time.process_time() - t0) * 1000)
+
+    return {
+        "bytes": len(resp.get_data()),
+        "codificacion": resp.headers.get("Content-Encoding", "identity"),
+        "cpu_ms": statistics.median(tiempos),
+    }
+
+
+def casos():
+    yield "identity", "identity", None
+    for nivel in (1, 6, 9):
+        yield f"gzip {nivel}", "gzip", nivel
+    if EP_Comun.brotli is not None:
+        for nivel in (1, 4, 6):
+            yield f"br {nivel}", "br", nivel
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=2000, help="filas de cada historial")
+    parser.add_argument("--mbps", type=float, default=2, help="ancho de banda para estimar la transferencia")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(2025)
+    matches = historial_matches(args.filas, rng)
+    validaciones = historial_validaciones(args.filas, rng)
+    historiales = [
+        ("GET /matches", matches),
+        ("GET /matches?formato=columnas", a_columnas(matches)),
+        ("GET /validaciones", validaciones),
+        ("GET /validaciones?formato=columnas", a_columnas(validaciones)),
+    ]
+
+    if EP_Comun.brotli is None:
+        print("(paquete brotli no instalado: solo gzip)")
+
+    nivel_gzip, nivel_brotli = EP_Comun.COMPRESION_NIVEL_GZIP, EP_Comun.COMPRESION_NIVEL_BROTLI
+    try:
+        for nombre, datos in historiales:
+            print(f"\n{nombre}: {args.filas} filas, {args.mbps} Mbit/s")
+            base = None
+            for etiqueta, aceptar, nivel in casos():
+                if aceptar == "gzip":
+                    EP_Comun.COMPRESION_NIVEL_GZIP = nivel
+                elif aceptar == "br":
+                    EP_Comun.COMPRESION_NIVEL_BROTLI = nivel
+
+                r = medir(datos, aceptar, args.repeticiones)
+                base = base or r
+                red_ms = r["bytes"] * 8 / (args.mbps * 1_000_000) * 1000
+                print(
+                    f"  {etiqueta:9s} {r['bytes'] / 1024:9.1f} KB  "
+                    f"ratio={base['bytes'] / r['bytes']:5.1f}x  "
+                    f"cpu={r['cpu_ms']:7.2f} ms (+{r['cpu_ms'] - base['cpu_ms']:6.2f})  "
+                    f"red≈{red_ms:8.1f} ms  total≈{red_ms + r['cpu_ms']:8.1f} ms"
+                )
+    finally:
+        EP_Comun.COMPRESION_NIVEL_GZIP, EP_Comun.COMPRESION_NIVEL_BROTLI = nivel_gzip, nivel_brotli
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,107 @@
+"""
+Micro-benchmark del serializador JSON (CustomJSONProvider de main.py).
+
+Serializa un resultado sintético de GestionValidaciones.getHistorialValidaciones
+(10.000 filas DictCursor: datetime, date, enteros, textos y NULL) con:
+
+- stdlib: json.dumps + default() por cada fecha (comportamiento anterior)
+- orjson: camino rápido (solo si está instalado el paquete orjson)
+
+Antes de medir comprueba que ambos generan los mismos datos y el mismo
+texto ISO8601 para cada fecha. Muestra ms por volcado (media/p50/p95),
+µs por fila y tamaño del cuerpo.
+
+No necesita base de datos.
+
+Uso:
+    python scripts/bench_json.py
+    python scripts/bench_json.py --filas 50000 --repeticiones 30
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime
+
+# Permite ejecutar el script desde cualquier carpeta (importa main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from bench_compresion import historial_validaciones
+
+
+# =====================================================
+# COMPROBACIÓN
+# =====================================================
+def comprobar(datos, proveedores):
+    """
+    Mismos datos en todos los serializadores y cada fecha con el texto
+    de isoformat() (el del camino anterior).
+    """
+    referencia = None
+    for nombre, proveedor in proveedores:
+        leido = json.loads(proveedor.dumps(datos))
+        for fila, fila_leida in zip(datos, leido):
+            for clave, valor in fila.items():
+                if isinstance(valor, (date, datetime)):
+                    assert fila_leida[clave] == valor.isoformat(), f"{nombre}: {clave} distinta"
+
+        if referencia is None:
+            referencia = leido
+        assert leido == referencia, f"{nombre}: datos distintos"
+
+
+# =====================================================
+# MEDICIÓN
+# =====================================================
+def medir(proveedor, datos, repeticiones):
+    proveedor.dumps(datos)      # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        cuerpo = proveedor.dumps(datos)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    tiempos.sort()
+
+    return {
+        "media": statistics.mean(tiempos),
+        "p50": tiempos[len(tiempos) // 2],
+        "p95": tiempos[max(0, int(len(tiempos) * 0.95) - 1)],
+        "bytes": len(cuerpo.encode("utf-8")),
+    }
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    datos = historial_validaciones(args.filas, random.Random(2025))
+
+    proveedores = [("stdlib", main.CustomJSONProvider(main.app, "stdlib"))]
+    if main.orjson is not None:
+        proveedores.append(("orjson", main.CustomJSONProvider(main.app, "orjson")))
+    else:
+        print("(paquete orjson no instalado: solo stdlib)")
+
+    comprobar(datos, proveedores)
+    print(f"getHistorialValidaciones: {args.filas} filas, {args.repeticiones} repeticiones (datos y fechas ISO idénticos)")
+
+    base = None
+    for nombre, proveedor in proveedores:
+        r = medir(proveedor, datos, args.repeticiones)
+        base = base or r
+        print(
+            f"  {nombre:7s} ms: media={r['media']:7.2f} p50={r['p50']:7.2f} p95={r['p95']:7.2f}  "
+            f"{r['media'] * 1000 / args.filas:5.2f} µs/fila  "
+            f"{r['bytes'] / 1024:7.1f} KB  x{base['media'] / r['media']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main_bench()
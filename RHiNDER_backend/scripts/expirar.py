@@ -1,9 +1,47 @@
+"""
+Expiración programada de solicitudes, respuestas y matches.
+
+Recorre cada entidad por bloques acotados (GestionExpiracion): cada
+bloque es una transacción corta y una marca de agua hace que cada pasada
+solo revise lo que se ha vuelto expirable desde la anterior.
+
+Uso:
+    python scripts/expirar.py                      # una pasada (cron)
+    python scripts/expirar.py --residente          # una pasada cada --intervalo s
+    python scripts/expirar.py --tamano-lote 200 --pausa 0.1
+    python scripts/expirar.py --motor              # despierta solo cuando algo vence
+    python scripts/expirar.py --sp                 # antiguo CALL sp_expirar_registros()
+
+Cada pasada escribe una línea JSON con sus métricas (tiempo y filas
+revisadas / expiradas por entidad), fácil de recoger desde los logs.
+
+En modo --motor (MotorExpiracion) los plazos de las filas vivas se
+cargan en memoria al arrancar; el proceso duerme hasta el siguiente
+vencimiento y expira solo esos ids. Cada --refresco s recoge las filas
+nuevas y cada --reconstruir s vuelve a cargar la cola entera. No debe
+convivir con el modo residente ni con el cron de pasadas.
+"""
+
+import argparse
+import json
 import os
+import signal
 import sys
+import time
 import pymysql
 from datetime import datetime
 
-def main():
+# Permite ejecutar el script desde cualquier carpeta (importa el paquete database)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.DB_Expiracion import GestionExpiracion, MotorExpiracion, TAMANO_LOTE_EXPIRACION
+from database.DB_Versiones import GestionVersiones, VERSION_GENERAL
+
+
+def expirar_sp():
+    """
+    Modo anterior: todo en una transacción con sp_expirar_registros().
+    """
     cnx = pymysql.connect(
         host=os.getenv("DB_HOST", "127.0.0.1"),
         user=os.getenv("DB_USER", "remoto"),
@@ -17,6 +55,13 @@ def main():
     try:
         cur = cnx.cursor()
         cur.execute("CALL sp_expirar_registros();")
+        # Los matches expirados dejan de estar pendientes: el contador del
+        # panel del coordinador (migración 004) se recalcula en la misma TX
+        cur.execute("""
+            UPDATE estadistica_contador
+            SET valor = (SELECT COUNT(*) FROM `match` WHERE estado = 'PENDIENTE_VALIDACION')
+            WHERE nombre = 'matches_pendientes'
+        """)
         cnx.commit()
         print(f"[{datetime.now()}] OK sp_expirar_registros")
     except Exception as e:
@@ -26,5 +71,102 @@ def main():
     finally:
         cnx.close()
 
+
+def pasada(tamano_lote, pausa):
+    """
+    Una pasada por bloques; escribe sus métricas como una línea JSON.
+    """
+    metricas = GestionExpiracion.ejecutar_pasada(tamano_lote, pausa)
+    print(json.dumps({"ts": datetime.now().isoformat(timespec="seconds"), **metricas}), flush=True)
+    return metricas
+
+
+def residente(intervalo, tamano_lote, pausa):
+    """
+    Bucle de pasadas cada `intervalo` segundos hasta SIGINT/SIGTERM.
+    Un error en una pasada se registra y se reintenta en la siguiente.
+    """
+    parar = []
+    signal.signal(signal.SIGTERM, lambda *_: parar.append(True))
+    signal.signal(signal.SIGINT, lambda *_: parar.append(True))
+
+    while not parar:
+        inicio = time.monotonic()
+        try:
+            pasada(tamano_lote, pausa)
+        except Exception as e:
+            print(f"[{datetime.now()}] ERROR {e}", file=sys.stderr, flush=True)
+
+        # Dormir a trozos para atender la señal de parada enseguida
+        while not parar and time.monotonic() - inicio < intervalo:
+            time.sleep(min(1.0, intervalo))
+
+
+def motor(refresco, reconstruir, tamano_lote):
+    """
+    Bucle guiado por plazos hasta SIGINT/SIGTERM. Duerme hasta el
+    primer vencimiento (o el siguiente refresco) y expira lo vencido.
+    Un error se registra y el bucle sigue tras reconstruir la cola.
+    """
+    parar = []
+    signal.signal(signal.SIGTERM, lambda *_: parar.append(True))
+    signal.signal(signal.SIGINT, lambda *_: parar.append(True))
+
+    cola = MotorExpiracion(tamano_lote)
+    proxima_carga = proximo_refresco = 0.0
+
+    while not parar:
+        try:
+            ahora = time.time()
+            if ahora >= proxima_carga:
+                en_cola = cola.cargar()
+                print(json.dumps({"ts": datetime.now().isoformat(timespec="seconds"),
+                                  "carga": en_cola}), flush=True)
+                proxima_carga = ahora + reconstruir
+                proximo_refresco = ahora + refresco
+            elif ahora >= proximo_refresco:
+                cola.refrescar()
+                proximo_refresco = ahora + refresco
+
+            metricas = cola.procesar_vencidas()
+            if metricas["vencidas"]:
+                print(json.dumps({"ts": datetime.now().isoformat(timespec="seconds"), **metricas}),
+                      flush=True)
+        except Exception as e:
+            print(f"[{datetime.now()}] ERROR {e}", file=sys.stderr, flush=True)
+            proxima_carga = time.time() + refresco
+
+        # Dormir hasta el primer plazo (o el refresco), a trozos para la señal
+        despertar = min(p for p in (cola.proximo_plazo(), proximo_refresco, proxima_carga) if p is not None)
+        while not parar and time.time() < despertar:
+            time.sleep(min(1.0, max(0.0, despertar - time.time())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expiración programada de RHiNDER")
+    parser.add_argument("--residente", action="store_true", help="no terminar: una pasada cada --intervalo")
+    parser.add_argument("--intervalo", type=float, default=60, help="segundos entre pasadas (modo residente)")
+    parser.add_argument("--tamano-lote", type=int, default=TAMANO_LOTE_EXPIRACION, help="filas por transacción")
+    parser.add_argument("--pausa", type=float, default=0.05, help="segundos entre bloques")
+    parser.add_argument("--motor", action="store_true", help="no terminar: expirar según los plazos en cola")
+    parser.add_argument("--refresco", type=float, default=30, help="segundos entre lecturas de filas nuevas (--motor)")
+    parser.add_argument("--reconstruir", type=float, default=6 * 3600, help="segundos entre recargas de la cola (--motor)")
+    parser.add_argument("--sp", action="store_true", help="usar sp_expirar_registros() (modo anterior)")
+    args = parser.parse_args()
+
+    if args.sp:
+        expirar_sp()
+        # El procedimiento no limpia las respuestas (ver migración 005)
+        GestionExpiracion.expirar_entidad("respuestas", args.tamano_lote, args.pausa)
+        # El procedimiento no dice a quién afecta: versión general
+        GestionVersiones.incrementar(VERSION_GENERAL)
+    elif args.motor:
+        motor(args.refresco, args.reconstruir, args.tamano_lote)
+    elif args.residente:
+        residente(args.intervalo, args.tamano_lote, args.pausa)
+    else:
+        pasada(args.tamano_lote, args.pausa)
+
+
 if __name__ == "__main__":
     main()
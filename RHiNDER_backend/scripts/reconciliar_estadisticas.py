@@ -0,0 +1,47 @@
+"""
+Reconciliación de los agregados de estadísticas del coordinador.
+
+validar_match / denegar_match mantienen estadistica_validacion_dia y el
+contador de matches pendientes en la misma transacción que la validación.
+Este script los recalcula desde validacion / `match` para corregir lo que
+no pasa por la API (sp_expirar_registros, cambios a mano, restauraciones...).
+
+Uso:
+    python scripts/reconciliar_estadisticas.py              # últimos 2 días + pendientes
+    python scripts/reconciliar_estadisticas.py --dias 31
+    python scripts/reconciliar_estadisticas.py --completo   # todo el histórico
+
+Programación sugerida (cron):
+    */15 * * * *  python scripts/reconciliar_estadisticas.py
+    30 3 * * *    python scripts/reconciliar_estadisticas.py --completo
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Permite ejecutar el script desde cualquier carpeta (importa el paquete database)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.DB_Estadisticas_Coordinador import EstadisticasCoordinador
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconciliar estadísticas del coordinador")
+    parser.add_argument("--dias", type=int, default=2, help="ventana de días a recalcular")
+    parser.add_argument("--completo", action="store_true", help="recalcular todo el histórico")
+    args = parser.parse_args()
+
+    try:
+        resultado = EstadisticasCoordinador.reconciliar(None if args.completo else args.dias)
+        ventana = "completo" if args.completo else f"{args.dias} días"
+        print(f"[{datetime.now()}] OK reconciliar_estadisticas ({ventana}): "
+              f"{resultado['filas_dias']} filas, {resultado['pendientes']} pendientes")
+    except Exception as e:
+        print(f"[{datetime.now()}] ERROR {e}", file=sys.stderr)
+        raise
+
+
+if __name__ == "__main__":
+    main()
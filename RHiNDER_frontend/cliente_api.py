@@ -0,0 +1,164 @@
+"""
+Cliente HTTP compartido del servidor frontend hacia el API (backend).
+
+En lugar de abrir una conexión nueva en cada llamada (requests.post),
+todas las peticiones salen de un pool de conexiones keep-alive:
+
+- Un único HTTPAdapter (pool de urllib3, seguro entre hilos) con tamaño
+  máximo configurable; si se llena, la petición espera una conexión libre
+- Cada hilo usa su propia requests.Session montada sobre ese adaptador
+  (la Session no es segura entre hilos; el pool sí)
+- Reintentos con backoff SOLO para errores de conexión: la petición no
+  llegó a enviarse, así que reintentar un POST (login) es seguro
+- Métricas de latencia (media, p50, p95, máximo) y errores
+
+Configuración (variables de entorno):
+    API_POOL_MAXSIZE   conexiones máximas al API   (32)
+    API_REINTENTOS     reintentos de conexión      (3)
+    API_BACKOFF        factor de backoff en s      (0.2)
+    API_TIMEOUT        timeout por petición en s   (5)
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class ClienteAPI:
+    """
+    ---------------------------------------------------------
+    Sesión HTTP keep-alive y con métricas hacia el backend.
+    ---------------------------------------------------------
+    Se usa como requests: cliente.post("/login", json=...).
+    Las rutas relativas se resuelven contra `base_url`.
+    ---------------------------------------------------------
+    """
+
+    def __init__(self, base_url: str, pool_maxsize: int = 32, reintentos: int = 3,
+                 backoff: float = 0.2, timeout: float = 5, muestras: int = 1000):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        reintento = Retry(
+            total=reintentos,
+            connect=reintentos,
+            read=0,
+            status=0,
+            other=0,
+            redirect=0,
+            allowed_methods=None,      # cualquier método: solo se reintenta si no se envió
+            backoff_factor=backoff,
+            raise_on_status=False,
+        )
+        self._adaptador = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+            max_retries=reintento,
+        )
+        self._local = threading.local()
+
+        self._lock = threading.Lock()
+        self._muestras = deque(maxlen=muestras)   # latencias recientes (ms)
+        self._metricas = {
+            "peticiones": 0,
+            "errores": 0,
+            "latencia_total_ms": 0.0,
+            "latencia_max_ms": 0.0,
+        }
+        self._pool_maxsize = pool_maxsize
+
+    def _sesion(self) -> requests.Session:
+        sesion = getattr(self._local, "sesion", None)
+        if sesion is None:
+            sesion = requests.Session()
+            sesion.mount("http://", self._adaptador)
+            sesion.mount("https://", self._adaptador)
+            self._local.sesion = sesion
+        return sesion
+
+    # =====================================================
+    # PETICIONES
+    # =====================================================
+    def request(self, metodo: str, ruta: str, **kwargs) -> requests.Response:
+        """
+        -----------------------------------------------------
+        Envía una petición por el pool y registra su latencia.
+        -----------------------------------------------------
+        Lanza requests.RequestException igual que requests
+        (tras agotar los reintentos de conexión).
+        -----------------------------------------------------
+        """
+        url = ruta if ruta.startswith("http") else f"{self.base_url}{ruta}"
+        kwargs.setdefault("timeout", self.timeout)
+
+        t0 = time.perf_counter()
+        try:
+            return self._sesion().request(metodo, url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self._metricas["errores"] += 1
+            raise
+        finally:
+            self._registrar((time.perf_counter() - t0) * 1000)
+
+    def get(self, ruta: str, **kwargs) -> requests.Response:
+        return self.request("GET", ruta, **kwargs)
+
+    def post(self, ruta: str, **kwargs) -> requests.Response:
+        return self.request("POST", ruta, **kwargs)
+
+    # =====================================================
+    # MÉTRICAS
+    # =====================================================
+    def _registrar(self, ms: float):
+        with self._lock:
+            self._muestras.append(ms)
+            self._metricas["peticiones"] += 1
+            self._metricas["latencia_total_ms"] += ms
+            self._metricas["latencia_max_ms"] = max(self._metricas["latencia_max_ms"], ms)
+
+    def estadisticas(self) -> dict:
+        """
+        -----------------------------------------------------
+        Snapshot de las métricas del cliente.
+        -----------------------------------------------------
+        p50 / p95 se calculan sobre las últimas `muestras`
+        peticiones; el resto son acumulados desde el arranque.
+        -----------------------------------------------------
+        @return: diccionario con métricas
+        """
+        with self._lock:
+            datos = dict(self._metricas)
+            muestras = sorted(self._muestras)
+
+        peticiones = datos["peticiones"]
+        datos["latencia_media_ms"] = datos["latencia_total_ms"] / peticiones if peticiones else 0.0
+        datos["latencia_p50_ms"] = muestras[len(muestras) // 2] if muestras else 0.0
+        datos["latencia_p95_ms"] = muestras[max(0, int(len(muestras) * 0.95) - 1)] if muestras else 0.0
+        datos["pool_maxsize"] = self._pool_maxsize
+        return datos
+
+    def cerrar(self):
+        """
+        Cierra las conexiones abiertas del pool.
+        """
+        self._adaptador.close()
+
+
+def crear_cliente(base_url: str) -> ClienteAPI:
+    """
+    Cliente configurado con las variables de entorno API_*.
+    """
+    return ClienteAPI(
+        base_url,
+        pool_maxsize=int(os.getenv("API_POOL_MAXSIZE", "32")),
+        reintentos=int(os.getenv("API_REINTENTOS", "3")),
+        backoff=float(os.getenv("API_BACKOFF", "0.2")),
+        timeout=float(os.getenv("API_TIMEOUT", "5")),
+    )
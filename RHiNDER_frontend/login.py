@@ -1,9 +1,11 @@
 from xml.etree.ElementTree import tostring
 
-from flask import Flask, render_template, request, session, make_response
+from flask import Flask, render_template, request, session, make_response, jsonify
 
 import requests
 
+from cliente_api import crear_cliente
+
 from datetime import datetime, timedelta, timezone
 
 app = Flask(__name__)
@@ -16,6 +18,9 @@ app.config['SECRET_KEY'] = 'secret!'
 
 API_URL = 'http://192.168.10.10:5001'
 
+# Sesión keep-alive compartida hacia el API (pool + reintentos + métricas)
+api = crear_cliente(API_URL)
+
 
 
 # Ruta principal
@@ -44,7 +49,7 @@ def login():
 
     # Llamada al API (5001)
     try:
-        response = requests.post(f"{API_URL}/login", json=payload, timeout=5)
+        response = api.post("/login", json=payload)
     except requests.RequestException:
         return render_template("comun/login.html", error_login="No se pudo conectar con el servidor."), 200
 
@@ -128,6 +133,15 @@ def login():
     return dashboard
 
 
+# Métricas del cliente HTTP hacia el API (latencias, errores)
+# Solo con sesión iniciada, como el resto de pantallas
+@app.route("/salud/api")
+def salud_api():
+    if not session.get("usuario"):
+        return jsonify({"ok": False, "msg": "Sesión no iniciada."}), 401
+    return jsonify(api.estadisticas())
+
+
 # ==========================================
 #  RUTAS
 # ==========================================
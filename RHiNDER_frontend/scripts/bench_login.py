@@ -0,0 +1,156 @@
+"""
+Benchmark del login del frontend contra un backend simulado (stub local).
+
+Lanza un servidor HTTP/1.1 en 127.0.0.1 que responde a POST /login como
+el API (token + usuario, con --latencia ms de "trabajo") y dispara logins
+concurrentes a través de la vista /login real (app.test_client), con:
+
+- ANTES:   requests.post() por login (una conexión TCP nueva cada vez)
+- DESPUÉS: ClienteAPI (sesión keep-alive con pool compartido)
+
+Muestra logins/s, latencias y cuántas conexiones TCP aceptó el stub.
+
+Referencia (1000 logins, stub de 2 ms, varias ejecuciones; el stub va
+sin Nagle, como un servidor real, para no penalizar el keep-alive):
+- 4-8 hilos: empate, ~300-370 logins/s con ambos clientes
+- 16 hilos: ~220-260 logins/s sin pool frente a ~300-420 con el pool,
+  que abre 16 conexiones en lugar de una por login
+
+Uso:
+    python scripts/bench_login.py
+    python scripts/bench_login.py --logins 2000 --hilos 32 --latencia 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Permite ejecutar el script desde cualquier carpeta (importa login.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import login as frontend
+from cliente_api import ClienteAPI
+
+
+# =====================================================
+# BACKEND SIMULADO
+# =====================================================
+class StubLogin(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive
+    # Sin esto, cada petición sobre una conexión reutilizada espera al
+    # ACK retardado del cliente (Nagle) y el pool sale penalizado
+    disable_nagle_algorithm = True
+    latencia = 0.0
+    conexiones = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubLogin.lock:
+            StubLogin.conexiones += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.latencia:
+            time.sleep(self.latencia)
+
+        cuerpo = json.dumps({
+            "access_token": "x" * 200,
+            "user": {"id": 1, "username": "bench", "rol": "Trabajador/a"},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class SinPool:
+    """
+    Comportamiento anterior: requests.post() con conexión nueva.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def post(self, ruta, **kwargs):
+        return requests.post(f"{self.base_url}{ruta}", timeout=5, **kwargs)
+
+
+# =====================================================
+# MEDICIÓN
+# =====================================================
+def medir(cliente, logins, hilos):
+    frontend.api = cliente
+    app = frontend.app
+
+    def un_login(_):
+        t0 = time.perf_counter()
+        with app.test_client() as c:
+            r = c.post("/login", data={"usuario": "bench", "password": "bench"})
+        assert r.status_code == 200 and r.headers.getlist("Set-Cookie"), r.data[:200]
+        return (time.perf_counter() - t0) * 1000
+
+    StubLogin.conexiones = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        tiempos = sorted(ejecutor.map(un_login, range(logins)))
+    total = time.perf_counter() - t0
+
+    return {
+        "logins_s": logins / total,
+        "media": statistics.mean(tiempos),
+        "p50": tiempos[len(tiempos) // 2],
+        "p95": tiempos[int(len(tiempos) * 0.95) - 1],
+        "conexiones": StubLogin.conexiones,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=1000)
+    parser.add_argument("--hilos", type=int, default=16)
+    parser.add_argument("--latencia", type=float, default=2, help="ms de trabajo simulado en el stub")
+    args = parser.parse_args()
+
+    StubLogin.latencia = args.latencia / 1000
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), StubLogin)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{servidor.server_address[1]}"
+
+    pool = ClienteAPI(base_url, pool_maxsize=args.hilos)
+    casos = [
+        ("ANTES   (requests.post por login)", SinPool(base_url)),
+        ("DESPUÉS (ClienteAPI keep-alive)  ", pool),
+    ]
+
+    print(f"{args.logins} logins, {args.hilos} hilos, stub con {args.latencia} ms")
+    try:
+        for nombre, cliente in casos:
+            medir(cliente, min(50, args.logins), args.hilos)     # calentamiento
+            r = medir(cliente, args.logins, args.hilos)
+            print(
+                f"  {nombre} {r['logins_s']:8.1f} logins/s  "
+                f"ms: media={r['media']:.2f} p50={r['p50']:.2f} p95={r['p95']:.2f}  "
+                f"conexiones TCP nuevas={r['conexiones']}"
+            )
+        print(f"  métricas ClienteAPI: {json.dumps(pool.estadisticas())}")
+    finally:
+        pool.cerrar()
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,15 @@
 
 import {claseEstado, claseTurno} from "/static/js/comun/constantes.js"
 
-import {getHistorialValidaciones, marcarValidacionesComoVistas} from "/static/store/store_api.js";
+import {getHistorialValidacionesPagina, marcarValidacionesComoVistas} from "/static/store/store_api.js";
 
 import {formatearFechaES, soloFecha} from "/static/js/comun/util.js";
 
-import { inyectarFiltros, cargarListenersFiltros, aplicarFiltros,} from "/static/js/coordinador/filtros_historial_validaciones.js";
+import { inyectarFiltros, cargarListenersFiltros, leerFiltros,} from "/static/js/coordinador/filtros_historial_validaciones.js";
 
 import {crearTarjeta} from "/static/js/comun/tarjetas.js";
 
-import {crearPaginacion, paginarLista} from "/static/js/comun/paginacion.js";
+import {crearPaginacion} from "/static/js/comun/paginacion.js";
 
 import {refrescarNav} from "/static/js/coordinador/nav_coordinador.js";
 
@@ -19,8 +19,9 @@ import {refrescarNav} from "/static/js/coordinador/nav_coordinador.js";
 // ESTADO GLOBAL
 // =========================================================
 
-// Datos
+// Datos (solo la página visible; el historial completo no se descarga)
 let validaciones = [];
+let porEstado = {};
 let validadas;
 let denegadas;
 let expiradas;
@@ -28,9 +29,11 @@ let expiradas;
 // Filtros
 let uiFiltros;
 
-// Paginación
+// Paginación (por cursor en el servidor)
 const PAGE_SIZE = 10;
 let paginaActual = 1;
+let cursores = [null];   // cursores[n - 1] = cursor para pedir la página n
+let totalFiltrado = 0;
 
 
 // =========================================================
@@ -44,11 +47,8 @@ document.addEventListener("DOMContentLoaded", async () => {
     // 2) Cargar Tarjetas
     cargarTarjetas();
 
-    // 3) Cargar tabla
-    crearFilasTabla();
-
-    // 4) Filtros
-    cargarFiltros();
+    // 3) Filtros + primera página de la tabla
+    await cargarFiltros();
 
 
 });
@@ -60,9 +60,9 @@ document.addEventListener("DOMContentLoaded", async () => {
 // 2) Cargar datos
 async function cargarDatos() {
 
-    validaciones = await getHistorialValidaciones(true);
-
-    console.log('validaciones: ', validaciones)
+    // Solo los totales por estado para las tarjetas
+    const pagina = await getHistorialValidacionesPagina({limite: 1, total: true});
+    porEstado = pagina?.por_estado ?? {};
 
     await marcarValidacionesComoVistas();
 
@@ -80,10 +80,7 @@ function cargarTarjetas() {
     if (!contenedor) return;
     contenedor.innerHTML = "";
 
-    console.log(validaciones)
-
-
-    validadas = validaciones.filter((v => v.estado_validacion === "APROBADA"))
+    validadas = Number(porEstado.APROBADA ?? 0);
 
     crearTarjeta({
         titulo: "Validaciones",
@@ -91,10 +88,10 @@ function cargarTarjetas() {
         color: "verde",
         icono: "enviadas",
         id: "statValidadas",
-        valor: validadas.length,
+        valor: validadas,
     });
 
-    denegadas = validaciones.filter((v => v.estado_validacion === "RECHAZADA"))
+    denegadas = Number(porEstado.RECHAZADA ?? 0);
 
     crearTarjeta({
         titulo: "Validaciones",
@@ -102,17 +99,17 @@ function cargarTarjetas() {
         color: "rojo",
         icono: "canceladas",
         id: "statDenegadas",
-        valor: denegadas.length,
+        valor: denegadas,
     });
 
-    expiradas = validaciones.filter((v => v.estado_validacion === "EXPIRADO"))
+    expiradas = Number(porEstado.EXPIRADA ?? 0);
     crearTarjeta({
         titulo: "Validaciones",
         descripcion: "Expiradas",
         color: "naranja",
         icono: "pendientes",
         id: "statExpiradas",
-        valor: expiradas.length,
+        valor: expiradas,
     });
 }
 
@@ -124,9 +121,9 @@ function actualizarTarjetas(listaFiltrada = []) {
     const statExpiradas = document.getElementById("statExpiradas");
 
 
-    if (statValidadas) statValidadas.textContent = validadas.length;
-    if (statDenegadas) statDenegadas.textContent = denegadas.length;
-    if (statExpiradas) statExpiradas.textContent = expiradas.length;
+    if (statValidadas) statValidadas.textContent = validadas;
+    if (statDenegadas) statDenegadas.textContent = denegadas;
+    if (statExpiradas) statExpiradas.textContent = expiradas;
 }
 
 
@@ -155,8 +152,8 @@ function crearFilasTabla(lista = []) {
 
     // Contador resultados
     if (contadorResultados) {
-        contadorResultados.textContent = `${lista.length} resultado${
-            lista.length !== 1 ? "s" : ""
+        contadorResultados.textContent = `${totalFiltrado} resultado${
+            totalFiltrado !== 1 ? "s" : ""
         }`;
     }
 
@@ -213,40 +210,59 @@ function crearFilasTabla(lista = []) {
 // =========================================================
 
 // 4.1 Cargar filtros
-function cargarFiltros() {
+async function cargarFiltros() {
     uiFiltros = inyectarFiltros();
 
-    cargarListenersFiltros(uiFiltros, () => {
-        paginaActual = 1;
-        refrescarTabla();
-    });
+    cargarListenersFiltros(uiFiltros, refrescarTabla);
 
-    refrescarTabla();
+    await refrescarTabla();
 }
 
 
 // =========================================================
 // PAGINACIÓN
 // =========================================================
-// 4.2 Refrescar tabla
-function refrescarTabla() {
-    aplicarFiltros(uiFiltros, validaciones, actualizarTarjetas, renderizarTablaPaginada);
+// 4.2 Refrescar tabla (filtros nuevos → vuelta a la página 1)
+async function refrescarTabla() {
+    paginaActual = 1;
+    cursores = [null];
+    await cargarPagina(true);
+}
+
+// 4.3 Pedir al servidor la página actual con los filtros aplicados
+async function cargarPagina(conTotal = false) {
+    const filtros = leerFiltros(uiFiltros);
+
+    const pagina = await getHistorialValidacionesPagina({
+        ...filtros,
+        limite: PAGE_SIZE,
+        cursor: cursores[paginaActual - 1],
+        total: conTotal,
+    });
+
+    validaciones = pagina?.items ?? [];
+    cursores[paginaActual] = pagina?.siguiente ?? null;
+    if (conTotal) totalFiltrado = Number(pagina?.total ?? validaciones.length);
+
+    actualizarTarjetas(validaciones);
+    renderizarTablaPaginada();
 }
 
-// 4.3 Renderizar tabla paginada
-function renderizarTablaPaginada(listaFiltrada = []) {
-    const paginaItems = paginarLista(listaFiltrada, paginaActual, PAGE_SIZE);
+// 4.4 Renderizar tabla paginada
+function renderizarTablaPaginada() {
     const contenedorPaginacion = document.getElementById("contenedor-paginacion");
-    crearFilasTabla(paginaItems);
+    crearFilasTabla(validaciones);
 
     crearPaginacion({
         contenedor: contenedorPaginacion,
-        totalItems: listaFiltrada.length,
+        totalItems: totalFiltrado,
         paginaActual,
         pageSize: PAGE_SIZE,
         onPageChange: (nueva) => {
+            // Solo se avanza con el cursor devuelto por el servidor
+            if (nueva > paginaActual && !cursores[paginaActual]) return;
             paginaActual = nueva;
-            renderizarTablaPaginada(listaFiltrada);
+            cargarPagina();
         },
     });
 }
@@ -1,11 +1,18 @@
 "use strict";
 
-import {getMatchesPendientesValidacion, getValidacionesNuevas,} from "/static/store/store_api.js";
+import {getResumenCoordinador, suscribirEventosNav} from "/static/store/store_api.js";
 
 // =========================================================
 // ESTADO GLOBAL
 // =========================================================
-const NAV_REFRESH_MS = 60 * 1000;
+// Los cambios llegan por SSE; el sondeo queda como respaldo lento
+const NAV_REFRESH_MS = 5 * 60 * 1000;
+
+// Últimos contadores conocidos (el SSE solo envía los que cambian)
+const estadoNav = {
+    pendientes_no_vistos: 0,
+    validaciones_no_vistas: 0,
+};
 
 
 // =========================================================
@@ -16,37 +23,41 @@ window.addEventListener("DOMContentLoaded", () => {
     // 1) Refrescar Navegador
     refrescarNav();
 
-    // 2) SetInterval para refrescar cada minuto
+    // 2) Cambios en tiempo real (SSE)
+    suscribirEventosNav((delta) => {
+        Object.assign(estadoNav, delta);
+        pintarNav(estadoNav.pendientes_no_vistos, estadoNav.validaciones_no_vistas);
+    });
+
+    // 3) SetInterval de respaldo (por si el stream no está disponible)
     setInterval(refrescarNav, NAV_REFRESH_MS);
 });
 
 // 1.1) Refrescar Navegador
+//      (una sola petición; si nada ha cambiado el backend responde 304)
 async function refrescarNav(force = false) {
     const elMatchesNuevos = document.getElementById("matches-nuevos");
-    const elValidaciones = document.getElementById("matches-aceptados-denegados"); // (tu badge de validaciones)
+    const elValidaciones = document.getElementById("validaciones-nuevas");
     if (!elMatchesNuevos && !elValidaciones) return;
 
     try {
-        const [pendientes, nuevasValidaciones] = await Promise.all([
-            getMatchesPendientesValidacion(force),
-            getValidacionesNuevas(force), // número
-        ]);
+        const resumen = await getResumenCoordinador();
 
-        pintarNav(pendientes ?? [], Number(nuevasValidaciones ?? 0));
+        Object.assign(estadoNav, resumen);
+        pintarNav(estadoNav.pendientes_no_vistos, estadoNav.validaciones_no_vistas);
     } catch (err) {
-        pintarNav([], 0);
+        pintarNav(0, 0);
     }
 }
 
 // 1.2) Pintar Navegador
-function pintarNav(pendientes, nuevasValidaciones) {
+function pintarNav(pendientesNoVistos, nuevasValidaciones) {
     const elMatchesNuevos = document.getElementById("matches-nuevos");
     const elValidaciones = document.getElementById("validaciones-nuevas");
 
-    // ✅ COORDINADOR: matches pendientes no vistos
+    // ✅ COORDINADOR: matches pendientes no vistos (número)
     if (elMatchesNuevos) {
-        const total = contarPendientesNoVistosCoordinador(pendientes);
-        elMatchesNuevos.textContent = total > 0 ? String(total) : "";
+        elMatchesNuevos.textContent = pendientesNoVistos > 0 ? String(pendientesNoVistos) : "";
     }
 
     // ✅ COORDINADOR: validaciones no vistas (número)
@@ -55,10 +66,4 @@ function pintarNav(pendientes, nuevasValidaciones) {
     }
 }
 
-// 1.3) Contar Matches No Vistos
-function contarPendientesNoVistosCoordinador(lista = []) {
-    if (!Array.isArray(lista)) return 0;
-    return lista.filter((m) => Number(m.visto_por_coordinador) === 0).length;
-}
-
 export {refrescarNav};
@@ -2,7 +2,7 @@
 
 import {API, YEAR, MONTH, TODAY, TURNOS, claseTurnoCalendario, TOKEN} from '/static/js/comun/constantes.js';
 
-import {getJSON, getSolicitudesEnviadas} from '/static/store/store_api.js'
+import {getJSON, getSolicitudesEnviadas, getTurnosMes} from '/static/store/store_api.js'
 
 import {formatearFechaISO,getFechaSeleccionadaFormateada,} from '../comun/util.js';
 
@@ -67,9 +67,8 @@ async function iniciarPagina() {
 // 2) Obtener turno del mes
 async function dameTurnoActual(year = YEAR, month = MONTH) {
 
-    const url = `${API}/turnos?year=${year}&month=${month}`;
-
-    turnosPorFecha = await getJSON(url);
+    // Desde memoria si ya se precargó (store: meses vecinos)
+    turnosPorFecha = await getTurnosMes(year, month);
 
     return turnosPorFecha;
 
@@ -2,7 +2,7 @@
 
 import {API, TODAY,claseTurnoCalendario, YEAR, MONTH,} from "/static/js/comun/constantes.js";
 
-import {getJSON, crearRespuestaSolicitud, getTurnosUsadosParaResponder} from "/static/store/store_api.js";
+import {getJSON, crearRespuestaSolicitud, getTurnosUsadosParaResponder, getTurnosMes, getDiasLibresMes} from "/static/store/store_api.js";
 
 import {formatearFechaISO, formatearFechaES, soloFecha,getFechaSeleccionadaFormateada} from "/static/js/comun/util.js";
 
@@ -86,9 +86,8 @@ async function dameTurnoActual(year = YEAR, month = MONTH) {
 
     console.log('Dame turno actual (year, month):', year, ' : ', month);
 
-    const url = `${API}/turnos?year=${year}&month=${month}`;
-
-    turnosPorFecha = await getJSON(url);
+    // Desde memoria si ya se precargó (store: meses vecinos)
+    turnosPorFecha = await getTurnosMes(year, month);
 
     return turnosPorFecha;
 
@@ -101,9 +100,7 @@ async function cargarDiasLibresEmisor(year, month) {
 
     if (!idEmisor) return new Set();
 
-    const url = `${API}/turnos/libres/${idEmisor}?year=${year}&month=${month}`;
-
-    const data = await getJSON(url);
+    const data = await getDiasLibresMes(idEmisor, year, month);
 
     // data esperado: [{fecha_turno:"2026-01-10"}, ...]
 
@@ -1,11 +1,19 @@
 "use strict";
 
-import { getSolicitudesRecibidasNuevas, getMatchesActivos, getNumeroSolicitudesConRespuestasNoVistas } from "/static/store/store_api.js";
+import { getResumenNotificaciones, suscribirEventosNav } from "/static/store/store_api.js";
 
 // =========================================================
 // ESTADO GLOBAL
 // =========================================================
-const NAV_REFRESH_MS = 60 * 1000;
+// Los cambios llegan por SSE; el sondeo queda como respaldo lento
+const NAV_REFRESH_MS = 5 * 60 * 1000;
+
+// Últimos contadores conocidos (el SSE solo envía los que cambian)
+const estadoNav = {
+    respuestas_no_vistas: 0,
+    solicitudes_nuevas: 0,
+    matches_no_vistos: 0,
+};
 
 
 // =========================================================
@@ -16,13 +24,20 @@ window.addEventListener("DOMContentLoaded", async () => {
     // 1) Refrescar Navegador
     await refrescarNav();
 
-    // 2) SetInterval para refrescar cada minuto
+    // 2) Cambios en tiempo real (SSE)
+    suscribirEventosNav((delta) => {
+        Object.assign(estadoNav, delta);
+        pintarEstado();
+    });
+
+    // 3) SetInterval de respaldo (por si el stream no está disponible)
     setInterval(refrescarNav, NAV_REFRESH_MS);
 
 });
 
 
 // 1.2) Pide datos al backend y repinta el nav
+//      (una sola petición con los tres contadores)
 async function refrescarNav(force = false) {
     const elRespuestas = document.getElementById("respuestas-nuevas");
     const elSolicitudes = document.getElementById("solicitudes-nuevas");
@@ -30,21 +45,26 @@ async function refrescarNav(force = false) {
     if (!elRespuestas && !elSolicitudes && !elMatches) return;
 
     try {
-        const [respuestas, solicitudesNuevas, matches] = await Promise.all([
-            getNumeroSolicitudesConRespuestasNoVistas(force),
-            getSolicitudesRecibidasNuevas(force), // 👈 este devuelve número
-            getMatchesActivos(force),
-        ]);
+        const resumen = await getResumenNotificaciones();
 
-        pintarNav(respuestas ?? 0, solicitudesNuevas ?? 0, matches ?? []);
+        Object.assign(estadoNav, resumen);
+        pintarEstado();
     } catch (err) {
-        pintarNav(0, 0, []);
+        pintarNav(0, 0, 0);
     }
 }
 
+function pintarEstado() {
+    pintarNav(
+        estadoNav.respuestas_no_vistas,
+        estadoNav.solicitudes_nuevas,
+        estadoNav.matches_no_vistos
+    );
+}
+
 
-// 1.2) Pinta el nav con los datos
-function pintarNav(numRespuestas, solicitudesNuevas, matches) {
+// 1.2) Pinta el nav con los datos (todos son números)
+function pintarNav(numRespuestas, solicitudesNuevas, matchesNoVistos) {
     const elRespuestas = document.getElementById("respuestas-nuevas");
     const elSolicitudes = document.getElementById("solicitudes-nuevas");
     const elMatches = document.getElementById("matches-aceptados-denegados");
@@ -53,32 +73,15 @@ function pintarNav(numRespuestas, solicitudesNuevas, matches) {
         elRespuestas.textContent = numRespuestas > 0 ? String(numRespuestas) : "";
     }
 
-    // ✅ solicitudesNuevas ES NÚMERO
     if (elSolicitudes) {
         const total = Number(solicitudesNuevas) || 0;
         elSolicitudes.textContent = total > 0 ? String(total) : "";
     }
 
     if (elMatches) {
-        const noVistos = contarMatchesNoVistos(matches);
+        const noVistos = Number(matchesNoVistos) || 0;
         elMatches.textContent = noVistos > 0 ? String(noVistos) : "";
     }
-
-
-}
-
-// 1.3) Contar Matches No Vistos
-function contarMatchesNoVistos(lista = []) {
-    if (!Array.isArray(lista)) return 0;
-
-    return lista.filter((m) => {
-        const rol = String(m.mi_rol_en_match || "").toUpperCase();
-
-        if (rol === "EMISOR") return Number(m.visto_por_emisor) === 0;
-        if (rol === "RECEPTOR") return Number(m.visto_por_receptor) === 0;
-
-        return false;
-    }).length;
 }
 
 
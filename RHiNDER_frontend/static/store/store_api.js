@@ -16,6 +16,8 @@ const cache = {
     solicitudesRecibidas: null,
     solicitudesRecibidasNuevas: null,
     matchesActivos: null,
+    turnosMes: new Map(),        // "YYYY-MM" -> turnos del usuario
+    diasLibresMes: new Map(),    // "id:YYYY-MM" -> días libres de otro usuario
 
 
     // (coordinador)
@@ -45,18 +47,28 @@ function getTokenOrRedirect() {
 }
 
 
-// 2) GET
+// 2) GET (con soporte de ETag)
 // =========================================================
+// Si el backend devuelve ETag, se guarda junto a los datos y se
+// envía en la siguiente petición (If-None-Match). Si responde 304,
+// se reutilizan los datos guardados sin descargar el cuerpo.
+const etags = new Map(); // url -> {etag, data}
+
 async function getJSON(url) {
     const TOKEN = getTokenOrRedirect();
     if (!TOKEN) return null;
 
+    const headers = {
+        Authorization: `Bearer ${TOKEN}`,
+        Accept: "application/json",
+    };
+
+    const previo = etags.get(url);
+    if (previo) headers["If-None-Match"] = previo.etag;
+
     const res = await fetch(url, {
         method: "GET",
-        headers: {
-            Authorization: `Bearer ${TOKEN}`,
-            Accept: "application/json",
-        },
+        headers,
     });
 
     if (res.status === 401 || res.status === 422) {
@@ -64,9 +76,18 @@ async function getJSON(url) {
         return null;
     }
 
+    // ✅ Sin cambios en el servidor → datos guardados
+    if (res.status === 304 && previo) return previo.data;
+
     if (!res.ok) throw new Error(`HTTP ${res.status} ${res.statusText}`);
 
-    return await res.json();
+    const data = await res.json();
+
+    const etag = res.headers.get("ETag");
+    if (etag) etags.set(url, {etag, data});
+    else etags.delete(url);
+
+    return data;
 }
 
 
@@ -143,6 +164,105 @@ async function putJSON(url, bodyObj = {}) {
     return data;
 }
 
+// 4) STREAM DE EVENTOS (SSE)
+// =========================================================
+// Abre /eventos/stream y llama a onResumen(delta) cada vez que el
+// backend envía contadores que han cambiado. EventSource no admite
+// cabeceras, así que el JWT va en ?jwt=. Si la conexión falla (p. ej.
+// token caducado) se cierra y se reabre con el token actual de la cookie.
+const SSE_REINTENTO_MS = 30 * 1000;
+
+function suscribirEventosNav(onResumen) {
+    if (typeof EventSource === "undefined") return () => {};
+
+    let fuente = null;
+    let temporizador = null;
+    let cerrado = false;
+
+    function abrir() {
+        const TOKEN = getCookie("JWT");
+        if (!TOKEN || cerrado) return;
+
+        fuente = new EventSource(`${API}/eventos/stream?jwt=${encodeURIComponent(TOKEN)}`);
+
+        fuente.addEventListener("resumen", (e) => {
+            try {
+                onResumen(JSON.parse(e.data));
+            } catch {
+            }
+        });
+
+        fuente.onerror = () => {
+            fuente.close();
+            clearTimeout(temporizador);
+            temporizador = setTimeout(abrir, SSE_REINTENTO_MS);
+        };
+    }
+
+    abrir();
+
+    // Devuelve función para cerrar la suscripción
+    return () => {
+        cerrado = true;
+        clearTimeout(temporizador);
+        if (fuente) fuente.close();
+    };
+}
+
+
+// 5) Query string de paginación por cursor
+// =========================================================
+// {limite, cursor, estado, desde, hasta, orden, total} -> "?limite=..."
+// Se omiten los valores vacíos.
+function queryPagina(opciones = {}) {
+    const params = new URLSearchParams();
+    params.set("limite", String(opciones.limite ?? 20));
+
+    for (const clave of ["cursor", "estado", "desde", "hasta", "orden"]) {
+        if (opciones[clave]) params.set(clave, opciones[clave]);
+    }
+    if (opciones.total) params.set("total", "1");
+
+    return `?${params.toString()}`;
+}
+
+
+// 6) Formato columnar (?formato=columnas)
+// =========================================================
+// Los listados grandes llegan como {columns, rows, dict}: nombres de
+// columna una sola vez y los textos repetidos (usernames,
+// nomenclaturas, estados) como índice en dict[columna].
+// desdeColumnas lo devuelve al array de objetos de siempre; cualquier
+// otro valor (array normal, null) se devuelve tal cual.
+function desdeColumnas(payload) {
+    if (!payload || !Array.isArray(payload.columns) || !Array.isArray(payload.rows)) return payload;
+
+    const {columns, rows} = payload;
+    const tablas = columns.map((c) => payload.dict?.[c] || null);
+
+    return rows.map((fila) => {
+        const obj = {};
+        for (let i = 0; i < columns.length; i++) {
+            const valor = fila[i];
+            obj[columns[i]] = tablas[i] && valor != null ? tablas[i][valor] : valor;
+        }
+        return obj;
+    });
+}
+
+// GET de un listado pidiendo el formato columnar (ya decodificado)
+async function getFilas(url) {
+    const sep = url.includes("?") ? "&" : "?";
+    return desdeColumnas(await getJSON(`${url}${sep}formato=columnas`));
+}
+
+// GET de una página {items, ...} pidiendo el formato columnar
+async function getPaginaFilas(url) {
+    const pagina = await getFilas(url);
+    return pagina ? {...pagina, items: desdeColumnas(pagina.items)} : pagina;
+}
+
+
 /* =========================================================
    GETTERS (COMÚN)
    ========================================================= */
@@ -278,15 +398,13 @@ async function getSolicitudesRecibidas(force = false) {
 // 8) Devuelve el NÚMERO de solicitudes recibidas nuevas (no vistas)
 // =========================================================
 async function getSolicitudesRecibidasNuevas(force = false) {
-    console.log("force", force);
     if (!force && Number.isInteger(cache.solicitudesRecibidasNuevas)) {
         return cache.solicitudesRecibidasNuevas;
     }
 
     const data = await getJSON(`${API}/solicitudes/recibidas/nuevas`);
-    console.log("data", data.length);
-    // El backend devuelve un array → usamos su length
-    const total = Array.isArray(data) ? data.length : 0;
+    // El backend devuelve directamente el número (COUNT)
+    const total = Number(data) || 0;
     cache.solicitudesRecibidasNuevas = total;
 
     return total;
@@ -298,7 +416,7 @@ async function getSolicitudesRecibidasNuevas(force = false) {
 async function getMatchesActivos(force = false) {
     if (!force && cache.matchesActivos) return cache.matchesActivos;
 
-    const data = await getJSON(`${API}/matches`);
+    const data = await getFilas(`${API}/matches`);
     cache.matchesActivos = data;
     return cache.matchesActivos;
 }
@@ -319,6 +437,81 @@ async function getSolicitudesEnviadasExpiradasCount(force = false) {
 }
 
 
+// 11) Devuelve los contadores del nav del trabajador en una sola petición
+// =========================================================
+async function getResumenNotificaciones() {
+    // Sin caché: el nav lo consulta periódicamente
+    const data = await getJSON(`${API}/notificaciones/resumen`);
+    return {
+        respuestas_no_vistas: Number(data?.respuestas_no_vistas) || 0,
+        solicitudes_nuevas: Number(data?.solicitudes_nuevas) || 0,
+        matches_no_vistos: Number(data?.matches_no_vistos) || 0,
+    };
+}
+
+
+// 12) Turnos del usuario de un mes (con precarga de los meses vecinos)
+// =========================================================
+// La primera vez se pide month ± MESES_PRECARGA en una sola petición
+// (/turnos/rango). Al navegar, el mes sale de memoria y, si falta un
+// vecino, se pide en segundo plano su rango alrededor.
+const MESES_PRECARGA = 2;
+const rangosEnCurso = new Map(); // url -> Promise
+
+function claveMes(year, month) {
+    return `${year}-${String(month).padStart(2, "0")}`;
+}
+
+function desplazarMes(year, month, delta) {
+    const d = new Date(year, month - 1 + delta, 1);
+    return [d.getFullYear(), d.getMonth() + 1];
+}
+
+function cargarRangoMeses(mapa, prefijo, urlRango, year, month) {
+    const url = `${urlRango}?year=${year}&month=${month}&meses=${MESES_PRECARGA}`;
+
+    if (!rangosEnCurso.has(url)) {
+        const peticion = getJSON(url)
+            .then(data => {
+                for (const [mes, filas] of Object.entries(data?.meses || {})) {
+                    mapa.set(prefijo + mes, filas);
+                }
+            })
+            .finally(() => rangosEnCurso.delete(url));
+        rangosEnCurso.set(url, peticion);
+    }
+    return rangosEnCurso.get(url);
+}
+
+async function getMesConPrecarga(mapa, prefijo, urlRango, year, month) {
+    const clave = prefijo + claveMes(year, month);
+    if (!mapa.has(clave)) await cargarRangoMeses(mapa, prefijo, urlRango, year, month);
+
+    // Vecinos que falten -> en segundo plano (sin esperar)
+    for (const delta of [-1, 1]) {
+        const [y, m] = desplazarMes(year, month, delta);
+        if (!mapa.has(prefijo + claveMes(y, m))) {
+            cargarRangoMeses(mapa, prefijo, urlRango, y, m).catch(err => console.warn("Precarga de meses:", err));
+        }
+    }
+
+    return mapa.get(clave) || [];
+}
+
+async function getTurnosMes(year, month, force = false) {
+    if (force) cache.turnosMes.clear();
+    return getMesConPrecarga(cache.turnosMes, "", `${API}/turnos/rango`, year, month);
+}
+
+
+// 13) Días libres de otro usuario en un mes (con precarga, ver 12)
+// =========================================================
+async function getDiasLibresMes(idUser, year, month, force = false) {
+    if (force) cache.diasLibresMes.clear();
+    return getMesConPrecarga(cache.diasLibresMes, `${idUser}:`, `${API}/turnos/libres/${idUser}/rango`, year, month);
+}
+
+
 /* =========================================================
    POSTS (TRABAJADOR)
    ========================================================= */
@@ -421,20 +614,16 @@ async function marcarSolicitudesRecibidasComoVistas(listaSolicitudes = []) {
     const solicitudesNoVistas = listaSolicitudes.filter(
         s => Number(s.visto) === 0
     );
-    console.log("Vistas:", listaSolicitudes);
-    console.log("No Vistas", solicitudesNoVistas);
 
     // 2) Si no hay ninguna, no hacemos nada
     if (solicitudesNoVistas.length === 0) {
         return {ok: true, marcadas: 0};
     }
 
-    // 3) Marcar cada solicitud como vista en backend
-    for (const solicitud of solicitudesNoVistas) {
-        await postJSON(
-            `${API}/solicitudes/recibidas/nuevas/vista/${solicitud.id_solicitud}`
-        );
-    }
+    // 3) Marcarlas todas como vistas en backend (una sola petición)
+    await postJSON(`${API}/solicitudes/recibidas/vistas`, {
+        ids: solicitudesNoVistas.map(s => s.id_solicitud),
+    });
 
     // 4) Invalidar caché relacionada
     cache.solicitudesRecibidas = null;
@@ -478,7 +667,7 @@ async function getEstadisticasValidacionesPorDia(dias = 7) {
 async function getMatchesPendientesValidacion(force = false) {
     if (!force && cache.matchesPendientesValidacion) return cache.matchesPendientesValidacion;
 
-    const data = await getJSON(`${API}/matches/pendientes`);
+    const data = await getFilas(`${API}/matches/pendientes`);
     cache.matchesPendientesValidacion = data;
     return cache.matchesPendientesValidacion;
 }
@@ -510,13 +699,27 @@ async function denegarMatch(idMatch) {
     return data;
 }
 
+// 4.1) Validar / denegar varios matches en una sola petición (POST)
+// =========================================================
+// decisiones: [{id_match, decision: "validar" | "denegar", comentario?}]
+async function validarDenegarMatchesLote(decisiones = []) {
+    if (!decisiones.length) return {ok: true, procesados: 0, fallidos: 0, resultados: []};
+
+    const data = await postJSON(`${API}/matches/lote`, {decisiones});
+
+    // invalidamos caches que dependen de las validaciones
+    cache.matchesPendientesValidacion = null;
+    cache.historialValidaciones = null;
+    return data; // {ok, procesados, fallidos, resultados}
+}
+
 
 // 5) Devuelve listado historial validaciones
 // =========================================================
 async function getHistorialValidaciones(force = false) {
     if (!force && cache.historialValidaciones) return cache.historialValidaciones;
 
-    const data = await getJSON(`${API}/validaciones`);
+    const data = await getFilas(`${API}/validaciones`);
     cache.historialValidaciones = data;
     return cache.historialValidaciones;
 }
@@ -531,7 +734,17 @@ async function getValidacionesNuevas(force = false) {
     return total;
 }
 
-// 7) Marcar validaciones como vistas
+// 7) Contadores del nav del coordinador (una sola petición, con ETag)
+// =========================================================
+async function getResumenCoordinador() {
+    const data = await getJSON(`${API}/notificaciones/coordinador/resumen`);
+    return {
+        pendientes_no_vistos: Number(data?.pendientes_no_vistos) || 0,
+        validaciones_no_vistas: Number(data?.validaciones_no_vistas) || 0,
+    };
+}
+
+// 8) Marcar validaciones como vistas
 // =========================================================
 async function marcarValidacionesComoVistas() {
     const data = await postJSON(`${API}/validaciones/vistas`, {});
@@ -540,6 +753,12 @@ async function marcarValidacionesComoVistas() {
     return data;
 }
 
+// 9) Devuelve UNA página del historial de validaciones (paginación en servidor)
+// =========================================================
+// Respuesta: {items, siguiente, total?, por_estado?}
+async function getHistorialValidacionesPagina(opciones = {}) {
+    return getPaginaFilas(`${API}/validaciones${queryPagina(opciones)}`);
+}
 
 // =========================================================
 // GETTERS (ADMIN)
@@ -555,13 +774,13 @@ async function getAdminUsuarios(filtros = {}) {
     if (filtros.q) params.set("q", filtros.q);
 
     const url = `${API}/usuarios${params.toString() ? `?${params.toString()}` : ""}`;
-    const payload = await getJSON(url);
+    const payload = await getFilas(url);
 
     // ✅ Normaliza: soporta API que devuelve array directamente o {ok,data}
     if (Array.isArray(payload)) return payload;
 
-    console.log(payload.data);
-    return Array.isArray(payload?.data) ? payload.data : [];
+    const data = desdeColumnas(payload?.data);
+    return Array.isArray(data) ? data : [];
 }
 
 
@@ -580,6 +799,8 @@ async function setUsuarioActivo(id_user, activo) {
 export {
 
     getJSON,
+    desdeColumnas,
+    suscribirEventosNav,
     getUsuarioActual,
     cambiarPassword,
     avisarSiNuevasExpiradas,
@@ -587,6 +808,7 @@ export {
     // Trabajador
     getSolicitudesEnviadas,
     getSolicitudesEnviadasExpiradasCount,
+    getResumenNotificaciones,
     getRespuestasRecibidas,
     getRespuestasExpiradasAviso,
     getSolicitudesRecibidasExpiradasCount,
@@ -597,6 +819,8 @@ export {
     getSolicitudesRecibidas,
     getSolicitudesRecibidasNuevas,
     getMatchesActivos,
+    getTurnosMes,
+    getDiasLibresMes,
     crearMatch,
     marcarMatchesComoVistos,
     cancelarSolicitudEnviada,
@@ -609,8 +833,11 @@ export {
     matchesPendientesNoVistosCoordinador,
     validarMatch,
     denegarMatch,
+    validarDenegarMatchesLote,
     getHistorialValidaciones,
+    getHistorialValidacionesPagina,
     getValidacionesNuevas,
+    getResumenCoordinador,
     marcarValidacionesComoVistas,
 
     // Administrador